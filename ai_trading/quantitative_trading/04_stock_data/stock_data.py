@@ -136,18 +136,24 @@ price_df.iloc[[6, 7, 13, 14]]
 #     [19, 21, 23]
 # ]
 # ```
-# In our case, our third dimensions are "open", "high", "low", "close", "volume", "adj_close", and  "adj_volume". We'll use the [`DataFrame.pivot`](https://pandas.pydata.org/pandas-docs/version/0.21/generated/pandas.DataFrame.pivot.html) function to generate these DataFrames.
+# In our case, our third dimensions are "open", "high", "low", "close", "volume", "adj_close", and  "adj_volume". We'll use `pivot.pivot_fields` to generate all of these DataFrames in one pass, which gives the same result as calling the [`DataFrame.pivot`](https://pandas.pydata.org/pandas-docs/version/0.21/generated/pandas.DataFrame.pivot.html) function once per field.
 
 # In[ ]:
 
 
-open_prices = price_df.pivot(index="date", columns="ticker", values="open")
-high_prices = price_df.pivot(index="date", columns="ticker", values="high")
-low_prices = price_df.pivot(index="date", columns="ticker", values="low")
-close_prices = price_df.pivot(index="date", columns="ticker", values="close")
-volume = price_df.pivot(index="date", columns="ticker", values="volume")
-adj_close_prices = price_df.pivot(index="date", columns="ticker", values="adj_close")
-adj_volume = price_df.pivot(index="date", columns="ticker", values="adj_volume")
+from quant_engine import pivot
+
+pivoted = pivot.pivot_fields(
+    price_df,
+    ["open", "high", "low", "close", "volume", "adj_close", "adj_volume"],
+)
+open_prices = pivoted["open"]
+high_prices = pivoted["high"]
+low_prices = pivoted["low"]
+close_prices = pivoted["close"]
+volume = pivoted["volume"]
+adj_close_prices = pivoted["adj_close"]
+adj_volume = pivoted["adj_volume"]
 
 open_prices
 
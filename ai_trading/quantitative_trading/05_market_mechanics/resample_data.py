@@ -95,6 +95,7 @@ close.resample("W").last()
 
 
 import quiz_tests
+from quant_engine import resample
 
 
 def days_to_weeks(open_prices, high_prices, low_prices, close_prices):
@@ -125,10 +126,17 @@ def days_to_weeks(open_prices, high_prices, low_prices, close_prices):
 
     # TODO: Implement Function
 
-    open_prices_weekly = open_prices.resample("W").first()
-    high_prices_weekly = high_prices.resample("W").max()
-    low_prices_weekly = low_prices.resample("W").min()
-    close_prices_weekly = close_prices.resample("W").last()
+    # Find the weeks once and resample the four price matrices with them
+    (
+        open_prices_weekly,
+        high_prices_weekly,
+        low_prices_weekly,
+        close_prices_weekly,
+    ) = resample.resample_frames(
+        [open_prices, high_prices, low_prices, close_prices],
+        "W",
+        ["first", "max", "min", "last"],
+    )
 
     return (
         open_prices_weekly,
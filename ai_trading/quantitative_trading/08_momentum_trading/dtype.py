@@ -138,12 +138,13 @@ def generate_positions(prices):
     long = prices > 50
     short = prices < 20
 
-    long = 30 * long.astype(np.int)
-    short = -10 * short.astype(np.int)
+    # Share counts this small fit in int8, an eighth of the memory of int64
+    long = 30 * long.astype(np.int8)
+    short = -10 * short.astype(np.int8)
 
     positions = long + short
 
-    return positions.astype(np.int)
+    return positions
 
 
 dtype_project_tests.test_generate_positions(generate_positions)
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from dtype_tests import (
     project_test,
@@ -139,6 +140,7 @@ def test_generate_positions(fn):
                     ],
                     dates,
                     tickers,
+                    dtype=np.int8,
                 ),
             )
         ]
@@ -93,6 +93,7 @@ close_month.loc[month].nlargest(2)
 
 
 import top_and_bottom_performing_project_tests
+from quant_engine import ranking
 
 
 def date_top_industries(prices, sector, date, top_n):
@@ -117,8 +118,8 @@ def date_top_industries(prices, sector, date, top_n):
     """
     # TODO: Implement Function
 
-    top_performers = prices.loc[date].nlargest(top_n)
-    return set(sector.loc[top_performers.index])
+    top_performers = ranking.top_n_labels(prices.loc[date], top_n)
+    return set(sector.loc[top_performers])
 
 
 top_and_bottom_performing_project_tests.test_date_top_industries(date_top_industries)
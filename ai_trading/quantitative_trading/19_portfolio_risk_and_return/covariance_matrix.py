@@ -20,6 +20,7 @@ import sys
 
 import numpy as np
 import covariance_matrix_quiz_tests
+from quant_engine import covariance
 
 
 # ## Hints
@@ -58,8 +59,8 @@ def covariance_matrix(returns):
         A numpy ndarray containing the covariance matrix
     """
 
-    # covariance matrix of returns
-    cov = np.cov(returns)
+    # covariance matrix of returns, one stock per row
+    cov = covariance.covariance(returns.T)
 
     return cov
 
@@ -21,6 +21,7 @@ import sys
 import cvxpy as cvx
 import numpy as np
 import quiz_tests_advanced
+from quant_engine import optimizer
 
 
 # ## What's our objective?
@@ -178,6 +179,44 @@ x_values = optimize_portfolio(returns, index_weights, scale=0.00001)
 print(f"The optimized weights are {x_values}, which sum to {sum(x_values):.2f}")
 
 
+# ## Many scales at once
+# To see how the weights change with the scaling factor, `optimize_portfolios` solves for several scales with one covariance matrix, starting each solve from the weights of the previous scale.
+
+# In[ ]:
+
+
+def optimize_portfolios(returns, index_weights, scales):
+    """
+    Optimize the portfolio for several scaling factors, or index weights, at once.
+
+    Parameters
+    ----------
+    returns : numpy.ndarray
+        2D array containing stock return series in each row.
+
+    index_weights : numpy.ndarray
+        1D numpy array containing weights of the index, or a 2D array with the
+        index weights of each scaling factor in each row.
+
+    scales : numpy.ndarray
+        1D numpy array of the scaling factors
+
+    Returns
+    -------
+    x : np.ndarray
+        A 2D numpy ndarray containing the optimized weights of each scaling
+        factor in each row
+    """
+    return optimizer.batch_tracking_weights(np.cov(returns), index_weights, scales)
+
+
+scales = np.logspace(-6, -2, 5)
+for scale, scale_x_values in zip(
+    scales, optimize_portfolios(returns, index_weights, scales)
+):
+    print(f"Scale {scale:.0e}: the optimized weights are {scale_x_values}")
+
+
 # If you're feeling stuck, you can check out the solution [here](m3l4_cvxpy_advanced_solution.ipynb)
 
 # In[ ]:
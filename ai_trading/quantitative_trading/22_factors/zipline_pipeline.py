@@ -21,61 +21,38 @@ import sys
 # get_ipython().system('{sys.executable} -m pip install -r requirements.txt')
 
 
-# # Loading Data with Zipline
+# # Loading Data
 #
-# Before we build our pipeline with Zipline, we will first see how we can load the stock data we are going to use into Zipline. Zipline uses **Data Bundles** to make it easy to use different data sources. A data bundle is a collection of pricing data, adjustment data, and an asset database. Zipline employs data bundles to preload data used to run backtests and store data for future runs. Zipline comes with a few data bundles by default but it also has the ability to ingest new bundles. The first step to using a data bundle is to ingest the data. Zipline's ingestion process will start by downloading the data or by loading data files from your local machine. It will then pass the data to a set of writer objects that converts the original data to Zipline’s internal format (`bcolz` for pricing data, and `SQLite` for split/merger/dividend data) that hs been optimized for speed. This new data is written to a standard location that Zipline can find. By default, the new data is written to a subdirectory of `ZIPLINE_ROOT/data/<bundle>`, where `<bundle>` is the name given to the bundle ingested and the subdirectory is named with the current date. This allows Zipline to look at older data and run backtests on older copies of the data. Running a backtest with an old ingestion makes it easier to reproduce backtest results later.
+# Before we build our pipeline, we will first see how we can load the stock data we are going to use. Zipline uses **Data Bundles**, which convert the original data to its own formats (`bcolz` for pricing data, and `SQLite` for split/merger/dividend data) and need a trading calendar and an asset database to be read back. The pipelines in this notebook run on `quant_engine.pipeline` instead, which has the same API as Zipline's for the factors and filters we use here, and computes them over the date x ticker matrices of the price data directly.
 #
-# In this notebook, we will be using stock data from **Quotemedia**. In the Udacity Workspace you will find that the stock data from Quotemedia has already been ingested into Zipline. Therefore, in the code below we will use Zipline's `bundles.load()` function to load our previously ingested stock data from Quotemedia. In order to use the `bundles.load()` function we first need to do a couple of things. First, we need to specify the name of the bundle previously ingested. In this case, the name of the Quotemedia data bundle is `eod-quotemedia`:
-
-# In[ ]:
-
-
-# Specify the bundle name
-bundle_name = "eod-quotemedia"
-
-
-# Second, we need to register the data bundle and its ingest function with Zipline, using the `bundles.register()` function. The ingest function is responsible for loading the data into memory and passing it to a set of writer objects provided by Zipline to convert the data to Zipline’s internal format. Since the original Quotemedia data was contained in `.csv` files, we will use the `csvdir_equities()` function to generate the ingest function for our Quotemedia data bundle. In addition, since Quotemedia's `.csv` files contained daily stock data, we will set the time frame for our ingest function, to `daily`.
-
-# In[ ]:
-
-
-from zipline.data import bundles
-from zipline.data.bundles.csvdir import csvdir_equities
-
-# Create an ingest function
-ingest_func = csvdir_equities(["daily"], bundle_name)
-
-# Register the data bundle and its ingest function
-bundles.register(bundle_name, ingest_func)
-
-
-# Once our data bundle and ingest function are registered, we can load our data using the `bundles.load()` function. Since this function loads our previously ingested data, we need to set `ZIPLINE_ROOT` to the path of the most recent ingested data. The most recent data is located in the `cwd/../../data/project_4_eod/` directory, where `cwd` is the current working directory. We will specify this location using the `os.environ[]` command.
+# In this notebook, we will be using stock data from **Quotemedia**. The data is in the `eod-quotemedia.csv` file in the `cwd/../../data/project_4_eod/` directory, where `cwd` is the current working directory, with a row for each date and ticker. We will load it with the `price_store.load_csv()` function, which returns a DataFrame of dates by tickers for each field we ask for. The `.csv` file is only parsed the first time, after that the matrices are read from the store saved next to it. The pipeline factors use the adjusted close prices and volumes:
 
 # In[ ]:
 
 
 import os
 
-# Set environment variable 'ZIPLINE_ROOT' to the path where the most recent data is located
-os.environ["ZIPLINE_ROOT"] = os.path.join(
-    os.getcwd(), "..", "..", "data", "project_4_eod"
+from quant_engine import price_store
+
+# Set the path of the Quotemedia end of day data
+eod_path = os.path.join(
+    os.getcwd(), "..", "..", "data", "project_4_eod", "eod-quotemedia.csv"
 )
 
-# Load the data bundle
-bundle_data = bundles.load(bundle_name)
+# Load the date x ticker price data
+pricing_data = price_store.load_csv(eod_path, ["adj_close", "adj_volume"])
 
 
 # # Building an Empty Pipeline
 #
-# Once we have loaded our data, we can start building our Zipline pipeline. We begin by creating an empty Pipeline object using Zipline's `Pipeline` class. A Pipeline object represents a collection of named expressions to be compiled and executed by a Pipeline Engine. The `Pipeline(columns=None, screen=None)` class takes two optional parameters, `columns` and `screen`. The `columns` parameter is a dictionary used to indicate the intial columns to use, and the `screen` parameter is used to setup a screen to exclude unwanted data.
+# Once we have loaded our data, we can start building our pipeline. We begin by creating an empty Pipeline object using the `Pipeline` class. A Pipeline object represents a collection of named expressions to be compiled and executed by a Pipeline Engine. The `Pipeline(columns=None, screen=None)` class takes two optional parameters, `columns` and `screen`. The `columns` parameter is a dictionary used to indicate the intial columns to use, and the `screen` parameter is used to setup a screen to exclude unwanted data.
 #
-# In the code below we will create a `screen` for our pipeline using Zipline's built-in `.AverageDollarVolume()` class. We will use the `.AverageDollarVolume()` class to produce a 60-day Average Dollar Volume of closing prices for every stock in our universe. We then use the `.top(10)` attribute to specify that we want to filter down our universe each day to just the top 10 assets. Therefore, this screen will act as a filter to exclude data from our stock universe each day. The average dollar volume is a good first pass filter to avoid illiquid assets.
+# In the code below we will create a `screen` for our pipeline using the built-in `.AverageDollarVolume()` class. We will use the `.AverageDollarVolume()` class to produce a 60-day Average Dollar Volume of closing prices for every stock in our universe. We then use the `.top(10)` attribute to specify that we want to filter down our universe each day to just the top 10 assets. Therefore, this screen will act as a filter to exclude data from our stock universe each day. The average dollar volume is a good first pass filter to avoid illiquid assets.
 
 # In[ ]:
 
 
-from zipline.pipeline import Pipeline
-from zipline.pipeline.factors import AverageDollarVolume
+from quant_engine.pipeline import AverageDollarVolume, Pipeline
 
 # Create a screen for our Pipeline
 universe = AverageDollarVolume(window_length=60).top(10)
@@ -107,7 +84,7 @@ pipeline = Pipeline(screen=universe)
 
 # # Viewing the Pipeline as a Diagram
 #
-# Zipline's Pipeline class comes with the attribute `.show_graph()` that allows you to render the Pipeline as a Directed Acyclic Graph (DAG). This graph is specified using the DOT language and consequently we need a DOT graph layout program to view the rendered image. In the code below, we will use the Graphviz pakage to render the graph produced by the `.show_graph()` attribute. Graphviz is an open-source package for drawing graphs specified in DOT language scripts.
+# Like Zipline's, the Pipeline class comes with the attribute `.show_graph()` that allows you to render the Pipeline as a Directed Acyclic Graph (DAG). This graph is specified using the DOT language and consequently we need a DOT graph layout program to view the rendered image. In the code below, we will use the Graphviz pakage to render the graph produced by the `.show_graph()` attribute. Graphviz is an open-source package for drawing graphs specified in DOT language scripts.
 
 # In[ ]:
 
@@ -124,80 +101,43 @@ pipeline.show_graph()
 # AverageDollarVolume(window_length = 60).top(10)
 # ```
 #
-# By default, the `.AverageDollarVolume()` class uses the `USEquityPricing` dataset, containing daily trading prices and volumes, to compute the average dollar volume:
+# By default, the `.AverageDollarVolume()` class uses the `EquityPricing` dataset, containing daily trading prices and volumes, to compute the average dollar volume:
 #
 # ```python
 # average_dollar_volume = np.nansum(close_price * volume, axis=0) / len(close_price)
 # ```
-# The top of the diagram reflects the fact that the `.AverageDollarVolume()` class gets its inputs (closing price and volume) from the `USEquityPricing` dataset. The bottom of the diagram shows that the output is determined by the expression `x_0 <= 10`. This expression reflects the fact that we used `.top(10)` as a filter in our `screen`. We refer to each box in the diagram as a Term.
+# The top of the diagram reflects the fact that the `.AverageDollarVolume()` class gets its inputs (closing price and volume) from the `EquityPricing` dataset. The bottom of the diagram shows that the output is determined by a `TopN` term with `n=10`. This reflects the fact that we used `.top(10)` as a filter in our `screen`. We refer to each box in the diagram as a Term.
 
-# # Datasets and Dataloaders
+# # Datasets and Pipeline Engine
 #
-# One of the features of Zipline's Pipeline is that it separates the actual source of the stock data from the abstract description of that dataset. Therefore, Zipline employs **DataSets** and **Loaders** for those datasets. `DataSets` are just abstract collections of sentinel values describing the columns/types for a particular dataset.  While a `loader` is an object which, given a request for a particular chunk of a dataset, can actually get the requested data. For example, the loader used for the `USEquityPricing` dataset, is the `USEquityPricingLoader` class. The `USEquityPricingLoader` class will delegate the loading of baselines and adjustments to lower-level subsystems that know how to get the pricing data in the default formats used by Zipline (`bcolz` for pricing data, and `SQLite` for split/merger/dividend data). As we saw in the beginning of this notebook, data bundles automatically convert the stock data into `bcolz` and `SQLite` formats. It is important to note that the `USEquityPricingLoader` class can also be used to load daily OHLCV data from other datasets, not just from the `USEquityPricing` dataset. Simliarly, it is also  possible to write different loaders for the same dataset and use those instead of the default loader. Zipline contains lots of other loaders to allow you to load data from different datasets.
-#
-# In the code below, we will use `USEquityPricingLoader(BcolzDailyBarWriter, SQLiteAdjustmentWriter)` to create a loader from a `bcolz` equity pricing directory and a `SQLite` adjustments path. Both the `BcolzDailyBarWriter` and `SQLiteAdjustmentWriter` determine the path of the pricing and adjustment data. Since we will be using the Quotemedia data bundle, we will use the `bundle_data.equity_daily_bar_reader` and the `bundle_data.adjustment_reader` as our `BcolzDailyBarWriter` and `SQLiteAdjustmentWriter`, respectively.
-
-# In[ ]:
-
-
-from zipline.pipeline.loaders import USEquityPricingLoader
-
-# Set the dataloader
-pricing_loader = USEquityPricingLoader(
-    bundle_data.equity_daily_bar_reader, bundle_data.adjustment_reader
-)
-
-
-# # Pipeline Engine
+# One of the features of a pipeline is that it separates the actual source of the stock data from the abstract description of that dataset. The columns of the `EquityPricing` dataset, like `EquityPricing.close`, only name a field of the price data, here `adj_close`. Zipline employs **Loaders** to get the requested chunk of a dataset from a bundle, with a trading calendar to know the trading days and an asset finder to know which assets existed on each day. The price data we loaded is already a DataFrame of dates by tickers for each field, so its index gives the trading days and its columns give the assets, and a ticker without data on a day is NaN.
 #
-# Zipline employs computation engines for executing Pipelines. In the code below we will use Zipline's `SimplePipelineEngine()` class as the engine to execute our pipeline. The `SimplePipelineEngine(get_loader, calendar, asset_finder)` class associates the chosen data loader with the corresponding dataset and a trading calendar. The `get_loader` parameter must be a callable function that is given a loadable term and returns a `PipelineLoader` to use to retrieve the raw data for that term in the pipeline. In our case, we will be using the `pricing_loader` defined above, we therefore, create a function called `choose_loader` that returns our `pricing_loader`. The function also checks that the data that is being requested corresponds to OHLCV data, otherwise it retunrs an error. The `calendar` parameter must be a `DatetimeIndex` array of dates to consider as trading days when computing a range between a fixed `start_date` and `end_date`. In our case, we will be using the same trading days as those used in the NYSE. We will use Zipline's `get_calendar('NYSE')` function to retrieve the trading days used by the NYSE. We then use the `.all_sessions` attribute to get the `DatetimeIndex` from our `trading_calendar` and pass it to the `calendar` parameter. Finally, the `asset_finder` parameter determines which assets are in the top-level universe of our stock data at any point in time. Since we are using the Quotemedia data bundle, we set this parameter to the `bundle_data.asset_finder`.
+# Pipelines are executed by a computation engine. In the code below we will use the `PipelineEngine(data)` class, where `data` is the dictionary of DataFrames we loaded above, keyed by field. Each column of the `EquityPricing` dataset is read from the DataFrame of its field.
 
 # In[ ]:
 
 
-from zipline.utils.calendars import get_calendar
-from zipline.pipeline.data import USEquityPricing
-from zipline.pipeline.engine import SimplePipelineEngine
-
-# Define the function for the get_loader parameter
-def choose_loader(column):
-    if column not in USEquityPricing.columns:
-        raise Exception("Column not in USEquityPricing")
-    return pricing_loader
+from quant_engine.pipeline import PipelineEngine
 
-
-# Set the trading calendar
-trading_calendar = get_calendar("NYSE")
-
-# Create a Pipeline engine
-engine = SimplePipelineEngine(
-    get_loader=choose_loader,
-    calendar=trading_calendar.all_sessions,
-    asset_finder=bundle_data.asset_finder,
-)
+# Create a Pipeline engine over the price data
+engine = PipelineEngine(pricing_data)
 
 
 # # Running a Pipeline
 #
-# Once we have chosen our engine we are ready to run or execute our pipeline. We can run our pipeline by using the `.run_pipeline()` attribute of the `SimplePipelineEngine` class. In particular, the `SimplePipelineEngine.run_pipeline(pipeline, start_date, end_date)` implements the following algorithm for executing pipelines:
+# Once we have chosen our engine we are ready to run or execute our pipeline. We can run our pipeline by using the `.run_pipeline()` attribute of the `PipelineEngine` class. In particular, the `PipelineEngine.run_pipeline(pipeline, start_date, end_date)` implements the following algorithm for executing pipelines:
 #
 #
 # 1. Build a dependency graph of all terms in the `pipeline`. In this step, the graph is sorted topologically to determine the order in which we can compute the terms.
 #
 #
-# 2. Ask our AssetFinder for a “lifetimes matrix”, which should contain, for each date between `start_date` and `end_date`, a boolean value for each known asset indicating whether the asset existed on that date.
-#
-#
-# 3. Compute each term in the dependency order determined in step 1, caching the results in a a dictionary so that they can be fed into future terms.
+# 2. Find the dates of the price data needed, from the dates before `start_date` that the longest window looks back over up to the day before `end_date`.
 #
 #
-# 4. For each date, determine the number of assets passing the `pipeline` screen. The sum, $N$, of all these values is the total number of rows in our output Pandas Dataframe, so we pre-allocate an output array of length $N$ for each factor in terms.
+# 3. Compute each term in the dependency order determined in step 1, for every date and ticker at once, caching the results in a dictionary so that they can be fed into future terms. A result is dropped once the last term that uses it is computed.
 #
 #
-# 5. Fill in the arrays allocated in step 4 by copying computed values from our output cache into the corresponding rows.
-#
-#
-# 6. Stick the values computed in step 5 into a Pandas DataFrame and return it.
+# 4. For each date, determine the assets passing the `pipeline` screen, and copy the computed values of each output term for those assets into the rows of a Pandas DataFrame.
 #
 # In the code below, we run our pipeline for a single day, so our `start_date` and `end_date` will be the same. We then print some information about our `pipeline_output`.
 
@@ -207,8 +147,8 @@ engine = SimplePipelineEngine(
 import pandas as pd
 
 # Set the start and end dates
-start_date = pd.Timestamp("2016-01-05", tz="utc")
-end_date = pd.Timestamp("2016-01-05", tz="utc")
+start_date = pd.Timestamp("2016-01-05")
+end_date = pd.Timestamp("2016-01-05")
 
 # Run our pipeline for the given start and end dates
 pipeline_output = engine.run_pipeline(pipeline, start_date, end_date)
@@ -219,12 +159,12 @@ print("The pipeline output has type:", type(pipeline_output), "\n")
 # We print whether the pipeline output is a MultiIndex Dataframe
 print(
     "Is the pipeline output a MultiIndex Dataframe:",
-    isinstance(pipeline_output.index, pd.core.index.MultiIndex),
+    isinstance(pipeline_output.index, pd.MultiIndex),
     "\n",
 )
 
 # If the pipeline output is a MultiIndex Dataframe we print the two levels of the index
-if isinstance(pipeline_output.index, pd.core.index.MultiIndex):
+if isinstance(pipeline_output.index, pd.MultiIndex):
 
     # We print the index level 0
     print("Index Level 0:\n\n", pipeline_output.index.get_level_values(0), "\n")
@@ -251,67 +191,38 @@ universe_tickers
 
 # # Get Data
 #
-# Now that we have the tickers for the stocks that passed our pipeline’s screen, we can get the historical stock data for those tickers from our data bundle. In order to get the historical data we need to use Zipline's `DataPortal` class. A `DataPortal` is an interface to all of the data that a Zipline simulation needs. In the code below, we will create a `DataPortal` and `get_pricing` function to get historical stock prices for our tickers.
+# Now that we have the tickers for the stocks that passed our pipeline’s screen, we can get the historical stock data for those tickers. With Zipline this needs a `DataPortal`, an interface to all of the data that a Zipline simulation needs. Our price data is already a DataFrame of dates by tickers for each field, so we only need to select the rows and columns we want. In the code below, we will create a `get_pricing` function to get historical stock prices for our tickers.
 #
-# We have already seen most of the parameters used below when we create the `DataPortal`, so we won't explain them again here. The only new parameter is `first_trading_day`. The `first_trading_day` parameter is a `pd.Timestamp` indicating the first trading day for the simulation. We will set the first trading day to the first trading day in the data bundle. For more information on the `DataPortal` class see the [Zipline documentation](https://www.zipline.io/appendix.html?highlight=dataportal#zipline.data.data_portal.DataPortal)
-
-# In[ ]:
-
-
-from zipline.data.data_portal import DataPortal
-
-# Create a data portal
-data_portal = DataPortal(
-    bundle_data.asset_finder,
-    trading_calendar=trading_calendar,
-    first_trading_day=bundle_data.equity_daily_bar_reader.first_trading_day,
-    equity_daily_reader=bundle_data.equity_daily_bar_reader,
-    adjustment_reader=bundle_data.adjustment_reader,
-)
-
-
-# Now that we have created a `data_portal` we will create a helper function, `get_pricing`, that gets the historical data from the `data_portal` for a given set of `start_date` and `end_date`. The `get_pricing` function takes various parameters:
+# The `get_pricing` function takes various parameters:
 #
 # ```python
-# def get_pricing(data_portal, trading_calendar, assets, start_date, end_date, field='close')
+# def get_pricing(pricing_data, assets, start_date, end_date, field='adj_close')
 # ```
 #
 #
-# The first two parameters, `data_portal` and `trading_calendar`, have already been defined above. The third paramter, `assets`, is a list of tickers. In our case we will use the tickers from the output of our pipeline, namely, `universe_tickers`. The fourth and fifth parameters are strings specifying the `start_date` and `end_date`. The function converts these two strings into Timestamps with a Custom Business Day frequency. The last parameter, `field`, is a string used to indicate which field to return. In our case we want to get the closing price, so we set `field='close`.
+# The first parameter, `pricing_data`, has already been defined above. The second paramter, `assets`, is a list of tickers. In our case we will use the tickers from the output of our pipeline, namely, `universe_tickers`. The third and fourth parameters are strings specifying the `start_date` and `end_date`. The last parameter, `field`, is a string used to indicate which field to return. In our case we want to get the adjusted closing price, so we set `field='adj_close`.
 #
-# The function returns the historical stock price data using the `.get_history_window()` attribute of the `DataPortal` class. This attribute returns a Pandas Dataframe containing the requested history window with the data fully adjusted. The `bar_count` parameter is an integer indicating the number of days to return. The number of days determines the number of rows of the returned dataframe. Both the `frequency` and `data_frequency` parameters are strings that indicate the frequency of the data to query, *i.e.* whether the data is in `daily` or `minute` intervals.
+# Like `DataPortal.get_history_window()`, the function returns the window of dates after `start_date` up to and including `end_date`, as a Pandas Dataframe with a row for each date and a column for each ticker.
 
 # In[ ]:
 
 
-def get_pricing(
-    data_portal, trading_calendar, assets, start_date, end_date, field="close"
-):
+def get_pricing(pricing_data, assets, start_date, end_date, field="adj_close"):
 
-    # Set the given start and end dates to Timestamps. The frequency string C is used to
-    # indicate that a CustomBusinessDay DateOffset is used
-    end_dt = pd.Timestamp(end_date, tz="UTC", freq="C")
-    start_dt = pd.Timestamp(start_date, tz="UTC", freq="C")
+    # Get the prices of the given field
+    prices = pricing_data[field]
 
     # Get the locations of the start and end dates
-    end_loc = trading_calendar.closes.index.get_loc(end_dt)
-    start_loc = trading_calendar.closes.index.get_loc(start_dt)
+    end_loc = prices.index.get_loc(pd.Timestamp(end_date))
+    start_loc = prices.index.get_loc(pd.Timestamp(start_date))
 
-    # return the historical data for the given window
-    return data_portal.get_history_window(
-        assets=assets,
-        end_dt=end_dt,
-        bar_count=end_loc - start_loc,
-        frequency="1d",
-        field=field,
-        data_frequency="daily",
-    )
+    # return the historical data for the given window, ending at the end date
+    return prices.iloc[start_loc + 1 : end_loc + 1][assets]
 
 
 # Get the historical data for the given window
 historical_data = get_pricing(
-    data_portal,
-    trading_calendar,
+    pricing_data,
     universe_tickers,
     start_date="2011-01-05",
     end_date="2016-01-05",
@@ -332,15 +243,15 @@ historical_data
 #
 # ### Factors
 #
-# In the code below, we will use Zipline's built-in `SimpleMovingAverage` factor to create a factor that computes the 15-day mean closing price of securities. We will then add this factor to our pipeline and use `.show_graph()` to see a diagram of our pipeline with the factor added.
+# In the code below, we will use the built-in `SimpleMovingAverage` factor to create a factor that computes the 15-day mean closing price of securities. We will then add this factor to our pipeline and use `.show_graph()` to see a diagram of our pipeline with the factor added.
 
 # In[ ]:
 
 
-from zipline.pipeline.factors import SimpleMovingAverage
+from quant_engine.pipeline import EquityPricing, SimpleMovingAverage
 
 # Create a factor that computes the 15-day mean closing price of securities
-mean_close_15 = SimpleMovingAverage(inputs=[USEquityPricing.close], window_length=15)
+mean_close_15 = SimpleMovingAverage(inputs=[EquityPricing.close], window_length=15)
 
 # Add the factor to our pipeline
 pipeline.add(mean_close_15, "15 Day MCP")
@@ -355,8 +266,8 @@ pipeline.show_graph()
 
 
 # Set starting and end dates
-start_date = pd.Timestamp("2014-01-06", tz="utc")
-end_date = pd.Timestamp("2016-01-05", tz="utc")
+start_date = pd.Timestamp("2014-01-06")
+end_date = pd.Timestamp("2016-01-05")
 
 # Run our pipeline for the given start and end dates
 output = engine.run_pipeline(pipeline, start_date, end_date)
@@ -390,8 +301,8 @@ pipeline.show_graph()
 
 
 # Set starting and end dates
-start_date = pd.Timestamp("2014-01-06", tz="utc")
-end_date = pd.Timestamp("2016-01-05", tz="utc")
+start_date = pd.Timestamp("2014-01-06")
+end_date = pd.Timestamp("2016-01-05")
 
 # Run our pipeline for the given start and end dates
 output = engine.run_pipeline(pipeline, start_date, end_date)
@@ -2,31 +2,15 @@ import os
 
 import pandas as pd
 
-from zipline.data import bundles
-from zipline.pipeline import Pipeline
-from zipline.data.data_portal import DataPortal
-from zipline.utils.calendars import get_calendar
-from zipline.pipeline.data import USEquityPricing
-from zipline.data.bundles.csvdir import csvdir_equities
-from zipline.pipeline.factors import AverageDollarVolume
-from zipline.pipeline.engine import SimplePipelineEngine
-from zipline.pipeline.loaders import USEquityPricingLoader
+from quant_engine import price_store
+from quant_engine.pipeline import AverageDollarVolume, Pipeline, PipelineEngine
 
 
-# Specify the bundle name
-bundle_name = 'm4-quiz-eod-quotemedia'
+# Set the path of the Quotemedia end of day data the bundle was built from
+eod_path = os.path.join(os.getcwd(), '..', '..', 'data', 'module_4_quizzes_eod', 'eod-quotemedia.csv')
 
-# Create an ingest function 
-ingest_func = csvdir_equities(['daily'], bundle_name)
-
-# Register the data bundle and its ingest function
-bundles.register(bundle_name, ingest_func);
-
-# Set environment variable 'ZIPLINE_ROOT' to the path where the most recent data is located
-os.environ['ZIPLINE_ROOT'] = os.path.join(os.getcwd(), '..', '..', 'data', 'module_4_quizzes_eod')
-
-# Load the data bundle
-bundle_data = bundles.load(bundle_name)
+# Load the date x ticker price data, parsing the csv only the first time
+pricing_data = price_store.load_csv(eod_path, ['adj_close', 'adj_volume'])
 
 # Create a screen for our Pipeline
 universe = AverageDollarVolume(window_length = 120).top(500)
@@ -34,27 +18,13 @@ universe = AverageDollarVolume(window_length = 120).top(500)
 # Create an empty Pipeline with the given screen
 pipeline = Pipeline(screen = universe)
 
-# Set the dataloader
-pricing_loader = USEquityPricingLoader(bundle_data.equity_daily_bar_reader, bundle_data.adjustment_reader)
-
-# Define the function for the get_loader parameter
-def choose_loader(column):
-    if column not in USEquityPricing.columns:
-        raise Exception('Column not in USEquityPricing')
-    return pricing_loader
-
-# Set the trading calendar
-trading_calendar = get_calendar('NYSE')
-
-# Create a Pipeline engine
-engine = SimplePipelineEngine(get_loader = choose_loader,
-                              calendar = trading_calendar.all_sessions,
-                              asset_finder = bundle_data.asset_finder)
+# Create a Pipeline engine over the price data
+engine = PipelineEngine(pricing_data)
 
 
 # Set the start and end dates
-start_date = pd.Timestamp('2016-01-05', tz = 'utc')
-end_date = pd.Timestamp('2016-01-05', tz = 'utc')
+start_date = pd.Timestamp('2016-01-05')
+end_date = pd.Timestamp('2016-01-05')
 
 # Run our pipeline for the given start and end dates
 pipeline_output = engine.run_pipeline(pipeline, start_date, end_date)
@@ -62,36 +32,25 @@ pipeline_output = engine.run_pipeline(pipeline, start_date, end_date)
 # Get the values in index level 1 and save them to a list
 universe_tickers = pipeline_output.index.get_level_values(1).values.tolist()
 
-# Create a data portal
-data_portal = DataPortal(bundle_data.asset_finder,
-                         trading_calendar = trading_calendar,
-                         first_trading_day = bundle_data.equity_daily_bar_reader.first_trading_day,
-                         equity_daily_reader = bundle_data.equity_daily_bar_reader,
-                         adjustment_reader = bundle_data.adjustment_reader)
 
-def get_pricing(data_portal, trading_calendar, assets, start_d, end_d, field='close'):
-    
-    # Set the given start and end dates to Timestamps. The frequency string C is used to
-    # indicate that a CustomBusinessDay DateOffset is used
-    end_dt = pd.Timestamp(end_d, tz='UTC', freq='C')
-    start_dt = pd.Timestamp(start_d, tz='UTC', freq='C')
+def get_pricing(pricing_data, assets, start_d, end_d, field='adj_close'):
+
+    # Get the prices of the given field
+    prices = pricing_data[field]
 
     # Get the locations of the start and end dates
-    end_loc = trading_calendar.closes.index.get_loc(end_dt)
-    start_loc = trading_calendar.closes.index.get_loc(start_dt)
+    end_loc = prices.index.get_loc(pd.Timestamp(end_d))
+    start_loc = prices.index.get_loc(pd.Timestamp(start_d))
 
-    # return the historical data for the given window
-    return data_portal.get_history_window(assets=assets, end_dt=end_dt, bar_count=end_loc - start_loc,
-                                          frequency='1d',
-                                          field=field,
-                                          data_frequency='daily')
+    # return the historical data for the given window, ending at the end date
+    return prices.iloc[start_loc + 1 : end_loc + 1][assets]
 
 
 
 def get_returns(start_date='2011-01-05', end_date='2016-01-05'):
-    
+
     # Get the historical data for the given window
-    historical_data = get_pricing(data_portal, trading_calendar, universe_tickers,
+    historical_data = get_pricing(pricing_data, universe_tickers,
                                   start_d=start_date, end_d=end_date)
-    
-    return historical_data.pct_change()[1:].fillna(0)
\ No newline at end of file
+
+    return historical_data.pct_change()[1:].fillna(0)
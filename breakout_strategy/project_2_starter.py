@@ -31,6 +31,16 @@ import numpy as np
 import helper
 import project_helper
 import project_tests
+from quant_engine import (
+    debounce,
+    extremes,
+    kstest,
+    lookahead,
+    outliers,
+    pivot,
+    price_store,
+    signals,
+)
 
 # get_ipython().run_line_magic("matplotlib", "inline")
 
@@ -42,20 +52,22 @@ import project_tests
 # In[3]:
 
 
-df_original = pd.read_csv(
-    "breakout_strategy/eod-quotemedia.csv", parse_dates=["date"], index_col=False
+prices = price_store.load_csv(
+    "breakout_strategy/eod-quotemedia.csv", ["adj_close", "adj_high", "adj_low"]
 )
 
 # Add TB sector to the market
-df = df_original
-df = pd.concat(
-    [df] + project_helper.generate_tb_sector(df[df["ticker"] == "AAPL"]["date"]),
+tb_sector = pd.concat(
+    project_helper.generate_tb_sector(prices["adj_close"]["AAPL"].dropna().index),
     ignore_index=True,
 )
 
-close = df.reset_index().pivot(index="date", columns="ticker", values="adj_close")
-high = df.reset_index().pivot(index="date", columns="ticker", values="adj_high")
-low = df.reset_index().pivot(index="date", columns="ticker", values="adj_low")
+tb_prices = pivot.pivot_fields(tb_sector, ["adj_close", "adj_high", "adj_low"])
+
+close, high, low = (
+    pd.concat([prices[field], tb_prices[field]], axis=1).sort_index(axis=1)
+    for field in ["adj_close", "adj_high", "adj_low"]
+)
 
 print("Loaded Data")
 
@@ -126,9 +138,12 @@ def get_high_lows_lookback(high, low, lookback_days):
         Lookback low price for each ticker and date
     """
     # TODO: Implement function
-    high_lookback = high.shift().rolling(window=lookback_days).max()
-    lows_lookback = low.shift().rolling(window=lookback_days).min()
-    return high_lookback, lows_lookback
+    high_lookback = extremes.lookback_max(high.values, lookback_days)
+    lows_lookback = extremes.lookback_min(low.values, lookback_days)
+    return (
+        pd.DataFrame(high_lookback, high.index, high.columns),
+        pd.DataFrame(lows_lookback, low.index, low.columns),
+    )
 
 
 project_tests.test_get_high_lows_lookback(get_high_lows_lookback)
@@ -183,11 +198,14 @@ def get_long_short(close, lookback_high, lookback_low):
         The long, short, and do nothing signals for each ticker and date
     """
     # TODO: Implement function
-    high = (close > lookback_high).astype(np.int)
-    low = (close < lookback_low).astype(np.int)
-    long_short = high - low
+    close_values, high_values, low_values = signals.aligned_values(
+        close, lookback_high, lookback_low
+    )
+    long_short = signals.long_short(
+        close_values > high_values, close_values < low_values
+    )
 
-    return long_short
+    return pd.DataFrame(long_short, close.index, close.columns)
 
 
 project_tests.test_get_long_short(get_long_short)
@@ -251,21 +269,10 @@ def clear_signals(signals, window_size):
     signals : Pandas Series
         Signals with the signals removed from the window size
     """
-    # Start with buffer of window size
-    # This handles the edge case of calculating past_signal in the beginning
-    clean_signals = [0] * window_size
-
-    for signal_i, current_signal in enumerate(signals):
-        # Check if there was a signal in the past window_size of days
-        has_past_signal = bool(sum(clean_signals[signal_i : signal_i + window_size]))
-        # Use the current signal if there's no past signal, else 0/False
-        clean_signals.append(not has_past_signal and current_signal)
-
-    # Remove buffer
-    clean_signals = clean_signals[window_size:]
+    clean_signals = debounce.debounce_signals(signals.values, window_size)
 
-    # Return the signals as a Series of Ints
-    return pd.Series(np.array(clean_signals).astype(np.int), signals.index)
+    # Return the signals as a Series of int8
+    return pd.Series(clean_signals, signals.index)
 
 
 def filter_signals(signal, lookahead_days):
@@ -285,10 +292,9 @@ def filter_signals(signal, lookahead_days):
         The filtered long, short, and do nothing signals for each ticker and date
     """
     # TODO: Implement function
-    long = (signal > 0).astype(int).apply(lambda x: clear_signals(x, lookahead_days))
-    short = (signal < 0).astype(int).apply(lambda x: clear_signals(x, lookahead_days))
+    filtered_signal = debounce.debounce_signals(signal.values, lookahead_days)
 
-    return long - short
+    return pd.DataFrame(filtered_signal, signal.index, signal.columns)
 
 
 project_tests.test_filter_signals(filter_signals)
@@ -351,15 +357,13 @@ project_tests.test_get_lookahead_prices(get_lookahead_prices)
 # In[13]:
 
 
-lookahead_5 = get_lookahead_prices(close, 5)
-lookahead_10 = get_lookahead_prices(close, 10)
-lookahead_20 = get_lookahead_prices(close, 20)
+lookahead_days = [5, 10, 20]
+apple_close = close[apple_ticker]
 project_helper.plot_lookahead_prices(
-    close[apple_ticker].iloc[150:250],
+    apple_close.iloc[150:250],
     [
-        (lookahead_5[apple_ticker].iloc[150:250], 5),
-        (lookahead_10[apple_ticker].iloc[150:250], 10),
-        (lookahead_20[apple_ticker].iloc[150:250], 20),
+        (get_lookahead_prices(apple_close, days).iloc[150:250], days)
+        for days in lookahead_days
     ],
     "5, 10, and 20 day Lookahead Prices for Slice of {} Stock".format(apple_ticker),
 )
@@ -403,9 +407,12 @@ project_tests.test_get_return_lookahead(get_return_lookahead)
 # In[15]:
 
 
-price_return_5 = get_return_lookahead(close, lookahead_5)
-price_return_10 = get_return_lookahead(close, lookahead_10)
-price_return_20 = get_return_lookahead(close, lookahead_20)
+# Calculate the returns of every lookahead from a single log of the close prices
+price_return_cube = lookahead.lookahead_returns(close.values, lookahead_days)
+price_return_5, price_return_10, price_return_20 = [
+    pd.DataFrame(price_return, close.index, close.columns)
+    for price_return in price_return_cube
+]
 project_helper.plot_price_returns(
     close[apple_ticker].iloc[150:250],
     [
@@ -429,19 +436,29 @@ def get_signal_return(signal, lookahead_returns):
 
     Parameters
     ----------
-    signal : DataFrame
+    signal : DataFrame or Ndarray
         The long, short, and do nothing signals for each ticker and date
-    lookahead_returns : DataFrame
+    lookahead_returns : DataFrame or Ndarray
         The lookahead log returns for each ticker and date
 
     Returns
     -------
-    signal_return : DataFrame
+    signal_return : DataFrame or Ndarray
         Signal returns for each ticker and date
     """
     # TODO: Implement function
+    if isinstance(signal, pd.DataFrame) and isinstance(lookahead_returns, pd.DataFrame):
+        signals.aligned_values(signal, lookahead_returns)
 
-    return signal * lookahead_returns
+    signal_return = signals.signal_returns(
+        np.asarray(signal), np.asarray(lookahead_returns)
+    )
+
+    if isinstance(lookahead_returns, pd.DataFrame):
+        signal_return = pd.DataFrame(
+            signal_return, lookahead_returns.index, lookahead_returns.columns
+        )
+    return signal_return
 
 
 project_tests.test_get_signal_return(get_signal_return)
@@ -454,9 +471,12 @@ project_tests.test_get_signal_return(get_signal_return)
 
 
 title_string = "{} day LookaheadSignal Returns for {} Stock"
-signal_return_5 = get_signal_return(signal_5, price_return_5)
-signal_return_10 = get_signal_return(signal_10, price_return_10)
-signal_return_20 = get_signal_return(signal_20, price_return_20)
+signal_cube = np.stack([signal_5.values, signal_10.values, signal_20.values])
+signal_return_cube = get_signal_return(signal_cube, price_return_cube)
+signal_return_5, signal_return_10, signal_return_20 = [
+    pd.DataFrame(signal_return, close.index, close.columns)
+    for signal_return in signal_return_cube
+]
 project_helper.plot_signal_returns(
     close[apple_ticker],
     [
@@ -511,22 +531,12 @@ project_helper.plot_signal_to_normal_histograms(
 # In[20]:
 
 
-# Filter out returns that don't have a long or short signal.
-long_short_signal_returns_5 = signal_return_5[signal_5 != 0].stack()
-long_short_signal_returns_10 = signal_return_10[signal_10 != 0].stack()
-long_short_signal_returns_20 = signal_return_20[signal_20 != 0].stack()
-
-# Get just ticker and signal return
-long_short_signal_returns_5 = long_short_signal_returns_5.reset_index().iloc[:, [1, 2]]
-long_short_signal_returns_5.columns = ["ticker", "signal_return"]
-long_short_signal_returns_10 = long_short_signal_returns_10.reset_index().iloc[
-    :, [1, 2]
-]
-long_short_signal_returns_10.columns = ["ticker", "signal_return"]
-long_short_signal_returns_20 = long_short_signal_returns_20.reset_index().iloc[
-    :, [1, 2]
-]
-long_short_signal_returns_20.columns = ["ticker", "signal_return"]
+# Get just ticker and signal return of the returns with a long or short signal
+(
+    long_short_signal_returns_5,
+    long_short_signal_returns_10,
+    long_short_signal_returns_20,
+) = signals.signal_return_frames(signal_cube, signal_return_cube, close.columns)
 
 # View some of the data
 long_short_signal_returns_5.head(10)
@@ -541,9 +551,6 @@ long_short_signal_returns_5.head(10)
 # In[21]:
 
 
-from scipy.stats import kstest
-
-
 def calculate_kstest(long_short_signal_returns):
     """
     Calculate the KS-Test against the signal returns with a long or short signal.
@@ -562,18 +569,13 @@ def calculate_kstest(long_short_signal_returns):
         P value for all the tickers
     """
     # TODO: Implement function
-    long_short_signal_returns_grouped = long_short_signal_returns.groupby("ticker")
-
-    ks_values = pd.Series()
-    p_values = pd.Series()
-    args = (long_short_signal_returns.mean(), long_short_signal_returns.std(ddof=0))
-    for ticker, signal in long_short_signal_returns_grouped:
-        test_stat, p_value = kstest(
-            signal["signal_return"].values, cdf="norm", args=args
-        )
-        ks_values[ticker] = test_stat
-        p_values[ticker] = p_value
-    return ks_values, p_values
+    signal_returns = long_short_signal_returns["signal_return"]
+    return kstest.grouped_normal_kstest(
+        long_short_signal_returns["ticker"],
+        signal_returns,
+        signal_returns.mean(),
+        signal_returns.std(ddof=0),
+    )
 
 
 project_tests.test_calculate_kstest(calculate_kstest)
@@ -625,14 +627,14 @@ def find_outliers(ks_values, p_values, ks_threshold, pvalue_threshold=0.05):
         Symbols that are outliers
     """
     # TODO: Implement function
+    is_outlier = outliers.outlier_masks(
+        ks_values.values,
+        p_values.reindex(ks_values.index).values,
+        ks_threshold,
+        pvalue_threshold,
+    )
 
-    tickers = (ks_values > ks_threshold) & (p_values < pvalue_threshold)
-
-    outliers = set()
-    for i in range(len(tickers)):
-        if tickers[i] == True:
-            outliers.add(tickers.index[i])
-    return outliers
+    return set(ks_values.index[is_outlier])
 
 
 project_tests.test_find_outliers(find_outliers)
@@ -645,11 +647,18 @@ project_tests.test_find_outliers(find_outliers)
 
 
 ks_threshold = 0.8
-outliers_5 = find_outliers(ks_values_5, p_values_5, ks_threshold)
-outliers_10 = find_outliers(ks_values_10, p_values_10, ks_threshold)
-outliers_20 = find_outliers(ks_values_20, p_values_20, ks_threshold)
 
-outlier_tickers = outliers_5.union(outliers_10).union(outliers_20)
+# Screen the tickers of every lookahead at once
+ks_matrix, p_matrix = [
+    np.stack([values.reindex(close.columns).values for values in lookahead_values])
+    for lookahead_values in [
+        (ks_values_5, ks_values_10, ks_values_20),
+        (p_values_5, p_values_10, p_values_20),
+    ]
+]
+outlier_masks = outliers.outlier_masks(ks_matrix, p_matrix, ks_threshold)
+
+outlier_tickers = set(close.columns[outlier_masks.any(axis=0)])
 print(
     "{} Outliers Found:\n{}".format(
         len(outlier_tickers), ", ".join(list(outlier_tickers))
@@ -663,14 +672,12 @@ print(
 # In[25]:
 
 
-good_tickers = list(set(close.columns) - outlier_tickers)
+good_signal_return_cube = outliers.drop_tickers(
+    signal_return_cube, outlier_masks.any(axis=0)
+)
 
 project_helper.plot_signal_to_normal_histograms(
-    [
-        signal_return_5[good_tickers],
-        signal_return_10[good_tickers],
-        signal_return_20[good_tickers],
-    ],
+    list(good_signal_return_cube),
     "Signal Return Without Outliers",
     ("5 Days", "10 Days", "20 Days"),
 )
@@ -272,7 +272,7 @@ def plot_signal_returns(prices, signal_return_list, titles):
 def plot_signal_histograms(signal_list, title, subplot_titles):
     assert len(signal_list) == len(subplot_titles)
 
-    signal_series_list = [signal.stack() for signal in signal_list]
+    signal_series_list = [pd.Series(np.ravel(signal)) for signal in signal_list]
     all_values = pd.concat(signal_series_list)
     x_range = [all_values.min(), all_values.max()]
     y_range = [0, 1500]
@@ -304,7 +304,7 @@ def plot_signal_histograms(signal_list, title, subplot_titles):
 def plot_signal_to_normal_histograms(signal_list, title, subplot_titles):
     assert len(signal_list) == len(subplot_titles)
 
-    signal_series_list = [signal.stack() for signal in signal_list]
+    signal_series_list = [pd.Series(np.ravel(signal)) for signal in signal_list]
     all_values = pd.concat(signal_series_list)
     x_range = [all_values.min(), all_values.max()]
     y_range = [0, 1500]
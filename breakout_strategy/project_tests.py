@@ -114,7 +114,10 @@ def test_get_long_short(fn):
             (
                 "long_short",
                 pd.DataFrame(
-                    [[0, 0, 0], [-1, -1, -1], [1, 1, -1], [0, 0, 0]], dates, tickers
+                    [[0, 0, 0], [-1, -1, -1], [1, 1, -1], [0, 0, 0]],
+                    dates,
+                    tickers,
+                    dtype=np.int8,
                 ),
             )
         ]
@@ -166,6 +169,7 @@ def test_filter_signals(fn):
                     ],
                     dates,
                     tickers,
+                    dtype=np.int8,
                 ),
             )
         ]
@@ -54,6 +54,15 @@ import numpy as np
 import helper
 import project_helper
 import project_tests
+from quant_engine import (
+    covariance,
+    optimizer,
+    price_store,
+    ranking,
+    rebalance,
+    risk_model,
+    weights,
+)
 
 
 # ## Market Data
@@ -63,17 +72,19 @@ import project_tests
 # In[ ]:
 
 
-df = pd.read_csv("../../data/project_3/eod-quotemedia.csv")
+prices = price_store.load_csv(
+    "../../data/project_3/eod-quotemedia.csv", ["adj_close", "adj_volume", "dividends"]
+)
 
 percent_top_dollar = 0.2
-high_volume_symbols = project_helper.large_dollar_volume_stocks(
-    df, "adj_close", "adj_volume", percent_top_dollar
+dollar_traded = (prices["adj_close"] * prices["adj_volume"]).sum()
+high_volume_symbols = ranking.top_n_labels(
+    dollar_traded, int(len(dollar_traded) * percent_top_dollar)
 )
-df = df[df["ticker"].isin(high_volume_symbols)]
 
-close = df.reset_index().pivot(index="date", columns="ticker", values="adj_close")
-volume = df.reset_index().pivot(index="date", columns="ticker", values="adj_volume")
-dividends = df.reset_index().pivot(index="date", columns="ticker", values="dividends")
+close = prices["adj_close"][high_volume_symbols]
+volume = prices["adj_volume"][high_volume_symbols]
+dividends = prices["dividends"][high_volume_symbols]
 
 
 # ### View Data
@@ -143,15 +154,7 @@ def generate_dollar_volume_weights(close, volume):
 
     # TODO: Implement function
 
-    tickers_sum = []
-    for i in range(len(close)):
-        tickers_sum.append(sum(close.values[i] * volume.values[i]))
-
-    dollar_volume_weights = close * volume
-    for i in range(len(close)):
-        dollar_volume_weights.iloc[i] = dollar_volume_weights.iloc[i] / tickers_sum[i]
-
-    return dollar_volume_weights
+    return weights.dollar_volume_weights(close, volume)
 
 
 project_tests.test_generate_dollar_volume_weights(generate_dollar_volume_weights)
@@ -212,7 +215,7 @@ def calculate_dividend_weights(dividends):
     """
     # TODO: Implement function
 
-    return dividends.cumsum().div(dividends.cumsum().sum(axis=1), axis=0)
+    return weights.dividend_weights(dividends)
 
 
 project_tests.test_calculate_dividend_weights(calculate_dividend_weights)
@@ -435,7 +438,7 @@ print("Smart Beta Tracking Error: {}".format(smart_beta_tracking_error))
 # In[ ]:
 
 
-def get_covariance_returns(returns):
+def get_covariance_returns(returns, n_factors=None):
     """
     Calculate covariance matrices.
 
@@ -443,15 +446,21 @@ def get_covariance_returns(returns):
     ----------
     returns : DataFrame
         Returns for each ticker and date
+    n_factors : int
+        The number of factors of a PCA factor risk model to return instead of
+        the sample covariance, for universes too large for a dense covariance
 
     Returns
     -------
-    returns_covariance  : 2 dimensional Ndarray
+    returns_covariance  : 2 dimensional Ndarray or FactorRiskModel
         The covariance of the returns
     """
     # TODO: Implement function
 
-    return np.cov(returns.fillna(0).T)
+    if n_factors is not None:
+        return risk_model.fit_pca_risk_model(returns.fillna(0).values, n_factors)
+
+    return covariance.covariance(returns.fillna(0).values)
 
 
 project_tests.test_get_covariance_returns(get_covariance_returns)
@@ -525,18 +534,23 @@ project_helper.plot_covariance_returns_correlation(
 import cvxpy as cvx
 
 
-def get_optimal_weights(covariance_returns, index_weights, scale=2.0):
+def get_optimal_weights(
+    covariance_returns, index_weights, scale=2.0, method="projected_gradient"
+):
     """
     Find the optimal weights.
 
     Parameters
     ----------
-    covariance_returns : 2 dimensional Ndarray
+    covariance_returns : 2 dimensional Ndarray or FactorRiskModel
         The covariance of the returns
     index_weights : Pandas Series
         Index weights for all tickers at a period in time
     scale : int
         The penalty factor for weights the deviate from the index
+    method : str
+        "projected_gradient" for the specialized solver, which falls back to
+        cvxpy when it doesn't converge, or "cvxpy"
     Returns
     -------
     x : 1 dimensional Ndarray
@@ -551,32 +565,12 @@ def get_optimal_weights(covariance_returns, index_weights, scale=2.0):
     )
 
     # TODO: Implement function
-    m = len(covariance_returns)
-
-    # x variables (to be found with optimization)
-    x = cvx.Variable(m)
-
-    # portfolio variance, in quadratic form
-    portfolio_variance = cvx.quad_form(x, covariance_returns)
-
-    # euclidean distance (L2 norm) between portfolio and index weights
-    distance_to_index = cvx.norm(x - index_weights, p=2, axis=None)
-
-    # objective function
-    objective = objective = cvx.Minimize(portfolio_variance + scale * distance_to_index)
 
-    # constraints
-    constraints = [x >= 0, sum(x) == 1]
-
-    # use cvxpy to solve the objective
-    problem = cvx.Problem(objective, constraints)
-
-    min_value = problem.solve()
-
-    # retrieve the weights of the optimized portfolio
-    x_values = x.value
-
-    return x_values
+    # Minimize the portfolio variance plus the scaled L2 distance to the
+    # index weights, with the weights long only and summing to 1
+    return optimizer.tracking_weights(
+        covariance_returns, index_weights, scale, method=method
+    )
 
 
 project_tests.test_get_optimal_weights(get_optimal_weights)
@@ -619,6 +613,61 @@ optim_etf_tracking_error = tracking_error(
 print("Optimized ETF Tracking Error: {}".format(optim_etf_tracking_error))
 
 
+# ### Tracking Error Across Scales
+# The `scale` sets how closely the ETF follows the index. `get_optimal_weights_batch` solves for several scales (or several sets of index weights) with the same covariance in a single call.
+
+# In[ ]:
+
+
+def get_optimal_weights_batch(covariance_returns, index_weights, scales):
+    """
+    Find the optimal weights for several index weights and scales at once.
+
+    Parameters
+    ----------
+    covariance_returns : 2 dimensional Ndarray or FactorRiskModel
+        The covariance of the returns
+    index_weights : Pandas Series or 2 dimensional Ndarray
+        Index weights for all tickers, the same for every scale or a row
+        for each
+    scales : list of float
+        The penalty factors for weights the deviate from the index
+    Returns
+    -------
+    x : 2 dimensional Ndarray
+        The solution for x of each scale
+    """
+    assert len(covariance_returns.shape) == 2
+    assert covariance_returns.shape[0] == covariance_returns.shape[1]
+
+    return optimizer.batch_tracking_weights(
+        covariance_returns, np.asarray(index_weights), scales
+    )
+
+
+scales = [0.5, 1.0, 2.0, 4.0, 8.0]
+scale_optimal_weights = get_optimal_weights_batch(
+    covariance_returns.values, index_weights.iloc[-1], scales
+)
+for scale, scale_weights in zip(scales, scale_optimal_weights):
+    scale_etf_returns = generate_weighted_returns(
+        returns,
+        pd.DataFrame(
+            np.tile(scale_weights, (len(returns.index), 1)),
+            returns.index,
+            returns.columns,
+        ),
+    )
+    print(
+        "Scale {}: Tracking Error {}".format(
+            scale,
+            tracking_error(
+                np.sum(index_weighted_returns, 1), np.sum(scale_etf_returns, 1)
+            ),
+        )
+    )
+
+
 # ## Rebalance Portfolio Over Time
 # The single optimized ETF portfolio used the same weights for the entire history. This might not be the optimal weights for the entire period. Let's rebalance the portfolio over the same period instead of using the same weights. Implement `rebalance_portfolio` to rebalance a portfolio.
 #
@@ -627,7 +676,9 @@ print("Optimized ETF Tracking Error: {}".format(optim_etf_tracking_error))
 # In[ ]:
 
 
-def rebalance_portfolio(returns, index_weights, shift_size, chunk_size):
+def rebalance_portfolio(
+    returns, index_weights, shift_size, chunk_size, n_workers=1, n_factors=None
+):
     """
     Get weights for each rebalancing of the portfolio.
 
@@ -641,6 +692,11 @@ def rebalance_portfolio(returns, index_weights, shift_size, chunk_size):
         The number of days between each rebalance
     chunk_size : int
         The number of days to look in the past for rebalancing
+    n_workers : int
+        The number of processes solving the rebalances in parallel
+    n_factors : int
+        The number of factors of a PCA factor risk model to use instead of the
+        sample covariance, for large universes
 
     Returns
     -------
@@ -654,14 +710,16 @@ def rebalance_portfolio(returns, index_weights, shift_size, chunk_size):
 
     # TODO: Implement function
 
-    rebalanced_weights = []
-    for i in range(chunk_size, len(returns), shift_size):
-        new_returns = returns.iloc[i - chunk_size : i]
-        new_cov = get_covariance_returns(new_returns)
-        new_weights = get_optimal_weights(new_cov, index_weights.iloc[i - 1])
-        rebalanced_weights.append(new_weights)
-
-    return rebalanced_weights
+    # Each worker builds the problem once and slides its covariance window
+    # forward, only updating the problem parameters for each rebalance
+    return rebalance.rebalance_weights(
+        returns.fillna(0).values,
+        index_weights.values,
+        shift_size,
+        chunk_size,
+        n_workers,
+        n_factors=n_factors,
+    )
 
 
 project_tests.test_rebalance_portfolio(rebalance_portfolio)
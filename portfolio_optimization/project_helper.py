@@ -1,5 +1,6 @@
 import helper
 import numpy as np
+from quant_engine import ranking
 from IPython.core.display import display, HTML
 import plotly.graph_objs as go
 import plotly.figure_factory as ff
@@ -82,17 +83,13 @@ def large_dollar_volume_stocks(df, price_column, volume_column, top_percent):
     Returns
     -------
     large_dollar_volume_stocks_symbols : List of str
-        List of of large dollar volume stock symbols
+        List of of large dollar volume stock symbols, in ticker order
     """
-    dollar_traded = df.groupby("ticker").apply(
-        lambda row: sum(row[volume_column] * row[price_column])
-    )
+    dollar_traded = (df[volume_column] * df[price_column]).groupby(df["ticker"]).sum()
 
-    return (
-        dollar_traded.sort_values()
-        .tail(int(len(dollar_traded) * top_percent))
-        .index.values.tolist()
-    )
+    return ranking.top_n_labels(
+        dollar_traded, int(len(dollar_traded) * top_percent)
+    ).tolist()
 
 
 def plot_benchmark_returns(benchmark_data, etf_data, title):
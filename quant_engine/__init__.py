@@ -0,0 +1,4 @@
+"""
+Vectorized building blocks shared by the trading projects and the course
+exercises.
+"""
@@ -0,0 +1,79 @@
+"""
+Time the rolling kernels of `quant_engine.rolling` against pandas rolling.
+
+Each statistic is computed for several window lengths over a matrix of
+random walk prices, by pandas one window at a time and by the kernels in one
+call writing into a preallocated buffer.
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import rolling
+
+
+def benchmark_cases(close, windows):
+    """
+    Get the pandas and kernel functions to time.
+
+    Parameters
+    ----------
+    close : DataFrame
+        Close prices for each ticker and date
+    windows : list of int
+        The number of dates in each window
+
+    Returns
+    -------
+    cases : list of tuple
+        The name and function of each case
+    """
+    buffer = np.empty((len(windows),) + close.shape)
+    cases = []
+    for statistic in ["sum", "mean", "var", "max", "min"]:
+        kernel = getattr(rolling, "rolling_" + statistic)
+        cases.append(
+            (
+                "pandas rolling " + statistic,
+                lambda statistic=statistic: [
+                    getattr(close.rolling(window), statistic)() for window in windows
+                ],
+            )
+        )
+        cases.append(
+            (
+                "rolling_" + statistic,
+                lambda kernel=kernel: kernel(close.values, windows, out=buffer),
+            )
+        )
+
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-dates", type=int, default=2520)
+    parser.add_argument("--n-tickers", type=int, default=500)
+    parser.add_argument("--windows", type=int, nargs="+", default=[5, 20, 60, 120])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random_state = np.random.RandomState(args.seed)
+    close = pd.DataFrame(
+        100
+        + np.cumsum(random_state.normal(size=(args.n_dates, args.n_tickers)), axis=0)
+    )
+
+    for name, run_case in benchmark_cases(close, args.windows):
+        print(
+            "{:>20}: {:.1f} ms".format(
+                name, 1000 * min(timeit.repeat(run_case, number=1, repeat=args.repeat))
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import os
+
+import numpy as np
+
+from quant_engine import debounce, extremes
+
+
+class BreakoutSignalState:
+    """
+    Breakout signals and signal returns, updated one date at a time.
+
+    Follows the batch steps of the breakout strategy, `get_high_lows_lookback`,
+    `get_long_short`, `filter_signals` and `get_signal_return`, keeping only
+    what the next date needs: the lookback extremes, the signal cooldowns of
+    each lookahead and the signals and log prices of the dates still waiting
+    for their lookahead price. Each update is O(tickers), and the state can be
+    saved and restored so a restarted process resumes without replaying the
+    history.
+
+    Parameters
+    ----------
+    n_tickers : int
+        The number of tickers in each row of prices
+    lookback_days : int
+        The number of days to look back for the highs and lows
+    lookahead_days : list of int
+        The numbers of days to look ahead, each also the signal filter window
+    """
+
+    def __init__(self, n_tickers, lookback_days, lookahead_days):
+        self.lookback_days = lookback_days
+        self.lookahead_days = list(lookahead_days)
+        self.n_dates = 0
+
+        self.high_lows = extremes.LookbackHighLow(n_tickers, lookback_days)
+        self.debouncers = [
+            debounce.SignalDebouncer(n_tickers, days) for days in self.lookahead_days
+        ]
+
+        # Ring buffers of the dates waiting for their lookahead price
+        n_pending = max(self.lookahead_days)
+        self.pending_dates = np.full(n_pending, np.datetime64("NaT"), "datetime64[ns]")
+        self.pending_log_close = np.full((n_pending, n_tickers), np.nan)
+        self.pending_signals = np.zeros(
+            (n_pending, len(self.lookahead_days), n_tickers), dtype=np.int8
+        )
+
+    def update(self, date, close_row, high_row, low_row):
+        """
+        Add the prices of a new date.
+
+        Parameters
+        ----------
+        date : datetime64 or Timestamp
+            The new date
+        close_row : 1 dimensional Ndarray
+            Close price for each ticker
+        high_row : 1 dimensional Ndarray
+            High price for each ticker
+        low_row : 1 dimensional Ndarray
+            Low price for each ticker
+
+        Returns
+        -------
+        signals : 2 dimensional Ndarray of int8
+            The filtered long, short, and do nothing signals of the new date
+            for each lookahead and ticker
+        signal_returns : 2 dimensional Ndarray
+            The signal returns resolved by the new date for each lookahead and
+            ticker, those of the signals made that many days before it. NaN
+            until there are enough dates.
+        signal_dates : 1 dimensional Ndarray of datetime64
+            The date of the signals resolved for each lookahead, NaT until
+            there are enough dates
+        """
+        close_row = np.asarray(close_row, dtype=np.float64)
+        lookback_high, lookback_low = self.high_lows.update(high_row, low_row)
+
+        with np.errstate(invalid="ignore"):
+            long_short = (close_row > lookback_high).astype(np.int8) - (
+                close_row < lookback_low
+            )
+            log_close = np.log(close_row)
+        signals = np.stack(
+            [debouncer.update(long_short) for debouncer in self.debouncers]
+        )
+
+        n_pending = len(self.pending_dates)
+        signal_returns = np.full(signals.shape, np.nan)
+        signal_dates = np.full(
+            len(self.lookahead_days), np.datetime64("NaT"), "datetime64[ns]"
+        )
+        for lookahead_i, days in enumerate(self.lookahead_days):
+            if self.n_dates >= days:
+                slot = (self.n_dates - days) % n_pending
+                signal_returns[lookahead_i] = self.pending_signals[
+                    slot, lookahead_i
+                ] * (log_close - self.pending_log_close[slot])
+                signal_dates[lookahead_i] = self.pending_dates[slot]
+
+        slot = self.n_dates % n_pending
+        self.pending_dates[slot] = np.datetime64(date, "ns")
+        self.pending_log_close[slot] = log_close
+        self.pending_signals[slot] = signals
+        self.n_dates += 1
+
+        return signals, signal_returns, signal_dates
+
+    def save(self, path):
+        """
+        Save the state to a file.
+
+        The file is written next to `path` first and then moved over it, so a
+        crash while saving leaves the previous snapshot intact.
+
+        Parameters
+        ----------
+        path : str
+            The ".npz" file to write
+        """
+        highs, lows = self.high_lows.highs, self.high_lows.lows
+        temp_path = path + ".tmp.npz"
+        np.savez(
+            temp_path,
+            lookback_days=self.lookback_days,
+            lookahead_days=self.lookahead_days,
+            n_dates=self.n_dates,
+            high_n_rows=highs.n_rows,
+            high_block=highs.block,
+            high_block_extremum=highs.block_extremum,
+            high_previous_suffix=highs.previous_suffix,
+            low_n_rows=lows.n_rows,
+            low_block=lows.block,
+            low_block_extremum=lows.block_extremum,
+            low_previous_suffix=lows.previous_suffix,
+            lookback_high=self.high_lows.lookback_high,
+            lookback_low=self.high_lows.lookback_low,
+            long_cooldown=[debouncer.long_cooldown for debouncer in self.debouncers],
+            short_cooldown=[debouncer.short_cooldown for debouncer in self.debouncers],
+            pending_dates=self.pending_dates,
+            pending_log_close=self.pending_log_close,
+            pending_signals=self.pending_signals,
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restore a state saved by `save`.
+
+        Parameters
+        ----------
+        path : str
+            The ".npz" file to read
+
+        Returns
+        -------
+        state : BreakoutSignalState
+            The state as it was saved
+        """
+        with np.load(path) as saved:
+            state = cls(
+                saved["pending_log_close"].shape[1],
+                int(saved["lookback_days"]),
+                saved["lookahead_days"].tolist(),
+            )
+            state.n_dates = int(saved["n_dates"])
+
+            for prefix, rolling in [
+                ("high", state.high_lows.highs),
+                ("low", state.high_lows.lows),
+            ]:
+                rolling.n_rows = int(saved[prefix + "_n_rows"])
+                rolling.block = saved[prefix + "_block"]
+                rolling.block_extremum = saved[prefix + "_block_extremum"]
+                rolling.previous_suffix = saved[prefix + "_previous_suffix"]
+            state.high_lows.lookback_high = saved["lookback_high"]
+            state.high_lows.lookback_low = saved["lookback_low"]
+
+            for debouncer, long_cooldown, short_cooldown in zip(
+                state.debouncers, saved["long_cooldown"], saved["short_cooldown"]
+            ):
+                debouncer.long_cooldown = long_cooldown
+                debouncer.short_cooldown = short_cooldown
+
+            state.pending_dates = saved["pending_dates"]
+            state.pending_log_close = saved["pending_log_close"]
+            state.pending_signals = saved["pending_signals"]
+
+        return state
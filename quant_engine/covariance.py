@@ -0,0 +1,110 @@
+import numpy as np
+
+
+def covariance(returns):
+    """
+    Calculate the sample covariance of returns.
+
+    Parameters
+    ----------
+    returns : 2 dimensional Ndarray
+        Returns with a row for each date and a column for each ticker
+
+    Returns
+    -------
+    returns_covariance : 2 dimensional Ndarray
+        The covariance of the returns, the same as `np.cov(returns.T)`
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    centered = returns - returns.mean(axis=0)
+
+    return centered.T.dot(centered) / (len(returns) - 1)
+
+
+class RollingCovariance:
+    """
+    Covariance of a window of returns that slides forward through the dates.
+
+    The sums of the returns and of their outer products are kept for the
+    current window. Moving the window forward adds the rows that enter it and
+    subtracts the rows that leave it, instead of recomputing the covariance of
+    the whole window. The sums are taken relative to the window mean of the
+    last exact computation, and are recomputed exactly every
+    `recompute_every` updates to bound the floating point drift.
+
+    Parameters
+    ----------
+    returns : 2 dimensional Ndarray
+        Returns with a row for each date and a column for each ticker
+    window_size : int
+        The number of dates in each window
+    recompute_every : int
+        The number of incremental updates between exact computations
+    """
+
+    def __init__(self, returns, window_size, recompute_every=50):
+        assert window_size > 1
+        assert recompute_every > 0
+
+        self.returns = np.asarray(returns, dtype=np.float64)
+        self.window_size = window_size
+        self.recompute_every = recompute_every
+
+        self.end = None
+        self.offset = None
+        self.returns_sum = None
+        self.outer_sum = None
+        self.updates = 0
+
+    def _recompute(self, end):
+        window = self.returns[end - self.window_size : end]
+        self.offset = window.mean(axis=0)
+        centered = window - self.offset
+
+        self.returns_sum = centered.sum(axis=0)
+        self.outer_sum = centered.T.dot(centered)
+        self.end = end
+        self.updates = 0
+
+    def _update(self, end):
+        entering = self.returns[self.end : end] - self.offset
+        leaving = (
+            self.returns[self.end - self.window_size : end - self.window_size]
+            - self.offset
+        )
+
+        self.returns_sum += entering.sum(axis=0) - leaving.sum(axis=0)
+        self.outer_sum += entering.T.dot(entering) - leaving.T.dot(leaving)
+        self.end = end
+        self.updates += 1
+
+    def covariance(self, end):
+        """
+        Calculate the covariance of the window ending before date `end`.
+
+        Parameters
+        ----------
+        end : int
+            Position of the first date after the window
+
+        Returns
+        -------
+        returns_covariance : 2 dimensional Ndarray
+            The covariance of the returns in `returns[end - window_size : end]`
+        """
+        assert self.window_size <= end <= len(self.returns)
+
+        is_incremental = (
+            self.end is not None
+            and self.end < end < self.end + self.window_size
+            and self.updates < self.recompute_every
+        )
+        if is_incremental:
+            self._update(end)
+        elif end != self.end:
+            self._recompute(end)
+
+        n_dates = self.window_size
+        return (
+            self.outer_sum - np.outer(self.returns_sum, self.returns_sum) / n_dates
+        ) / (n_dates - 1)
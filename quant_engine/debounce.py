@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class SignalDebouncer:
+    """
+    Keep at most one long and one short signal per ticker in a window of days.
+
+    After a signal is let through, further signals of the same side are cleared
+    for the next `window_size` days. Long and short signals are tracked
+    independently with one "cooldown remaining" counter per ticker and side.
+
+    Parameters
+    ----------
+    n_tickers : int
+        The number of tickers in each row of signals
+    window_size : int
+        The number of days to have a single signal
+    """
+
+    def __init__(self, n_tickers, window_size):
+        assert window_size >= 0
+
+        self.window_size = window_size
+        self.long_cooldown = np.zeros(n_tickers, dtype=np.int64)
+        self.short_cooldown = np.zeros(n_tickers, dtype=np.int64)
+
+    def update(self, signal_row):
+        """
+        Clear the signals of a single date.
+
+        Parameters
+        ----------
+        signal_row : 1 dimensional Ndarray
+            The long, short, and do nothing signals for each ticker
+
+        Returns
+        -------
+        filtered_row : 1 dimensional Ndarray of int8
+            The filtered long, short, and do nothing signals for each ticker
+        """
+        signal_row = np.asarray(signal_row)
+        is_long = (signal_row > 0) & (self.long_cooldown == 0)
+        is_short = (signal_row < 0) & (self.short_cooldown == 0)
+
+        self.long_cooldown = np.where(
+            is_long, self.window_size, np.maximum(self.long_cooldown - 1, 0)
+        )
+        self.short_cooldown = np.where(
+            is_short, self.window_size, np.maximum(self.short_cooldown - 1, 0)
+        )
+
+        return is_long.astype(np.int8) - is_short.astype(np.int8)
+
+
+def debounce_signals(signal, window_size):
+    """
+    Clear out signals so there is a single signal within the window size.
+
+    The whole date x ticker matrix is processed in one forward scan over the
+    dates, handling long and short signals in the same pass.
+
+    Parameters
+    ----------
+    signal : 1 or 2 dimensional Ndarray
+        The long, short, and do nothing signals for each date (and ticker)
+    window_size : int
+        The number of days to have a single signal
+
+    Returns
+    -------
+    filtered_signal : Ndarray of int8
+        The filtered long, short, and do nothing signals, same shape as `signal`
+    """
+    signal = np.asarray(signal)
+    is_series = signal.ndim == 1
+    signal = signal.reshape(len(signal), -1)
+
+    filtered_signal = np.empty(signal.shape, dtype=np.int8)
+    debouncer = SignalDebouncer(signal.shape[1], window_size)
+    for date_i, signal_row in enumerate(signal):
+        filtered_signal[date_i] = debouncer.update(signal_row)
+
+    return filtered_signal[:, 0] if is_series else filtered_signal
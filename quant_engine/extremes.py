@@ -0,0 +1,200 @@
+"""
+Rolling maximum and minimum over a window of dates.
+
+A monotonic deque per ticker pops a different number of entries for each
+ticker on every date, so it can't be run across all the tickers at once.
+Instead the dates are cut into blocks of `window_size` (van Herk/Gil-Werman).
+Every window spans the end of one block and the start of the next, so its
+extremum is the extremum of a suffix of one block and a prefix of the next.
+The prefix and suffix extremes are cumulative reductions over all the tickers
+at once, the same amortized O(1) work per date and ticker as a deque.
+"""
+import numpy as np
+
+
+def rolling_extremum(values, window_size, ufunc):
+    """
+    Reduce `values` over the trailing window of each date.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date
+    window_size : int
+        The number of dates in each window
+    ufunc : ufunc
+        `np.maximum` or `np.minimum`
+
+    Returns
+    -------
+    extremes : Ndarray
+        The extremum of each window ending at each date, NaN where the window
+        isn't full or holds a NaN, like `rolling(window_size).max()`
+    """
+    assert window_size > 0
+
+    values = np.asarray(values, dtype=np.float64)
+    n_dates = len(values)
+    extremes = np.full(values.shape, np.nan)
+    if n_dates < window_size:
+        return extremes
+
+    n_blocks = -(-n_dates // window_size)
+    padded = np.full((n_blocks * window_size,) + values.shape[1:], np.nan)
+    padded[:n_dates] = values
+    blocks = padded.reshape((n_blocks, window_size) + values.shape[1:])
+
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    ufunc(
+        suffix[: n_dates - window_size + 1],
+        prefix[window_size - 1 : n_dates],
+        out=extremes[window_size - 1 :],
+    )
+
+    return extremes
+
+
+def rolling_max(values, window_size):
+    """
+    Get the maximum of the trailing window of each date.
+    """
+    return rolling_extremum(values, window_size, np.maximum)
+
+
+def rolling_min(values, window_size):
+    """
+    Get the minimum of the trailing window of each date.
+    """
+    return rolling_extremum(values, window_size, np.minimum)
+
+
+def _lookback_extremum(values, lookback_days, ufunc):
+    values = np.asarray(values, dtype=np.float64)
+    extremes = np.full(values.shape, np.nan)
+    extremes[1:] = rolling_extremum(values[:-1], lookback_days, ufunc)
+
+    return extremes
+
+
+def lookback_max(values, lookback_days):
+    """
+    Get the maximum of the `lookback_days` dates before each date.
+    """
+    return _lookback_extremum(values, lookback_days, np.maximum)
+
+
+def lookback_min(values, lookback_days):
+    """
+    Get the minimum of the `lookback_days` dates before each date.
+    """
+    return _lookback_extremum(values, lookback_days, np.minimum)
+
+
+class RollingExtremum:
+    """
+    Extremum of the trailing window of a stream of rows.
+
+    The streaming form of `rolling_extremum`. The rows of the current block
+    are kept with their running extremum, and the suffix extremes of the
+    previous block are computed once when the current block fills up.
+
+    Parameters
+    ----------
+    n_columns : int
+        The number of values in each row, like the number of tickers
+    window_size : int
+        The number of rows in each window
+    ufunc : ufunc
+        `np.maximum` or `np.minimum`
+    """
+
+    def __init__(self, n_columns, window_size, ufunc):
+        assert window_size > 0
+
+        self.window_size = window_size
+        self.ufunc = ufunc
+        self.n_rows = 0
+        self.block = np.full((window_size, n_columns), np.nan)
+        self.block_extremum = np.full(n_columns, np.nan)
+        self.previous_suffix = np.full((window_size, n_columns), np.nan)
+
+    def update(self, row):
+        """
+        Add a row to the window.
+
+        Parameters
+        ----------
+        row : 1 dimensional Ndarray
+            The values of the new date
+
+        Returns
+        -------
+        extremum : 1 dimensional Ndarray
+            The extremum of the last `window_size` rows, NaN until there are
+            enough rows
+        """
+        position = self.n_rows % self.window_size
+        self.block[position] = row
+        if position:
+            self.ufunc(self.block_extremum, row, out=self.block_extremum)
+        else:
+            self.block_extremum[:] = row
+        self.n_rows += 1
+
+        if position == self.window_size - 1:
+            extremum = self.block_extremum.copy()
+            self.ufunc.accumulate(
+                self.block[::-1], axis=0, out=self.previous_suffix[::-1]
+            )
+        elif self.n_rows < self.window_size:
+            extremum = np.full(self.block_extremum.shape, np.nan)
+        else:
+            extremum = self.ufunc(
+                self.previous_suffix[position + 1], self.block_extremum
+            )
+
+        return extremum
+
+
+class LookbackHighLow:
+    """
+    Lookback high and low of each ticker, updated one date at a time.
+
+    Parameters
+    ----------
+    n_tickers : int
+        The number of tickers in each row of prices
+    lookback_days : int
+        The number of days to look back
+    """
+
+    def __init__(self, n_tickers, lookback_days):
+        self.highs = RollingExtremum(n_tickers, lookback_days, np.maximum)
+        self.lows = RollingExtremum(n_tickers, lookback_days, np.minimum)
+        self.lookback_high = np.full(n_tickers, np.nan)
+        self.lookback_low = np.full(n_tickers, np.nan)
+
+    def update(self, high_row, low_row):
+        """
+        Add the high and low prices of a new date.
+
+        Parameters
+        ----------
+        high_row : 1 dimensional Ndarray
+            High price for each ticker
+        low_row : 1 dimensional Ndarray
+            Low price for each ticker
+
+        Returns
+        -------
+        lookback_high : 1 dimensional Ndarray
+            Highest high of each ticker over the days before the new date
+        lookback_low : 1 dimensional Ndarray
+            Lowest low of each ticker over the days before the new date
+        """
+        lookback_high, lookback_low = self.lookback_high, self.lookback_low
+        self.lookback_high = self.highs.update(high_row)
+        self.lookback_low = self.lows.update(low_row)
+
+        return lookback_high, lookback_low
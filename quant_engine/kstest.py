@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def grouped_normal_kstest(groups, values, loc=0.0, scale=1.0, mode="approx"):
+    """
+    Run a KS test of each group of values against one normal distribution.
+
+    The values are sorted once by group and value, instead of once per group.
+    The gaps between the empirical and normal CDFs are then reduced per group
+    with `np.maximum.reduceat`, and the p-values of every group come from one
+    vectorized call, the same as `scipy.stats.kstest` with the given `mode`.
+
+    Parameters
+    ----------
+    groups : 1 dimensional array-like
+        The group of each value, like a ticker
+    values : 1 dimensional array-like
+        The values to test
+    loc : float
+        The mean of the normal distribution
+    scale : float
+        The standard deviation of the normal distribution
+    mode : str
+        "approx" for twice the one-sided p-value, the p-values of the project
+        tests, or "exact" for the exact two-sided distribution
+
+    Returns
+    -------
+    ks_values : Pandas Series
+        KS statistic for each group, indexed by the sorted groups
+    p_values : Pandas Series
+        P value for each group, indexed by the sorted groups
+    """
+    # Categorical groups are factorized from their codes
+    codes, keys = pd.factorize(pd.Series(groups), sort=True)
+    values = np.asarray(values, dtype=np.float64)
+    assert len(codes) == len(values)
+    # Values without a group, coded -1, are left out like `groupby` does
+    has_group = codes >= 0
+    codes, values = codes[has_group], values[has_group]
+    if not len(values):
+        return pd.Series(dtype=np.float64), pd.Series(dtype=np.float64)
+
+    order = np.lexsort((values, codes))
+    sorted_codes = codes[order]
+    counts = np.bincount(sorted_codes, minlength=len(keys))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    # Position of each value in its group and the size of the group
+    positions = np.arange(len(values)) - starts[sorted_codes]
+    sizes = counts[sorted_codes]
+
+    cdf = stats.norm.cdf(values[order], loc, scale)
+    gaps = np.maximum((positions + 1) / sizes - cdf, cdf - positions / sizes)
+    ks_values = np.maximum.reduceat(gaps, starts)
+    if mode == "approx":
+        p_values = 2 * stats.ksone.sf(ks_values, counts)
+    else:
+        assert mode == "exact"
+        p_values = stats.kstwo.sf(ks_values, counts)
+    p_values = np.clip(p_values, 0, 1)
+
+    index = pd.Index(np.asarray(keys))
+    return pd.Series(ks_values, index), pd.Series(p_values, index)
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+def lookahead_log_returns(log_close, horizons, dtype=np.float64, out=None):
+    """
+    Calculate the lookahead log returns for several horizons at once.
+
+    Each horizon is the difference of two strided views of the same log price
+    matrix, so no shifted copy of the prices is made.
+
+    Parameters
+    ----------
+    log_close : 2 dimensional Ndarray
+        Log close price for each date and ticker
+    horizons : list of int
+        The numbers of days to look ahead
+    dtype : dtype
+        The dtype of the returns
+    out : 3 dimensional Ndarray
+        Preallocated array to write the returns to
+
+    Returns
+    -------
+    lookahead_returns : 3 dimensional Ndarray
+        The lookahead log returns for each horizon, date and ticker, NaN where
+        the lookahead date is past the last date
+    """
+    log_close = np.asarray(log_close)
+    n_dates = len(log_close)
+    shape = (len(horizons),) + log_close.shape
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    assert out.shape == shape
+
+    for horizon_returns, days in zip(out, horizons):
+        assert days > 0
+        days = min(days, n_dates)
+        np.subtract(
+            log_close[days:],
+            log_close[: n_dates - days],
+            out=horizon_returns[: n_dates - days],
+        )
+        horizon_returns[n_dates - days :] = np.nan
+
+    return out
+
+
+def lookahead_returns(close, horizons, dtype=np.float64, out=None):
+    """
+    Calculate the lookahead log returns of close prices for several horizons.
+
+    Parameters
+    ----------
+    close : 2 dimensional Ndarray
+        Close price for each date and ticker
+    horizons : list of int
+        The numbers of days to look ahead
+    dtype : dtype
+        The dtype of the returns
+    out : 3 dimensional Ndarray
+        Preallocated array to write the returns to
+
+    Returns
+    -------
+    lookahead_returns : 3 dimensional Ndarray
+        The lookahead log returns for each horizon, date and ticker
+    """
+    return lookahead_log_returns(np.log(close), horizons, dtype, out)
@@ -0,0 +1,609 @@
+import time
+
+import cvxpy as cvx
+import numpy as np
+
+from quant_engine import risk_model
+
+
+def covariance_factor(covariance_returns):
+    """
+    Factor a covariance matrix into F so that F.T @ F equals the covariance.
+
+    An eigendecomposition is used instead of a Cholesky factorization, since
+    sample covariances from fewer dates than tickers are only semi-definite.
+
+    Parameters
+    ----------
+    covariance_returns : 2 dimensional Ndarray
+        The covariance of the returns
+
+    Returns
+    -------
+    factor : 2 dimensional Ndarray
+        The square root factor of the covariance
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance_returns)
+
+    return np.sqrt(np.clip(eigenvalues, 0, None))[:, np.newaxis] * eigenvectors.T
+
+
+def project_simplex(v):
+    """
+    Project points onto the simplex of long only, fully invested weights.
+
+    Uses the exact sort based projection: the values are shifted down by the
+    one threshold that leaves the positive ones summing to 1.
+
+    Parameters
+    ----------
+    v : Ndarray
+        A point, or a point in each row
+
+    Returns
+    -------
+    projected : Ndarray
+        The nearest nonnegative weights that sum to 1
+    """
+    v = np.asarray(v, dtype=np.float64)
+    descending = -np.sort(-v, axis=-1)
+    excess = np.cumsum(descending, axis=-1) - 1
+    counts = np.arange(1, v.shape[-1] + 1)
+
+    # The values above the threshold are always the largest ones
+    n_positive = np.count_nonzero(descending * counts > excess, axis=-1)
+    n_positive = np.asarray(n_positive)[..., np.newaxis]
+    threshold = np.take_along_axis(excess, n_positive - 1, axis=-1) / n_positive
+
+    return np.maximum(v - threshold, 0)
+
+
+def _as_covariance(covariance_returns):
+    if isinstance(covariance_returns, risk_model.FactorRiskModel):
+        return covariance_returns
+    return np.asarray(covariance_returns, dtype=np.float64)
+
+
+def _max_eigenvalue_bound(covariance_returns):
+    if isinstance(covariance_returns, risk_model.FactorRiskModel):
+        return covariance_returns.max_eigenvalue()
+
+    # Both the Frobenius norm and the largest absolute row sum bound the
+    # largest eigenvalue from above, without an eigendecomposition
+    return min(
+        np.linalg.norm(covariance_returns),
+        np.abs(covariance_returns).sum(axis=1).max(),
+    )
+
+
+def _penalized_solve(covariance_returns, support, penalty, right_hand_sides):
+    if isinstance(covariance_returns, risk_model.FactorRiskModel):
+        return covariance_returns.penalized_solve(support, penalty, right_hand_sides)
+
+    penalized = covariance_returns[np.ix_(support, support)] + penalty * np.eye(
+        np.count_nonzero(support)
+    )
+    return np.linalg.solve(penalized, right_hand_sides)
+
+
+def _polish_support(covariance_returns, index_weights, penalty, support):
+    """
+    Solve the squared problem exactly for weights that are positive on `support`.
+
+    Returns None if those aren't the optimal weights: they must be positive
+    there, and no zero weight's gradient may be below the multiplier of the
+    budget constraint, or moving into it would lower the objective.
+    """
+    right_hand_sides = np.stack(
+        [penalty * index_weights[support], np.ones(np.count_nonzero(support))], 1
+    )
+    targets, ones = _penalized_solve(
+        covariance_returns, support, penalty, right_hand_sides
+    ).T
+    half_multiplier = (targets.sum() - 1) / ones.sum()
+
+    x = np.zeros(len(index_weights))
+    x[support] = targets - half_multiplier * ones
+    if np.any(x[support] <= 0):
+        return None
+
+    gradient = covariance_returns.dot(x) + penalty * (x - index_weights)
+    slack = 1e-12 * np.abs(gradient).max()
+    if np.any(gradient[~support] < -half_multiplier - slack):
+        return None
+
+    return x
+
+
+def _squared_tracking_weights(
+    covariance_returns,
+    index_weights,
+    penalty,
+    x,
+    max_eigenvalue,
+    tol,
+    max_iter,
+    polish_every=10,
+):
+    """
+    Minimize x.T @ covariance @ x + penalty * ||x - index||^2 on the simplex.
+
+    Accelerated projected gradient with the momentum of a strongly convex
+    objective, restarted whenever a step goes uphill. Once the positive
+    weights stop changing, the weights are solved for exactly on them, which
+    ends badly conditioned problems that gradient steps would take long on.
+    """
+    lipschitz = 2 * (max_eigenvalue + penalty)
+    convexity = 2 * penalty
+    momentum = (np.sqrt(lipschitz) - np.sqrt(convexity)) / (
+        np.sqrt(lipschitz) + np.sqrt(convexity)
+    )
+
+    y = x
+    support = None
+    for iteration in range(1, max_iter + 1):
+        gradient = 2 * (covariance_returns.dot(y) + penalty * (y - index_weights))
+        x_next = project_simplex(y - gradient / lipschitz)
+        step = x_next - y
+
+        # Bounds the distance to the solution by strong convexity
+        if np.linalg.norm(step) * lipschitz / convexity <= tol:
+            return x_next, True
+
+        if np.dot(step, x_next - x) < 0:
+            y = x_next
+        else:
+            y = x_next + momentum * (x_next - x)
+        x = x_next
+
+        if iteration % polish_every == 0:
+            previous_support, support = support, x > 0
+            if previous_support is not None and np.array_equal(
+                support, previous_support
+            ):
+                polished = _polish_support(
+                    covariance_returns, index_weights, penalty, support
+                )
+                if polished is not None:
+                    return polished, True
+
+    return x, False
+
+
+def _cvxpy_tracking_weights(covariance_returns, index_weights, scale, squared):
+    x = cvx.Variable(len(index_weights))
+    if squared:
+        distance_to_index = cvx.sum_squares(x - index_weights)
+    else:
+        distance_to_index = cvx.norm(x - index_weights, p=2)
+    if isinstance(covariance_returns, risk_model.FactorRiskModel):
+        # ||F^(1/2) B.T x||^2 + sum(s_i x_i^2) instead of the dense quad form
+        portfolio_variance = cvx.sum_squares(
+            covariance_returns.factor_loadings() @ x
+        ) + cvx.sum_squares(
+            cvx.multiply(np.sqrt(covariance_returns.idiosyncratic_variances), x)
+        )
+    else:
+        portfolio_variance = cvx.quad_form(x, cvx.psd_wrap(covariance_returns))
+    objective = cvx.Minimize(portfolio_variance + scale * distance_to_index)
+    problem = cvx.Problem(objective, [x >= 0, cvx.sum(x) == 1])
+    problem.solve()
+
+    return x.value
+
+
+def tracking_weights(
+    covariance_returns,
+    index_weights,
+    scale=2.0,
+    squared=False,
+    method="projected_gradient",
+    tol=1e-10,
+    max_iter=10000,
+):
+    """
+    Find the long only, fully invested weights that trade variance for tracking.
+
+    Minimizes the portfolio variance plus `scale` times the L2 distance to the
+    index weights, or the squared distance with `squared`. The projected
+    gradient method uses that the distance problem has the same solution as
+    the squared one for the penalty scale / (2 * distance) at that solution,
+    so it solves squared problems while searching the penalty, each warm
+    started from the last. Problems it doesn't converge on are solved with
+    cvxpy instead.
+
+    With daily return covariances of 500 assets, scales of about 0.01 and up
+    are solved in a few milliseconds. Smaller scales leave the weights close
+    to the minimum variance portfolio, which the index barely pins down, so
+    they take many more steps, tens to hundreds of milliseconds at 1e-4.
+
+    Parameters
+    ----------
+    covariance_returns : 2 dimensional Ndarray or FactorRiskModel
+        The covariance of the returns, or a factor risk model of it
+    index_weights : Pandas Series or 1 dimensional Ndarray
+        Index weights for all tickers at a period in time
+    scale : float
+        The penalty factor for weights the deviate from the index
+    squared : bool
+        Whether to penalize the squared distance instead of the distance
+    method : str
+        "projected_gradient", or "cvxpy" to only use cvxpy
+    tol : float
+        The accuracy of the weights for the projected gradient method
+    max_iter : int
+        The number of gradient steps allowed for each squared problem
+
+    Returns
+    -------
+    x : 1 dimensional Ndarray
+        The optimal weights
+    """
+    assert method in ("projected_gradient", "cvxpy")
+    assert scale > 0
+
+    covariance_returns = _as_covariance(covariance_returns)
+    index_weights = np.asarray(index_weights, dtype=np.float64)
+    if method == "cvxpy":
+        return _cvxpy_tracking_weights(
+            covariance_returns, index_weights, scale, squared
+        )
+
+    x, _ = _projected_gradient_tracking_weights(
+        covariance_returns,
+        index_weights,
+        scale,
+        squared,
+        project_simplex(index_weights),
+        None,
+        _max_eigenvalue_bound(covariance_returns),
+        tol,
+        max_iter,
+    )
+    if x is None:
+        return _cvxpy_tracking_weights(
+            covariance_returns, index_weights, scale, squared
+        )
+
+    return x
+
+
+def _projected_gradient_tracking_weights(
+    covariance_returns,
+    index_weights,
+    scale,
+    squared,
+    x,
+    log_penalty,
+    max_eigenvalue,
+    tol,
+    max_iter,
+):
+    """
+    Solve a tracking problem from starting weights and log penalty.
+
+    Returns the weights and the log penalty of the squared problem they solve,
+    or None for the weights if it didn't converge.
+    """
+    if squared:
+        x, converged = _squared_tracking_weights(
+            covariance_returns, index_weights, scale, x, max_eigenvalue, tol, max_iter
+        )
+        return (x if converged else None), np.log(scale)
+
+    # Search the log of the penalty for the root of
+    # log(2 * penalty * distance / scale), which increases with the penalty.
+    # The squared problems are solved loosely while the root is far away.
+    if log_penalty is None:
+        log_penalty = np.log(scale / 2 + max_eigenvalue)
+    inner_tol = np.sqrt(tol)
+    below = above = previous = None
+    for _ in range(100):
+        x, converged = _squared_tracking_weights(
+            covariance_returns,
+            index_weights,
+            np.exp(log_penalty),
+            x,
+            max_eigenvalue,
+            inner_tol,
+            max_iter,
+        )
+        if not converged:
+            break
+
+        distance = np.linalg.norm(x - index_weights)
+        error = np.log(2 * np.exp(log_penalty) * max(distance, tol / 2) / scale)
+        if error < 0:
+            below = (log_penalty, error)
+        else:
+            above = (log_penalty, error)
+
+        slope = None
+        if (
+            previous is not None
+            and (error - previous[1]) * (log_penalty - previous[0]) > 0
+        ):
+            slope = (error - previous[1]) / (log_penalty - previous[0])
+        previous = (log_penalty, error)
+        newton_step = step = -error / (slope or 1.0)
+
+        if below is not None and above is not None:
+            if (above[0] - below[0]) * distance <= tol:
+                # A loose solve put the root in a bracket that misses it
+                below = above = None
+            elif not below[0] < log_penalty + step < above[0]:
+                step = (below[0] + above[0]) / 2 - log_penalty
+        if below is None or above is None:
+            # Overshoot so the root gets bracketed
+            step = np.clip(2 * step, -10, 10)
+
+        # The weights move by about the distance times the change in the log
+        # of the penalty. Within tol / 2 of the index weights, below the
+        # root, the solution is closer to them still.
+        if (slope is not None and abs(newton_step) * distance <= tol) or (
+            error < 0 and distance <= tol / 2
+        ):
+            if inner_tol <= tol:
+                return x, log_penalty
+            # Start over from here with exact solves
+            inner_tol = tol
+            below = above = previous = None
+            continue
+        inner_tol = max(tol, min(inner_tol, 1e-3 * abs(step) * distance))
+        log_penalty += step
+
+    return None, log_penalty
+
+
+def batch_tracking_weights(
+    covariance_returns,
+    index_weights,
+    scales,
+    squared=False,
+    tol=1e-10,
+    max_iter=10000,
+):
+    """
+    Solve many tracking problems that share one covariance.
+
+    The problems are the pairs of index weights and scales, solved like
+    `tracking_weights`. The largest eigenvalue of the covariance, which sets
+    the gradient step, is computed once for all of them. The problems with
+    the same index weights are solved in order of scale, each starting from
+    the weights and penalty of the last, so a sweep over the scales follows
+    the path of solutions instead of starting over for each.
+
+    Parameters
+    ----------
+    covariance_returns : 2 dimensional Ndarray or FactorRiskModel
+        The covariance of the returns, or a factor risk model of it
+    index_weights : 1 or 2 dimensional Ndarray
+        The index weights of each problem, or the same for all of them
+    scales : float or 1 dimensional Ndarray
+        The penalty factor of each problem, or the same for all of them
+    squared : bool
+        Whether to penalize the squared distance instead of the distance
+    tol : float
+        The accuracy of the weights
+    max_iter : int
+        The number of gradient steps allowed for each squared problem
+
+    Returns
+    -------
+    x : 2 dimensional Ndarray
+        The optimal weights of each problem
+    """
+    covariance_returns = _as_covariance(covariance_returns)
+    index_weights = np.asarray(index_weights, dtype=np.float64)
+    scales = np.asarray(scales, dtype=np.float64)
+    n_problems = max(len(np.atleast_2d(index_weights)), scales.size)
+    index_weights = np.broadcast_to(
+        index_weights, (n_problems, covariance_returns.shape[0])
+    )
+    scales = np.broadcast_to(scales, (n_problems,))
+    assert np.all(scales > 0)
+
+    if isinstance(covariance_returns, risk_model.FactorRiskModel):
+        max_eigenvalue = covariance_returns.max_eigenvalue()
+    else:
+        max_eigenvalue = max(np.linalg.eigvalsh(covariance_returns)[-1], 0)
+    _, index_ids = np.unique(index_weights, axis=0, return_inverse=True)
+
+    x = np.empty((n_problems, covariance_returns.shape[0]))
+    previous_id = None
+    for problem in np.lexsort([scales, index_ids]):
+        if index_ids[problem] != previous_id:
+            start = project_simplex(index_weights[problem])
+            log_penalty = None
+        previous_id = index_ids[problem]
+
+        solved, solved_log_penalty = _projected_gradient_tracking_weights(
+            covariance_returns,
+            index_weights[problem],
+            scales[problem],
+            squared,
+            start,
+            log_penalty,
+            max_eigenvalue,
+            tol,
+            max_iter,
+        )
+        if solved is None:
+            x[problem] = _cvxpy_tracking_weights(
+                covariance_returns, index_weights[problem], scales[problem], squared
+            )
+        else:
+            x[problem] = start = solved
+            log_penalty = solved_log_penalty
+
+    return x
+
+
+class IndexTrackingOptimizer:
+    """
+    Index tracking portfolio optimizer built once and solved many times.
+
+    Minimizes the portfolio variance plus `scale` times the L2 distance to the
+    index weights, for long only portfolios that are fully invested. The
+    covariance factor, index weights and scale are cvxpy Parameters, so the
+    problem is only canonicalized once and every solve is warm started from
+    the previous solution.
+
+    Parameters
+    ----------
+    n_assets : int
+        The number of assets in the portfolio
+    scale : float
+        The penalty factor for weights the deviate from the index
+    solver : str
+        The cvxpy solver to use, defaults to cvxpy's choice
+    """
+
+    def __init__(self, n_assets, scale=2.0, solver=None):
+        self.solver = solver
+        self.x = cvx.Variable(n_assets)
+        self.covariance_factor = cvx.Parameter((n_assets, n_assets))
+        self.index_weights = cvx.Parameter(n_assets)
+        self.scale = cvx.Parameter(nonneg=True, value=scale)
+
+        # Written so the problem stays DPP and is only canonicalized once:
+        # the variance as x.T @ F.T @ F @ x and the distance to the index
+        # bounded by an epigraph variable that the scale multiplies
+        portfolio_variance = cvx.sum_squares(self.covariance_factor @ self.x)
+        distance_to_index = cvx.Variable(nonneg=True)
+        objective = cvx.Minimize(portfolio_variance + self.scale * distance_to_index)
+        constraints = [
+            self.x >= 0,
+            cvx.sum(self.x) == 1,
+            cvx.norm(self.x - self.index_weights, p=2) <= distance_to_index,
+        ]
+        self.problem = cvx.Problem(objective, constraints)
+        assert self.problem.is_dcp(dpp=True)
+
+        self.solve_times = []
+        self.solver_times = []
+
+    def solve(self, covariance_returns, index_weights, scale=None):
+        """
+        Find the optimal weights for one rebalance.
+
+        Parameters
+        ----------
+        covariance_returns : 2 dimensional Ndarray
+            The covariance of the returns
+        index_weights : Pandas Series or 1 dimensional Ndarray
+            Index weights for all tickers at a period in time
+        scale : float
+            The penalty factor, defaults to the last one used
+
+        Returns
+        -------
+        x : 1 dimensional Ndarray
+            The solution for x
+        """
+        start_time = time.perf_counter()
+
+        self.covariance_factor.value = covariance_factor(covariance_returns)
+        self.index_weights.value = np.asarray(index_weights, dtype=np.float64)
+        if scale is not None:
+            self.scale.value = scale
+
+        self.problem.solve(solver=self.solver, warm_start=True)
+
+        self.solve_times.append(time.perf_counter() - start_time)
+        self.solver_times.append(self.problem.solver_stats.solve_time)
+
+        return self.x.value
+
+    def timing_stats(self):
+        """
+        Summarize the time spent in each solve.
+
+        Returns
+        -------
+        stats : dict
+            Number of solves and the total, mean and max wall time in seconds,
+            plus the total time spent inside the solver
+        """
+        solve_times = np.array(self.solve_times)
+        solver_times = np.array([t or 0.0 for t in self.solver_times])
+
+        return {
+            "solves": len(solve_times),
+            "total": solve_times.sum(),
+            "mean": solve_times.mean() if len(solve_times) else 0.0,
+            "max": solve_times.max() if len(solve_times) else 0.0,
+            "solver_total": solver_times.sum(),
+        }
+
+
+class ProjectedGradientTrackingOptimizer:
+    """
+    Index tracking optimizer for a sequence of rebalances.
+
+    Solves like `tracking_weights`, starting each rebalance from the weights
+    and penalty of the last, which are close when the rebalances are. With
+    factor risk models for the covariances, large universes are solved
+    without ever forming the dense covariance.
+
+    Parameters
+    ----------
+    scale : float
+        The penalty factor for weights the deviate from the index
+    tol : float
+        The accuracy of the weights
+    max_iter : int
+        The number of gradient steps allowed for each squared problem
+    """
+
+    def __init__(self, scale=2.0, tol=1e-10, max_iter=10000):
+        self.scale = scale
+        self.tol = tol
+        self.max_iter = max_iter
+        self.x = None
+        self.log_penalty = None
+
+    def solve(self, covariance_returns, index_weights, scale=None):
+        """
+        Find the optimal weights for one rebalance.
+
+        Parameters
+        ----------
+        covariance_returns : 2 dimensional Ndarray or FactorRiskModel
+            The covariance of the returns, or a factor risk model of it
+        index_weights : Pandas Series or 1 dimensional Ndarray
+            Index weights for all tickers at a period in time
+        scale : float
+            The penalty factor, defaults to the last one used
+
+        Returns
+        -------
+        x : 1 dimensional Ndarray
+            The solution for x
+        """
+        if scale is not None:
+            self.scale = scale
+        covariance_returns = _as_covariance(covariance_returns)
+        index_weights = np.asarray(index_weights, dtype=np.float64)
+
+        start = self.x if self.x is not None else project_simplex(index_weights)
+        x, log_penalty = _projected_gradient_tracking_weights(
+            covariance_returns,
+            index_weights,
+            self.scale,
+            False,
+            start,
+            self.log_penalty,
+            _max_eigenvalue_bound(covariance_returns),
+            self.tol,
+            self.max_iter,
+        )
+        if x is None:
+            x = _cvxpy_tracking_weights(
+                covariance_returns, index_weights, self.scale, False
+            )
+            log_penalty = None
+
+        self.x, self.log_penalty = x, log_penalty
+
+        return x
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def outlier_masks(ks_values, p_values, ks_threshold, pvalue_threshold=0.05):
+    """
+    Find the outlying tickers of every lookahead at once.
+
+    Parameters
+    ----------
+    ks_values : Ndarray
+        KS statistic for each lookahead and ticker, NaN for tickers without
+        signals
+    p_values : Ndarray
+        P value for each lookahead and ticker, NaN for tickers without signals
+    ks_threshold : float
+        The threshold for the KS statistic
+    pvalue_threshold : float
+        The threshold for the p-value
+
+    Returns
+    -------
+    outlier_masks : Ndarray of bool
+        True for the tickers with a KS statistic above `ks_threshold` and a
+        p-value below `pvalue_threshold`, same shape as `ks_values`
+    """
+    with np.errstate(invalid="ignore"):
+        return (np.asarray(ks_values) > ks_threshold) & (
+            np.asarray(p_values) < pvalue_threshold
+        )
+
+
+def drop_tickers(values, ticker_masks, out=None):
+    """
+    Set the values of the masked tickers to NaN.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values for each date and ticker, or each lookahead, date and ticker
+    ticker_masks : Ndarray of bool
+        The tickers to drop, either one mask for every date or one mask per
+        lookahead
+    out : Ndarray
+        Preallocated float array to write to, can be `values` itself
+
+    Returns
+    -------
+    kept_values : Ndarray
+        The values with NaNs for the dropped tickers
+    """
+    ticker_masks = np.asarray(ticker_masks, dtype=bool)
+    if ticker_masks.ndim == 2:
+        # One mask per lookahead, the same for all its dates
+        ticker_masks = ticker_masks[:, np.newaxis, :]
+
+    if out is None:
+        out = np.array(values, dtype=np.float64)
+    elif out is not values:
+        out[...] = values
+    np.copyto(out, np.nan, where=ticker_masks)
+
+    return out
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+
+class PricePanel:
+    """
+    Prices with memoized log prices and returns.
+
+    Each derived matrix is computed the first time it's asked for and then
+    reused, so the same prices are only logged once however many functions
+    use them. The cache is cleared when the prices are replaced, through
+    `append` or by assigning `prices`. The cache can't see the prices being
+    modified in place, so call `invalidate` after that. Each clear moves
+    `version` on. The matrices returned are shared, so they shouldn't be
+    modified in place.
+
+    Parameters
+    ----------
+    prices : DataFrame or Series
+        Prices for each date (and ticker)
+    """
+
+    def __init__(self, prices):
+        self._cache = {}
+        self.version = 0
+        self.prices = prices
+
+    @property
+    def prices(self):
+        return self._prices
+
+    @prices.setter
+    def prices(self, prices):
+        self._prices = prices
+        self.invalidate()
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+
+        return self._cache[key]
+
+    def invalidate(self):
+        """
+        Clear the derived matrices, after the prices are modified in place.
+        """
+        self._cache.clear()
+        self.version += 1
+
+    def append(self, rows):
+        """
+        Append the prices of new dates.
+
+        Parameters
+        ----------
+        rows : DataFrame or Series
+            Prices for each new date, with the same columns as the prices
+        """
+        self.prices = pd.concat([self.prices, rows])
+
+    def log_prices(self):
+        """
+        Get the log of the prices.
+        """
+        return self._cached(("log_prices",), lambda: np.log(self.prices))
+
+    def simple_returns(self, lag=1):
+        """
+        Get the simple returns from `lag` dates before each date.
+
+        Parameters
+        ----------
+        lag : int
+            The number of dates between the prices, negative to look ahead
+
+        Returns
+        -------
+        simple_returns : DataFrame or Series
+            The price of each date over the price `lag` dates before, minus 1
+        """
+        return self._cached(
+            ("simple_returns", lag), lambda: self.prices / self.prices.shift(lag) - 1
+        )
+
+    def log_returns(self, lag=1):
+        """
+        Get the log returns from `lag` dates before each date.
+
+        Parameters
+        ----------
+        lag : int
+            The number of dates between the prices, negative to look ahead
+
+        Returns
+        -------
+        log_returns : DataFrame or Series
+            The log price of each date minus the log price `lag` dates before
+        """
+        return self._cached(
+            ("log_returns", lag),
+            lambda: self.log_prices() - self.log_prices().shift(lag),
+        )
+
+    def shifted_returns(self, shift_n, lag=1, log=True):
+        """
+        Get returns moved by a number of dates.
+
+        Parameters
+        ----------
+        shift_n : int
+            Number of dates to move, can be positive or negative
+        lag : int
+            The number of dates the returns are over
+        log : bool
+            Whether to shift the log returns or the simple returns
+
+        Returns
+        -------
+        shifted_returns : DataFrame or Series
+            The returns of `shift_n` dates before each date
+        """
+        returns = self.log_returns if log else self.simple_returns
+
+        return self._cached(
+            ("shifted_returns", shift_n, lag, log),
+            lambda: returns(lag).shift(shift_n),
+        )
+
+
+def as_panel(prices):
+    """
+    Wrap prices in a `PricePanel` unless they already are one.
+
+    Parameters
+    ----------
+    prices : DataFrame, Series or PricePanel
+        The prices
+
+    Returns
+    -------
+    panel : PricePanel
+        The panel of the prices
+    """
+    return prices if isinstance(prices, PricePanel) else PricePanel(prices)
@@ -0,0 +1,543 @@
+"""
+Factor and filter pipelines computed over date x ticker price matrices.
+
+A small replacement for the parts of the zipline pipeline API the course uses,
+like `AverageDollarVolume(window_length=120).top(500)`, that runs on the
+matrices of the price store without a bundle or a trading calendar. Terms form
+a graph that is computed in topological order, each distinct term once, with
+the windowed computations vectorized over every date and ticker at once.
+
+Like zipline, the values of a pipeline for a date only use the data of the
+dates before it.
+"""
+import abc
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import ranking
+
+
+class Term(abc.ABC):
+    """
+    A node of the pipeline graph.
+
+    Subclasses keep their parameters as attributes, which are part of the key.
+
+    Parameters
+    ----------
+    inputs : list of Terms
+        The terms this term is computed from
+    window_length : int
+        The number of dates each value is computed from
+    """
+
+    def __init__(self, inputs=(), window_length=1):
+        assert window_length > 0
+
+        self.inputs = tuple(inputs)
+        self.window_length = window_length
+
+    @property
+    def key(self):
+        """
+        Identify the computation of the term, equal terms are computed once.
+        """
+        parameters = tuple(
+            sorted(
+                (name, value) for name, value in vars(self).items() if name != "inputs"
+            )
+        )
+        return (type(self), tuple(term.key for term in self.inputs), parameters)
+
+    def lookback(self):
+        """
+        Get the number of extra dates needed before the first output date.
+        """
+        return (
+            self.window_length
+            - 1
+            + max((term.lookback() for term in self.inputs), default=0)
+        )
+
+    @abc.abstractmethod
+    def compute(self, *inputs):
+        """
+        Compute the term from its computed inputs.
+
+        Parameters
+        ----------
+        inputs : 2 dimensional Ndarrays
+            The values of each input for each date and ticker
+
+        Returns
+        -------
+        values : 2 dimensional Ndarray
+            The values of the term for each date and ticker, using the data up
+            to and including each date
+        """
+
+
+def _as_term(value):
+    return value if isinstance(value, Term) else Constant(value)
+
+
+class Factor(Term):
+    """
+    A term with a float value for each date and ticker.
+    """
+
+    def _binary(self, other, operator):
+        return BinaryOperation(self, _as_term(other), operator)
+
+    def _reflected(self, other, operator):
+        return BinaryOperation(_as_term(other), self, operator)
+
+    def __add__(self, other):
+        return self._binary(other, "add")
+
+    def __radd__(self, other):
+        return self._reflected(other, "add")
+
+    def __sub__(self, other):
+        return self._binary(other, "subtract")
+
+    def __rsub__(self, other):
+        return self._reflected(other, "subtract")
+
+    def __mul__(self, other):
+        return self._binary(other, "multiply")
+
+    def __rmul__(self, other):
+        return self._reflected(other, "multiply")
+
+    def __truediv__(self, other):
+        return self._binary(other, "divide")
+
+    def __rtruediv__(self, other):
+        return self._reflected(other, "divide")
+
+    def __gt__(self, other):
+        return Comparison(self, _as_term(other), "greater")
+
+    def __ge__(self, other):
+        return Comparison(self, _as_term(other), "greater_equal")
+
+    def __lt__(self, other):
+        return Comparison(self, _as_term(other), "less")
+
+    def __le__(self, other):
+        return Comparison(self, _as_term(other), "less_equal")
+
+    def top(self, n):
+        """
+        Filter the `n` tickers with the largest values for each date.
+        """
+        return TopN(self, n)
+
+    def bottom(self, n):
+        """
+        Filter the `n` tickers with the smallest values for each date.
+        """
+        return TopN(-1 * self, n)
+
+
+class DataColumn(Factor):
+    """
+    A field of the price data, like "adj_close", as of each date.
+
+    Parameters
+    ----------
+    field : str
+        The name of the field in the data given to the engine
+    """
+
+    def __init__(self, field):
+        super().__init__()
+        self.field = field
+
+    def compute(self, values):
+        """
+        Get the values of the field, from its DataFrame's values.
+        """
+        return np.asarray(values, dtype=np.float64)
+
+
+class EquityPricing:
+    """
+    The adjusted pricing fields of the EOD data.
+    """
+
+    open = DataColumn("adj_open")
+    high = DataColumn("adj_high")
+    low = DataColumn("adj_low")
+    close = DataColumn("adj_close")
+    volume = DataColumn("adj_volume")
+
+
+class Filter(Term):
+    """
+    A term with a bool value for each date and ticker.
+    """
+
+    def __and__(self, other):
+        return Logical(self, other, "logical_and")
+
+    def __or__(self, other):
+        return Logical(self, other, "logical_or")
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Constant(Factor):
+    """
+    A scalar broadcast to every date and ticker.
+    """
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def compute(self):
+        return np.float64(self.value)
+
+
+class BinaryOperation(Factor):
+    """
+    Arithmetic between two factors.
+    """
+
+    def __init__(self, left, right, operator):
+        super().__init__([left, right])
+        self.operator = operator
+
+    def compute(self, left, right):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return getattr(np, self.operator)(left, right)
+
+
+class Comparison(Filter):
+    """
+    Comparison between two factors.
+    """
+
+    def __init__(self, left, right, operator):
+        super().__init__([left, right])
+        self.operator = operator
+
+    def compute(self, left, right):
+        with np.errstate(invalid="ignore"):
+            return getattr(np, self.operator)(left, right)
+
+
+class Logical(Filter):
+    """
+    Logical combination of two filters.
+    """
+
+    def __init__(self, left, right, operator):
+        super().__init__([left, right])
+        self.operator = operator
+
+    def compute(self, left, right):
+        return getattr(np, self.operator)(left, right)
+
+
+class Not(Filter):
+    """
+    Negation of a filter.
+    """
+
+    def __init__(self, term):
+        super().__init__([term])
+
+    def compute(self, values):
+        return ~values
+
+
+class TopN(Filter):
+    """
+    The `n` tickers with the largest values of a factor for each date.
+
+    Ties are broken by ticker order, so exactly `n` tickers pass when at
+    least `n` have a value.
+    """
+
+    def __init__(self, factor, n):
+        super().__init__([factor])
+        self.n = n
+
+    def compute(self, values):
+        return ranking.top_n_mask(values, self.n, keep="first")
+
+
+def _rolling_sum(values, window_length):
+    """
+    Sum `values` over trailing windows, NaNs count as 0.
+    """
+    cumulative = np.cumsum(np.nan_to_num(values), axis=0)
+    rolling = np.full(values.shape, np.nan)
+    rolling[window_length - 1 :] = cumulative[window_length - 1 :]
+    rolling[window_length:] -= cumulative[:-window_length]
+
+    return rolling
+
+
+class SimpleMovingAverage(Factor):
+    """
+    Average of a factor over a trailing window, ignoring NaNs.
+    """
+
+    def __init__(self, inputs, window_length):
+        assert len(inputs) == 1
+        super().__init__(inputs, window_length)
+
+    def compute(self, values):
+        counts = _rolling_sum(~np.isnan(values), self.window_length)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _rolling_sum(values, self.window_length) / counts
+
+
+class AverageDollarVolume(Factor):
+    """
+    Average close price times volume over a trailing window.
+    """
+
+    def __init__(
+        self, window_length, inputs=(EquityPricing.close, EquityPricing.volume)
+    ):
+        super().__init__(inputs, window_length)
+
+    def compute(self, close, volume):
+        return _rolling_sum(close * volume, self.window_length) / self.window_length
+
+
+class Returns(Factor):
+    """
+    Simple returns over a trailing window.
+    """
+
+    def __init__(self, window_length, inputs=(EquityPricing.close,)):
+        assert window_length > 1
+        super().__init__(inputs, window_length)
+
+    def compute(self, close):
+        returns = np.full(close.shape, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[self.window_length - 1 :] = (
+                close[self.window_length - 1 :] / close[: 1 - self.window_length] - 1
+            )
+
+        return returns
+
+
+class Pipeline:
+    """
+    Named terms to compute, with an optional screen filtering the tickers.
+
+    Parameters
+    ----------
+    columns : dict of Terms
+        The terms to output, keyed by column name
+    screen : Filter
+        The tickers to output for each date
+    """
+
+    def __init__(self, columns=None, screen=None):
+        self.columns = dict(columns or {})
+        self.screen = screen
+
+    def add(self, term, name):
+        """
+        Add a term to the outputs of the pipeline.
+        """
+        self.columns[name] = term
+
+    def set_screen(self, screen):
+        """
+        Set the filter of the tickers output.
+        """
+        self.screen = screen
+
+    def terms(self):
+        """
+        Get the terms of the graph in topological order, each key once.
+
+        Returns
+        -------
+        terms : list of Terms
+            Every term the outputs depend on, after the terms they depend on
+        """
+        ordered = {}
+
+        def visit(term):
+            if term.key in ordered:
+                return
+            for input_term in term.inputs:
+                visit(input_term)
+            ordered[term.key] = term
+
+        outputs = list(self.columns.values())
+        if self.screen is not None:
+            outputs.append(self.screen)
+        for term in outputs:
+            visit(term)
+
+        return list(ordered.values())
+
+    def show_graph(self):
+        """
+        Draw the graph of terms, like zipline's `Pipeline.show_graph`.
+
+        Returns
+        -------
+        graph : graphviz Digraph
+            A node for each term, with an edge from each input to its term
+        """
+        # Only drawing the graph needs graphviz
+        import graphviz
+
+        graph = graphviz.Digraph()
+        terms = self.terms()
+        names = {term.key: "term_{}".format(i) for i, term in enumerate(terms)}
+        for term in terms:
+            _, _, parameters = term.key
+            graph.node(
+                names[term.key],
+                "{}({})".format(
+                    type(term).__name__,
+                    ", ".join("{}={!r}".format(*parameter) for parameter in parameters),
+                ),
+            )
+            for input_term in term.inputs:
+                graph.edge(names[input_term.key], names[term.key])
+
+        return graph
+
+
+class PipelineEngine:
+    """
+    Compute pipelines over date x ticker DataFrames.
+
+    Parameters
+    ----------
+    data : dict of DataFrames
+        Values for each ticker and date keyed by field, like the output of
+        `price_store.load`. Every DataFrame has the same index and columns.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        first = next(iter(data.values()))
+        self.dates = first.index
+        self.tickers = first.columns
+
+    def compute_terms(self, pipeline, start_date, end_date):
+        """
+        Compute every output term of a pipeline for a range of dates.
+
+        Parameters
+        ----------
+        pipeline : Pipeline
+            The pipeline to compute
+        start_date : Timestamp
+            The first date to compute
+        end_date : Timestamp
+            The last date to compute
+
+        Returns
+        -------
+        dates : DatetimeIndex
+            The dates computed
+        results : dict of 2 dimensional Ndarrays
+            The values for each date and ticker, keyed by term key
+        """
+        start_loc = self.dates.searchsorted(pd.Timestamp(start_date))
+        end_loc = self.dates.searchsorted(pd.Timestamp(end_date), side="right")
+        assert start_loc < end_loc, "No dates between start_date and end_date"
+
+        terms = pipeline.terms()
+        lookback = max(term.lookback() for term in terms)
+        # Each date uses the data up to the previous date
+        first_loc = max(start_loc - 1 - lookback, 0)
+        last_loc = end_loc - 1
+
+        # Count the consumers of each term so intermediates can be released
+        consumers = {}
+        for term in terms:
+            for input_term in term.inputs:
+                consumers[input_term.key] = consumers.get(input_term.key, 0) + 1
+        output_keys = {term.key for term in pipeline.columns.values()}
+        if pipeline.screen is not None:
+            output_keys.add(pipeline.screen.key)
+
+        results = {}
+        for term in terms:
+            if isinstance(term, DataColumn):
+                values = term.compute(self.data[term.field].values[first_loc:last_loc])
+            else:
+                values = term.compute(*[results[t.key] for t in term.inputs])
+            results[term.key] = values
+
+            for input_term in term.inputs:
+                consumers[input_term.key] -= 1
+                if not consumers[input_term.key] and input_term.key not in output_keys:
+                    del results[input_term.key]
+
+        n_rows = last_loc - first_loc
+        n_dates = end_loc - start_loc
+        outputs = {}
+        for key in output_keys:
+            values = np.broadcast_to(results[key], (n_rows, len(self.tickers)))
+            values = values[n_rows - min(n_rows, n_dates) :]
+            if n_dates > n_rows:
+                # The first date of the data has no previous date to use
+                missing = np.full(
+                    (n_dates - n_rows, len(self.tickers)),
+                    False if values.dtype == bool else np.nan,
+                    dtype=values.dtype,
+                )
+                values = np.concatenate([missing, values])
+            outputs[key] = values
+
+        return self.dates[start_loc:end_loc], outputs
+
+    def run_pipeline(self, pipeline, start_date, end_date):
+        """
+        Compute a pipeline for a range of dates.
+
+        Parameters
+        ----------
+        pipeline : Pipeline
+            The pipeline to compute
+        start_date : Timestamp
+            The first date to compute
+        end_date : Timestamp
+            The last date to compute
+
+        Returns
+        -------
+        pipeline_output : DataFrame
+            The output columns for each date and ticker passing the screen,
+            indexed by date and ticker
+        """
+        dates, outputs = self.compute_terms(pipeline, start_date, end_date)
+
+        if pipeline.screen is None:
+            date_locs, ticker_locs = np.indices(
+                (len(dates), len(self.tickers))
+            ).reshape(2, -1)
+        else:
+            date_locs, ticker_locs = np.nonzero(outputs[pipeline.screen.key])
+
+        index = pd.MultiIndex.from_arrays(
+            [dates[date_locs], self.tickers[ticker_locs]], names=["date", "ticker"]
+        )
+        return pd.DataFrame(
+            {
+                name: outputs[term.key][date_locs, ticker_locs]
+                for name, term in pipeline.columns.items()
+            },
+            index,
+        )
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+
+def factorize_keys(row_keys, column_keys):
+    """
+    Factorize the row and column keys of long-format data once.
+
+    Every entry needs a row and column key, NaN keys aren't allowed.
+
+    Parameters
+    ----------
+    row_keys : Pandas Series
+        The key of the row for each entry, like the date
+    column_keys : Pandas Series
+        The key of the column for each entry, like the ticker
+
+    Returns
+    -------
+    flat_codes : 1 dimensional Ndarray
+        Position of each entry in the flattened rows x columns matrix
+    rows : Index
+        Sorted unique row keys
+    columns : Index
+        Sorted unique column keys
+    """
+    row_codes, rows = pd.factorize(row_keys, sort=True)
+    column_codes, columns = pd.factorize(column_keys, sort=True)
+    # NaN keys are coded -1, which would scatter into the wrong entry
+    assert (row_codes >= 0).all() and (column_codes >= 0).all(), "Keys contain NaN"
+    flat_codes = row_codes * len(columns) + column_codes
+    assert len(np.unique(flat_codes)) == len(
+        flat_codes
+    ), "Index contains duplicate entries"
+
+    return flat_codes, pd.Index(rows), pd.Index(columns)
+
+
+def fill_dtype(dtype, is_complete):
+    """
+    Get the dtype able to hold a pivoted field.
+
+    Parameters
+    ----------
+    dtype : dtype
+        The dtype of the long-format field
+    is_complete : bool
+        Whether every row and column pair has an entry
+
+    Returns
+    -------
+    dtype : dtype
+        `dtype` if it can hold the NaN of missing entries, float64 otherwise
+    """
+    dtype = np.dtype(dtype)
+    if is_complete or dtype.kind in "fcO":
+        return dtype
+
+    return np.dtype(np.float64)
+
+
+def scatter(values, flat_codes, shape, dtype=None):
+    """
+    Scatter long-format values into a preallocated 2 dimensional matrix.
+
+    Parameters
+    ----------
+    values : 1 dimensional Ndarray
+        The value of each entry
+    flat_codes : 1 dimensional Ndarray
+        Position of each entry in the flattened matrix, see `factorize_keys`
+    shape : tuple of int
+        The number of rows and columns of the matrix
+    dtype : dtype
+        The dtype of the matrix, defaults to the one able to hold `values`
+
+    Returns
+    -------
+    matrix : 2 dimensional Ndarray
+        The values in their row and column, NaN where there's no entry
+    """
+    values = np.asarray(values)
+    is_complete = len(flat_codes) == shape[0] * shape[1]
+    if dtype is None:
+        dtype = fill_dtype(values.dtype, is_complete)
+
+    matrix = np.empty(shape[0] * shape[1], dtype=dtype)
+    if not is_complete:
+        matrix.fill(np.nan)
+    matrix[flat_codes] = values
+
+    return matrix.reshape(shape)
+
+
+def pivot_fields(df, fields, index="date", columns="ticker"):
+    """
+    Pivot several fields of long-format data in one pass.
+
+    The index and columns keys are factorized once and shared by every field,
+    giving the same DataFrames as one `DataFrame.pivot` per field.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Long-format data
+    fields : list of str
+        The columns of `df` to pivot
+    index : str
+        The column of `df` to use as the index
+    columns : str
+        The column of `df` to use as the columns
+
+    Returns
+    -------
+    pivoted : dict of DataFrames
+        Values for each column and index entry, keyed by field
+    """
+    flat_codes, rows, cols = factorize_keys(df[index], df[columns])
+    rows, cols = rows.rename(index), cols.rename(columns)
+    shape = (len(rows), len(cols))
+
+    return {
+        field: pd.DataFrame(
+            scatter(df[field].values, flat_codes, shape), rows, cols, copy=False
+        )
+        for field in fields
+    }
+
+
+def pivot_panel(df, fields, index="date", columns="ticker", dtype=None):
+    """
+    Pivot several fields of long-format data into a single 3 dimensional panel.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Long-format data
+    fields : list of str
+        The columns of `df` to pivot
+    index : str
+        The column of `df` to use as the index
+    columns : str
+        The column of `df` to use as the columns
+    dtype : dtype
+        The dtype of the panel, defaults to the one able to hold every field
+
+    Returns
+    -------
+    panel : 3 dimensional Ndarray
+        Values for each field, index entry and column
+    rows : Index
+        The index entries of the panel
+    cols : Index
+        The columns of the panel
+    """
+    flat_codes, rows, cols = factorize_keys(df[index], df[columns])
+    rows, cols = rows.rename(index), cols.rename(columns)
+    is_complete = len(flat_codes) == len(rows) * len(cols)
+    if dtype is None:
+        dtype = np.result_type(
+            *[fill_dtype(df[field].dtype, is_complete) for field in fields]
+        )
+
+    panel = np.empty((len(fields), len(rows), len(cols)), dtype=dtype)
+    flat_panel = panel.reshape(len(fields), -1)
+    if not is_complete:
+        flat_panel.fill(np.nan)
+    for field_i, field in enumerate(fields):
+        flat_panel[field_i, flat_codes] = df[field].values
+
+    return panel, rows, cols
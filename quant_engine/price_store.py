@@ -0,0 +1,231 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import pivot
+
+
+DATES_FILE = "dates.npy"
+TICKERS_FILE = "tickers.npy"
+FIELDS_DIR = "fields"
+
+
+def default_store_path(csv_path):
+    """
+    Get the store directory used for a long-format csv file.
+
+    Parameters
+    ----------
+    csv_path : str
+        The path of the csv file
+
+    Returns
+    -------
+    store_path : str
+        The csv path with its extension replaced by ".store"
+    """
+    return os.path.splitext(csv_path)[0] + ".store"
+
+
+def _field_path(store_path, field):
+    return os.path.join(store_path, FIELDS_DIR, field + ".npy")
+
+
+def stored_fields(store_path):
+    """
+    Get the fields saved in a store.
+
+    Parameters
+    ----------
+    store_path : str
+        The store directory
+
+    Returns
+    -------
+    fields : list of str
+        The fields in the store, empty if the store doesn't exist
+    """
+    fields_dir = os.path.join(store_path, FIELDS_DIR)
+    if not os.path.isdir(fields_dir):
+        return []
+
+    return sorted(
+        os.path.splitext(file_name)[0]
+        for file_name in os.listdir(fields_dir)
+        if file_name.endswith(".npy")
+    )
+
+
+def ingest(df, store_path, fields, dtype=np.float64):
+    """
+    Save long-format data as one date x ticker matrix per field.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Long-format data with a "date" column, a "ticker" column and the fields
+    store_path : str
+        The store directory to write
+    fields : list of str
+        The columns of `df` to save
+    dtype : dtype
+        The dtype of the saved matrices
+    """
+    flat_codes, dates, tickers = pivot.factorize_keys(
+        pd.to_datetime(df["date"]), df["ticker"]
+    )
+
+    os.makedirs(os.path.join(store_path, FIELDS_DIR), exist_ok=True)
+    for field in fields:
+        values = pivot.scatter(
+            df[field].values, flat_codes, (len(dates), len(tickers)), dtype
+        )
+        np.save(_field_path(store_path, field), values)
+
+    np.save(os.path.join(store_path, TICKERS_FILE), np.asarray(tickers, dtype=str))
+    # The dates file is written last, its modification time marks a complete ingest
+    np.save(
+        os.path.join(store_path, DATES_FILE), np.asarray(dates, dtype="datetime64[ns]")
+    )
+
+
+def ingest_csv(csv_path, store_path=None, fields=None, dtype=np.float64):
+    """
+    Read a long-format csv file once and save it to a store.
+
+    Parameters
+    ----------
+    csv_path : str
+        The csv file with "date", "ticker" and field columns
+    store_path : str
+        The store directory, defaults to `default_store_path(csv_path)`
+    fields : list of str
+        The columns to save, defaults to every column except "date" and "ticker"
+    dtype : dtype
+        The dtype of the saved matrices
+
+    Returns
+    -------
+    store_path : str
+        The store directory written
+    """
+    store_path = store_path or default_store_path(csv_path)
+    df = pd.read_csv(csv_path, parse_dates=["date"], index_col=False)
+    if fields is None:
+        fields = [column for column in df.columns if column not in ("date", "ticker")]
+
+    ingest(df, store_path, fields, dtype)
+
+    return store_path
+
+
+def load(store_path, fields=None, mmap=True):
+    """
+    Load date x ticker DataFrames from a store.
+
+    With `mmap` the DataFrames wrap read-only memory maps of the saved
+    matrices, so no data is copied or read until it's used. Writing into them
+    in place raises a ValueError, load with `mmap=False` or copy them to
+    modify the values.
+
+    Parameters
+    ----------
+    store_path : str
+        The store directory
+    fields : list of str
+        The fields to load, defaults to every field in the store
+    mmap : bool
+        Whether to memory map the matrices instead of reading them
+
+    Returns
+    -------
+    prices : dict of DataFrames
+        Values for each ticker and date, keyed by field
+    """
+    dates = pd.DatetimeIndex(np.load(os.path.join(store_path, DATES_FILE)), name="date")
+    tickers = pd.Index(np.load(os.path.join(store_path, TICKERS_FILE)), name="ticker")
+    if fields is None:
+        fields = stored_fields(store_path)
+
+    mmap_mode = "r" if mmap else None
+    return {
+        field: pd.DataFrame(
+            np.load(_field_path(store_path, field), mmap_mode=mmap_mode),
+            dates,
+            tickers,
+            copy=False,
+        )
+        for field in fields
+    }
+
+
+def is_stale(csv_path, store_path, fields, dtype=None):
+    """
+    Check whether a store has to be ingested again from its csv file.
+
+    Parameters
+    ----------
+    csv_path : str
+        The csv file the store is built from
+    store_path : str
+        The store directory
+    fields : list of str
+        The fields that have to be in the store
+    dtype : dtype
+        The dtype the fields have to be saved as, any dtype if None
+
+    Returns
+    -------
+    stale : bool
+        True if the store is missing, older than the csv, lacks a field or
+        saved one with another dtype
+    """
+    dates_path = os.path.join(store_path, DATES_FILE)
+    if not os.path.exists(dates_path):
+        return True
+    if os.path.getmtime(csv_path) > os.path.getmtime(dates_path):
+        return True
+    if not set(fields).issubset(stored_fields(store_path)):
+        return True
+
+    # Only the headers are read
+    return dtype is not None and any(
+        np.load(_field_path(store_path, field), mmap_mode="r").dtype != np.dtype(dtype)
+        for field in fields
+    )
+
+
+def load_csv(csv_path, fields, store_path=None, dtype=np.float64, mmap=True):
+    """
+    Load date x ticker DataFrames for a long-format csv file through its store.
+
+    The csv file is only parsed when the store is stale, every other call
+    memory maps the saved matrices. See `load` for the read-only DataFrames
+    this gives with `mmap`.
+
+    Parameters
+    ----------
+    csv_path : str
+        The csv file with "date", "ticker" and field columns
+    fields : list of str
+        The fields to load
+    store_path : str
+        The store directory, defaults to `default_store_path(csv_path)`
+    dtype : dtype
+        The dtype of the saved matrices when the store is ingested
+    mmap : bool
+        Whether to memory map the matrices instead of reading them
+
+    Returns
+    -------
+    prices : dict of DataFrames
+        Values for each ticker and date, keyed by field
+    """
+    store_path = store_path or default_store_path(csv_path)
+    if is_stale(csv_path, store_path, fields, dtype):
+        # Keep the fields already in the store aligned with the new dates
+        all_fields = sorted(set(fields).union(stored_fields(store_path)))
+        ingest_csv(csv_path, store_path, all_fields, dtype)
+
+    return load(store_path, fields, mmap)
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+
+def top_n_mask(values, top_n, keep="all"):
+    """
+    Mark the `top_n` largest values of each row.
+
+    The n-th largest value of every row is found with a single partition over
+    the whole matrix. NaNs are never selected, and rows with fewer than
+    `top_n` valid values select all of them.
+
+    Parameters
+    ----------
+    values : 1 or 2 dimensional Ndarray
+        Values to rank, one row per date and one column per ticker
+    top_n : int
+        The number of largest values to mark in each row
+    keep : str
+        "all" marks every value tied with the n-th largest,
+        "first" marks exactly `top_n` values, resolving ties by column order
+
+    Returns
+    -------
+    mask : Ndarray of bool
+        True for the selected values, same shape as `values`
+    """
+    assert keep in ("all", "first")
+
+    values = np.asarray(values, dtype=np.float64)
+    is_row = values.ndim == 1
+    values = np.atleast_2d(values)
+    n_columns = values.shape[1]
+
+    if top_n <= 0 or n_columns == 0:
+        mask = np.zeros(values.shape, dtype=bool)
+        return mask[0] if is_row else mask
+
+    top_n = min(top_n, n_columns)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, -np.inf)
+
+    kth = n_columns - top_n
+    threshold = np.partition(filled, kth, axis=1)[:, kth, np.newaxis]
+
+    if keep == "all":
+        mask = valid & (filled >= threshold)
+    else:
+        above = valid & (filled > threshold)
+        tied = valid & (filled == threshold)
+        slots_left = top_n - above.sum(axis=1, keepdims=True)
+        mask = above | (tied & (np.cumsum(tied, axis=1) <= slots_left))
+
+    return mask[0] if is_row else mask
+
+
+def bottom_n_mask(values, bottom_n, keep="all"):
+    """
+    Mark the `bottom_n` smallest values of each row.
+
+    Parameters
+    ----------
+    values : 1 or 2 dimensional Ndarray
+        Values to rank, one row per date and one column per ticker
+    bottom_n : int
+        The number of smallest values to mark in each row
+    keep : str
+        How to handle ties, see `top_n_mask`
+
+    Returns
+    -------
+    mask : Ndarray of bool
+        True for the selected values, same shape as `values`
+    """
+    return top_n_mask(-np.asarray(values, dtype=np.float64), bottom_n, keep)
+
+
+def top_n_frame(df, top_n, keep="all", dtype=np.int8):
+    """
+    Mark the top performing tickers for each date with a 1.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Values for each ticker and date
+    top_n : int
+        The number of top tickers to mark for each date
+    keep : str
+        How to handle ties, see `top_n_mask`
+    dtype : dtype
+        The dtype of the returned marks
+
+    Returns
+    -------
+    top : DataFrame
+        Top tickers for each ticker and date marked with a 1
+    """
+    return pd.DataFrame(
+        top_n_mask(df.values, top_n, keep).astype(dtype), df.index, df.columns
+    )
+
+
+def bottom_n_frame(df, bottom_n, keep="all", dtype=np.int8):
+    """
+    Mark the bottom performing tickers for each date with a 1.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Values for each ticker and date
+    bottom_n : int
+        The number of bottom tickers to mark for each date
+    keep : str
+        How to handle ties, see `top_n_mask`
+    dtype : dtype
+        The dtype of the returned marks
+
+    Returns
+    -------
+    bottom : DataFrame
+        Bottom tickers for each ticker and date marked with a 1
+    """
+    return pd.DataFrame(
+        bottom_n_mask(df.values, bottom_n, keep).astype(dtype), df.index, df.columns
+    )
+
+
+def top_n_labels(series, top_n, keep="first"):
+    """
+    Get the labels of the `top_n` largest values in a Series.
+
+    Parameters
+    ----------
+    series : Pandas Series
+        Values for each label
+    top_n : int
+        The number of labels to get
+    keep : str
+        How to handle ties, see `top_n_mask`
+
+    Returns
+    -------
+    labels : Index
+        Labels of the largest values, in their original order
+    """
+    return series.index[top_n_mask(series.values, top_n, keep)]
@@ -0,0 +1,157 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from quant_engine import covariance, optimizer, risk_model
+
+
+# Per process state of the pool workers, set once by `_init_worker`
+_worker = {}
+
+
+def _rebalance_solvers(returns, chunk_size, scale, solver, n_factors):
+    if n_factors is None:
+        return (
+            covariance.RollingCovariance(returns, chunk_size),
+            optimizer.IndexTrackingOptimizer(returns.shape[1], scale, solver),
+        )
+
+    # Factor risk models keep large universes out of dense covariances
+    return (
+        risk_model.RollingFactorModel(returns, chunk_size, n_factors),
+        optimizer.ProjectedGradientTrackingOptimizer(scale),
+    )
+
+
+def _pool_context():
+    """
+    Get the multiprocessing context of the worker pool.
+
+    Workers are forked where the platform allows it. Spawned or forkserver
+    workers import the parent's main module again, which reruns every cell
+    of a notebook exported to a script that calls `rebalance_weights`.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+
+    return multiprocessing.get_context()
+
+
+def _init_worker(shm_name, shape, chunk_size, scale, solver, n_factors):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    returns = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    _worker["shm"] = shm
+    _worker["rolling_covariance"], _worker["optimizer"] = _rebalance_solvers(
+        returns, chunk_size, scale, solver, n_factors
+    )
+
+
+def _solve_block(ends, block_index_weights, rolling_covariance, tracking_optimizer):
+    return [
+        tracking_optimizer.solve(rolling_covariance.covariance(end), weights)
+        for end, weights in zip(ends, block_index_weights)
+    ]
+
+
+def _solve_worker_block(ends, block_index_weights):
+    return _solve_block(
+        ends, block_index_weights, _worker["rolling_covariance"], _worker["optimizer"]
+    )
+
+
+def rebalance_weights(
+    returns,
+    index_weights,
+    shift_size,
+    chunk_size,
+    n_workers=1,
+    scale=2.0,
+    solver=None,
+    blocks_per_worker=4,
+    n_factors=None,
+):
+    """
+    Get the optimal weights for each rebalance, optionally across processes.
+
+    Rebalances are independent given the returns, so with more than one
+    worker consecutive rebalances are grouped in blocks and solved in a
+    process pool. The returns are put in shared memory once instead of being
+    pickled for every task, and each worker keeps its own optimizer and
+    rolling covariance. The weights keep the order of the rebalances.
+
+    The workers are forked where the platform allows it. Where it doesn't,
+    like on Windows, they're spawned, and a script calling this with more
+    than one worker needs an `if __name__ == "__main__"` guard.
+
+    Parameters
+    ----------
+    returns : 2 dimensional Ndarray
+        Returns for each date and ticker, without NaNs
+    index_weights : 2 dimensional Ndarray
+        Index weight for each date and ticker
+    shift_size : int
+        The number of days between each rebalance
+    chunk_size : int
+        The number of days to look in the past for rebalancing
+    n_workers : int
+        The number of processes to use, 1 solves in this process
+    scale : float
+        The penalty factor for weights the deviate from the index
+    solver : str
+        The cvxpy solver to use, defaults to cvxpy's choice
+    blocks_per_worker : int
+        The number of blocks of rebalances given to each worker
+    n_factors : int
+        The number of factors of a PCA factor risk model to use for the
+        covariance, which is solved with projected gradient steps, instead of
+        the sample covariance
+
+    Returns
+    -------
+    all_rebalance_weights : list of Ndarrays
+        The ETF weights for each point they are rebalanced
+    """
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    index_weights = np.asarray(index_weights, dtype=np.float64)
+    assert returns.shape == index_weights.shape
+    assert n_workers > 0
+
+    ends = np.arange(chunk_size, len(returns), shift_size)
+    if n_workers == 1:
+        return _solve_block(
+            ends,
+            index_weights[ends - 1],
+            *_rebalance_solvers(returns, chunk_size, scale, solver, n_factors),
+        )
+
+    blocks = [
+        block
+        for block in np.array_split(ends, n_workers * blocks_per_worker)
+        if len(block)
+    ]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(returns.nbytes, 1))
+    try:
+        np.ndarray(returns.shape, dtype=np.float64, buffer=shm.buf)[:] = returns
+
+        with ProcessPoolExecutor(
+            n_workers,
+            mp_context=_pool_context(),
+            initializer=_init_worker,
+            initargs=(shm.name, returns.shape, chunk_size, scale, solver, n_factors),
+        ) as executor:
+            futures = [
+                executor.submit(_solve_worker_block, block, index_weights[block - 1])
+                for block in blocks
+            ]
+            all_rebalance_weights = [
+                weights for future in futures for weights in future.result()
+            ]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return all_rebalance_weights
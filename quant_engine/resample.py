@@ -0,0 +1,230 @@
+"""
+Resample date x ticker matrices to weeks, months or quarters.
+
+The row positions where each period starts and ends are found once with
+`searchsorted` on the dates. Each statistic is then a gather of rows with a
+single fancy index, or a reduction over the rows of every period padded into
+one block, for every ticker at once and without a Python call per period.
+"""
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+
+# The rules `resample` closes and labels on the right, at the end of each
+# period, from pandas' `TimeGrouper` and with the names of later versions
+_END_ANCHORED_RULES = {
+    "W",
+    "M",
+    "BM",
+    "Q",
+    "BQ",
+    "A",
+    "BA",
+    "ME",
+    "BME",
+    "QE",
+    "BQE",
+    "YE",
+    "BYE",
+}
+
+
+def period_bounds(dates, freq):
+    """
+    Find the rows of each period.
+
+    Parameters
+    ----------
+    dates : DatetimeIndex
+        Sorted dates of the rows
+    freq : str
+        The period frequency, a single end anchored period like "W", "W-MON",
+        "M", "BM", "Q" or "A". Start anchored periods like "MS" or "QS" aren't
+        supported.
+
+    Returns
+    -------
+    labels : DatetimeIndex
+        The end date of each period from the first date to the last, like the
+        labels of `resample(freq)`
+    starts : 1 dimensional Ndarray
+        Position of the first row of each period
+    ends : 1 dimensional Ndarray
+        Position after the last row of each period, equal to the start for
+        periods without rows
+    """
+    offset = to_offset(freq)
+    assert offset.n == 1, "Multiples of a period aren't supported"
+    assert (
+        offset.rule_code.split("-")[0] in _END_ANCHORED_RULES
+    ), "{} isn't an end anchored period".format(freq)
+    if not len(dates):
+        return pd.DatetimeIndex([], freq=offset), np.zeros(0, int), np.zeros(0, int)
+
+    labels = pd.date_range(
+        offset.rollforward(dates[0].normalize()),
+        offset.rollforward(dates[-1].normalize()),
+        freq=offset,
+    )
+    # Rows up to the end of the label day are in its period
+    ends = dates.searchsorted(labels + pd.Timedelta(days=1))
+    starts = np.concatenate([[0], ends[:-1]])
+
+    return labels, starts, ends
+
+
+def _period_blocks(values, starts, ends):
+    """
+    Gather the rows of each period into a block padded to the longest period.
+
+    Shorter periods are padded with copies of their last row, which leaves
+    their first, last, max and min unchanged.
+    """
+    offsets = np.arange((ends - starts).max())
+    positions = np.minimum(starts[:, np.newaxis] + offsets, ends[:, np.newaxis] - 1)
+    is_padding = starts[:, np.newaxis] + offsets >= ends[:, np.newaxis]
+
+    return values[positions], is_padding
+
+
+def _first_valid(block, reverse):
+    is_valid = ~np.isnan(block)
+    if reverse:
+        offsets = block.shape[1] - 1 - np.argmax(is_valid[:, ::-1], axis=1)
+    else:
+        offsets = np.argmax(is_valid, axis=1)
+    offsets = offsets[:, np.newaxis]
+
+    return np.where(
+        np.take_along_axis(is_valid, offsets, 1),
+        np.take_along_axis(block, offsets, 1),
+        np.nan,
+    )[:, 0]
+
+
+def resample_rows(values, starts, ends, how):
+    """
+    Reduce the rows of each period.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date
+    starts : 1 dimensional Ndarray
+        Position of the first row of each period
+    ends : 1 dimensional Ndarray
+        Position after the last row of each period
+    how : str
+        "first" or "last" for the first or last value that isn't NaN, like
+        `Resampler.first` and `Resampler.last`, "first_row" or "last_row" for
+        the first or last row as is, "max", "min", "sum" or "mean"
+
+    Returns
+    -------
+    resampled : Ndarray
+        A row for each period. Periods without values are NaN, or 0 for "sum".
+        Integer values keep their dtype when every period has rows, except for
+        "mean".
+    """
+    assert how in (
+        "first",
+        "last",
+        "first_row",
+        "last_row",
+        "max",
+        "min",
+        "sum",
+        "mean",
+    )
+
+    values = np.asarray(values)
+    is_float = np.issubdtype(values.dtype, np.floating)
+    has_rows = ends > starts
+
+    if how == "mean":
+        dtype = np.result_type(values.dtype, np.float64)
+    else:
+        dtype = values.dtype if is_float or has_rows.all() else np.float64
+    resampled = np.full(
+        (len(starts),) + values.shape[1:], 0 if how == "sum" else np.nan, dtype
+    )
+    if not has_rows.any():
+        return resampled
+    starts, ends = starts[has_rows], ends[has_rows]
+
+    if how in ("first_row", "first"):
+        rows = values[starts]
+    elif how in ("last_row", "last"):
+        rows = values[ends - 1]
+    if how in ("first_row", "last_row") or (
+        how in ("first", "last") and not (is_float and np.isnan(rows).any())
+    ):
+        # Rows without NaNs already hold the first or last values
+        resampled[has_rows] = rows
+        return resampled
+
+    block, is_padding = _period_blocks(values, starts, ends)
+    if how in ("first", "last"):
+        resampled[has_rows] = _first_valid(block, reverse=how == "last")
+    elif how == "max":
+        # fmax and fmin skip NaNs like the Resampler does
+        resampled[has_rows] = np.fmax.reduce(block, axis=1)
+    elif how == "min":
+        resampled[has_rows] = np.fmin.reduce(block, axis=1)
+    else:
+        is_padding = is_padding.reshape(is_padding.shape + (1,) * (values.ndim - 1))
+        block = block.astype(dtype, copy=False)
+        block[np.broadcast_to(is_padding, block.shape)] = 0
+        sums = np.nansum(block, axis=1)
+        if how == "sum":
+            resampled[has_rows] = sums
+        else:
+            counts = np.sum(~np.isnan(block) & ~is_padding, axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                resampled[has_rows] = np.where(counts > 0, sums / counts, np.nan)
+
+    return resampled
+
+
+def resample_frames(frames, freq, hows):
+    """
+    Resample several DataFrames with the same dates in one pass.
+
+    Parameters
+    ----------
+    frames : list of DataFrames or Series
+        Values for each date, all with the same index
+    freq : str
+        The period frequency, see `period_bounds`
+    hows : list of str
+        How to reduce the rows of each frame, see `resample_rows`
+
+    Returns
+    -------
+    resampled_frames : list of DataFrames or Series
+        The resampled values of each frame, indexed by period end
+    """
+    assert len(frames) == len(hows)
+    dates = frames[0].index
+    assert all(frame.index.equals(dates) for frame in frames)
+
+    labels, starts, ends = period_bounds(dates, freq)
+    labels = labels.rename(dates.name)
+
+    resampled_frames = []
+    for frame, how in zip(frames, hows):
+        resampled = resample_rows(frame.values, starts, ends, how)
+        if isinstance(frame, pd.Series):
+            resampled_frames.append(pd.Series(resampled, labels, name=frame.name))
+        else:
+            resampled_frames.append(pd.DataFrame(resampled, labels, frame.columns))
+
+    return resampled_frames
+
+
+def resample_frame(frame, freq, how):
+    """
+    Resample a DataFrame, see `resample_frames`.
+    """
+    return resample_frames([frame], freq, [how])[0]
@@ -0,0 +1,300 @@
+"""
+PCA factor risk models for large universes.
+
+The covariance of N tickers is modeled as B F B.T + S, with the exposures B
+of K principal components, their covariance F, which is diagonal since the
+components are uncorrelated, and the idiosyncratic variances S. Stored this
+way the model takes O(N K) memory instead of O(N^2), and a portfolio's
+variance ||F^(1/2) B.T x||^2 + sum(s_i x_i^2) takes O(N K) time.
+"""
+import numpy as np
+
+
+class FactorRiskModel:
+    """
+    Covariance of the returns as factor and idiosyncratic parts.
+
+    Parameters
+    ----------
+    factor_betas : 2 dimensional Ndarray
+        Exposure of each ticker to each factor, with orthonormal columns
+    factor_variances : 1 dimensional Ndarray
+        Variance of each factor's returns
+    idiosyncratic_variances : 1 dimensional Ndarray
+        Variance of each ticker's returns that the factors don't explain
+    """
+
+    def __init__(self, factor_betas, factor_variances, idiosyncratic_variances):
+        self.factor_betas = factor_betas
+        self.factor_variances = factor_variances
+        self.idiosyncratic_variances = idiosyncratic_variances
+
+    @property
+    def shape(self):
+        n_tickers = len(self.idiosyncratic_variances)
+        return (n_tickers, n_tickers)
+
+    def factor_loadings(self):
+        """
+        Get F^(1/2) B.T, so the factor variance of x is ||loadings @ x||^2.
+        """
+        return np.sqrt(self.factor_variances)[:, np.newaxis] * self.factor_betas.T
+
+    def dot(self, x):
+        """
+        Multiply the covariance with weights.
+
+        Parameters
+        ----------
+        x : 1 dimensional Ndarray
+            Weight of each ticker
+
+        Returns
+        -------
+        covariance_x : 1 dimensional Ndarray
+            The covariance times `x`
+        """
+        return (
+            self.factor_betas.dot(self.factor_variances * self.factor_betas.T.dot(x))
+            + self.idiosyncratic_variances * x
+        )
+
+    def portfolio_variance(self, x):
+        """
+        Calculate the variance of a portfolio.
+
+        Parameters
+        ----------
+        x : 1 dimensional Ndarray
+            Weight of each ticker
+
+        Returns
+        -------
+        variance : float
+            x.T @ covariance @ x
+        """
+        return np.sum(self.factor_loadings().dot(x) ** 2) + np.sum(
+            self.idiosyncratic_variances * x**2
+        )
+
+    def covariance(self):
+        """
+        Build the dense covariance, for small universes.
+
+        Returns
+        -------
+        returns_covariance : 2 dimensional Ndarray
+            B F B.T + S
+        """
+        return (self.factor_betas * self.factor_variances).dot(
+            self.factor_betas.T
+        ) + np.diag(self.idiosyncratic_variances)
+
+    def max_eigenvalue(self):
+        """
+        Bound the largest eigenvalue of the covariance from above.
+
+        With orthonormal exposures the factor part's eigenvalues are the
+        factor variances, so this is the largest of them plus the largest
+        idiosyncratic variance.
+        """
+        return np.max(self.factor_variances, initial=0) + np.max(
+            self.idiosyncratic_variances, initial=0
+        )
+
+    def penalized_solve(self, support, penalty, right_hand_sides):
+        """
+        Solve (covariance + penalty * I) y = b over some of the tickers.
+
+        Uses the Woodbury identity, so only a K x K system is factored.
+
+        Parameters
+        ----------
+        support : 1 dimensional Ndarray of bool
+            The tickers of the system
+        penalty : float
+            The positive amount added to the diagonal
+        right_hand_sides : Ndarray
+            The right hand side b of each system in a column
+
+        Returns
+        -------
+        y : Ndarray
+            The solution of each system in a column
+        """
+        diagonal = (self.idiosyncratic_variances[support] + penalty)[:, np.newaxis]
+        loadings = self.factor_betas[support] * np.sqrt(self.factor_variances)
+
+        scaled = right_hand_sides / diagonal
+        scaled_loadings = loadings / diagonal
+        capacitance = np.eye(loadings.shape[1]) + loadings.T.dot(scaled_loadings)
+
+        return scaled - scaled_loadings.dot(
+            np.linalg.solve(capacitance, loadings.T.dot(scaled))
+        )
+
+
+def _randomized_components(
+    centered, n_factors, n_oversamples, n_power_iterations, start, random_state
+):
+    """
+    Find the leading right singular vectors with a randomized range finder.
+
+    The columns are projected onto a few random, or given, directions, which
+    power iterations turn towards the leading singular vectors. An exact SVD
+    of the small projection then gives the components.
+    """
+    n_components = n_factors + n_oversamples
+    if start is None:
+        start = np.random.default_rng(random_state).standard_normal(
+            (centered.shape[1], n_components)
+        )
+
+    basis, _ = np.linalg.qr(centered.dot(start))
+    for _ in range(n_power_iterations):
+        basis, _ = np.linalg.qr(centered.T.dot(basis))
+        basis, _ = np.linalg.qr(centered.dot(basis))
+
+    _, _, components = np.linalg.svd(basis.T.dot(centered), full_matrices=False)
+
+    return components
+
+
+def fit_pca_risk_model(
+    returns,
+    n_factors,
+    ann_factor=1,
+    svd_solver="randomized",
+    n_oversamples=10,
+    n_power_iterations=4,
+    start=None,
+    random_state=None,
+):
+    """
+    Fit a PCA factor risk model to returns.
+
+    Parameters
+    ----------
+    returns : 2 dimensional Ndarray
+        Returns with a row for each date and a column for each ticker, without
+        NaNs
+    n_factors : int
+        The number of principal components to use as factors
+    ann_factor : int
+        The number to multiply the variances by, like 252 to annualize daily
+        returns
+    svd_solver : str
+        "randomized" for a randomized truncated SVD or "full" for an exact SVD
+    n_oversamples : int
+        The number of extra random directions of the randomized SVD
+    n_power_iterations : int
+        The number of power iterations of the randomized SVD
+    start : 2 dimensional Ndarray
+        Directions to start the randomized SVD from instead of random ones,
+        like the components of a previous fit, one per column
+    random_state : int
+        The seed of the random directions
+
+    Returns
+    -------
+    risk_model : FactorRiskModel
+        The factor risk model. Its variances use one degree of freedom, like
+        `np.cov`.
+    """
+    assert svd_solver in ("randomized", "full")
+
+    returns = np.asarray(returns, dtype=np.float64)
+    n_dates = len(returns)
+    centered = returns - returns.mean(axis=0)
+    n_factors = min(n_factors, *centered.shape)
+
+    if svd_solver == "full" or n_factors + n_oversamples >= min(centered.shape):
+        _, _, components = np.linalg.svd(centered, full_matrices=False)
+    else:
+        components = _randomized_components(
+            centered, n_factors, n_oversamples, n_power_iterations, start, random_state
+        )
+    factor_betas = components[:n_factors].T
+
+    factor_returns = centered.dot(factor_betas)
+    residuals = centered - factor_returns.dot(factor_betas.T)
+
+    return FactorRiskModel(
+        factor_betas,
+        np.sum(factor_returns**2, axis=0) / (n_dates - 1) * ann_factor,
+        np.sum(residuals**2, axis=0) / (n_dates - 1) * ann_factor,
+    )
+
+
+class RollingFactorModel:
+    """
+    PCA factor risk models of a window of returns that slides through the dates.
+
+    Each window is fit with a randomized SVD started from the components of
+    the last window, which are already close to the new ones, so few power
+    iterations are needed.
+
+    Parameters
+    ----------
+    returns : 2 dimensional Ndarray
+        Returns with a row for each date and a column for each ticker
+    window_size : int
+        The number of dates in each window
+    n_factors : int
+        The number of principal components to use as factors
+    n_oversamples : int
+        The number of extra directions of the randomized SVD
+    n_power_iterations : int
+        The number of power iterations for each window
+    """
+
+    def __init__(
+        self, returns, window_size, n_factors, n_oversamples=10, n_power_iterations=2
+    ):
+        assert window_size > 1
+
+        self.returns = np.asarray(returns, dtype=np.float64)
+        self.window_size = window_size
+        self.n_factors = n_factors
+        self.n_oversamples = n_oversamples
+        self.n_power_iterations = n_power_iterations
+        self.start = None
+
+    def covariance(self, end):
+        """
+        Fit the factor risk model of the window ending before date `end`.
+
+        Parameters
+        ----------
+        end : int
+            Position of the first date after the window
+
+        Returns
+        -------
+        risk_model : FactorRiskModel
+            The factor risk model of `returns[end - window_size : end]`
+        """
+        assert self.window_size <= end <= len(self.returns)
+
+        risk_model = fit_pca_risk_model(
+            self.returns[end - self.window_size : end],
+            self.n_factors,
+            n_oversamples=self.n_oversamples,
+            n_power_iterations=self.n_power_iterations,
+            start=self.start,
+            random_state=0,
+        )
+        # Start the next window from these components, topped up with random
+        # directions to keep the oversampling
+        self.start = np.linalg.qr(
+            np.hstack(
+                [
+                    risk_model.factor_betas,
+                    np.random.default_rng(end).standard_normal(
+                        (risk_model.factor_betas.shape[0], self.n_oversamples)
+                    ),
+                ]
+            )
+        )[0]
+
+        return risk_model
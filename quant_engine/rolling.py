@@ -0,0 +1,458 @@
+"""
+Rolling window statistics of date x ticker matrices.
+
+Counts and sums over trailing windows come from prefix sums: with C_t the
+sum of the rows before t, the window of W rows ending at t sums to
+C_(t+1) - C_(t+1-W). The prefix sums of the values and of the count of
+values that aren't NaN are computed once, so every window length after that
+is a single subtraction over the whole matrix. Several window lengths are
+computed in one pass, and the results can be written into preallocated
+buffers with `out`.
+
+Variances can't take their sums of squares from prefix sums: subtracting two
+sums over the whole history loses a quiet window's variance to the rounding
+error of everything before it. They're summed in blocks as long as the window
+instead, so a window only adds its own values, see `_block_window_sums`.
+
+Like `DataFrame.rolling`, NaNs are skipped, and a window with fewer than
+`min_periods` values, the window length by default, is NaN.
+"""
+import numpy as np
+
+from quant_engine import extremes, volatility
+
+
+def _as_windows(windows):
+    """
+    Get the window lengths as a list and whether a single one was given.
+    """
+    is_single = np.ndim(windows) == 0
+    windows = [int(windows)] if is_single else [int(window) for window in windows]
+    assert all(window > 0 for window in windows)
+
+    return windows, is_single
+
+
+def _output(out, shape, n_windows, is_single):
+    """
+    Get the buffer to write the statistics of every window into.
+    """
+    shape = shape if is_single else (n_windows,) + shape
+    if out is None:
+        return np.empty(shape)
+    assert out.shape == shape, "out has shape {}, not {}".format(out.shape, shape)
+
+    return out
+
+
+def _window_rows(output, is_single):
+    """
+    Get the statistics of each window in the output buffer.
+    """
+    return [output] if is_single else list(output)
+
+
+def _prefix_sums(values):
+    """
+    Sum the rows before each row, with one more row for the sum of all rows.
+    """
+    prefix = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=prefix[1:])
+
+    return prefix
+
+
+def _window_sums(prefix, window, out):
+    """
+    Sum the trailing window of each row from the prefix sums.
+
+    The first `window - 1` rows sum the rows so far.
+    """
+    n_dates = len(prefix) - 1
+    window = min(window, n_dates + 1)
+    out[: window - 1] = prefix[1:window]
+    np.subtract(prefix[window:], prefix[: n_dates + 1 - window], out=out[window - 1 :])
+
+    return out
+
+
+def _mask_short_windows(statistic, counts, min_periods):
+    """
+    Set the windows with fewer than `min_periods` values to NaN.
+    """
+    statistic[counts < min_periods] = np.nan
+
+
+def _blocks(values, block_size):
+    """
+    Split the rows into blocks of `block_size` rows, padding the last with 0.
+    """
+    n_blocks = -(-len(values) // block_size)
+    blocks = np.zeros((n_blocks * block_size,) + values.shape[1:], values.dtype)
+    blocks[: len(values)] = values
+
+    return blocks.reshape((n_blocks, block_size) + values.shape[1:])
+
+
+def _cumulative_block_sums(blocks, reverse=False):
+    """
+    Add the rows before each row of its block to it in place, or the rows
+    after it with `reverse`.
+
+    A row at a time, which is faster than `np.cumsum` along the middle axis.
+    """
+    block_size = blocks.shape[1]
+    rows = range(block_size - 2, -1, -1) if reverse else range(1, block_size)
+    step = 1 if reverse else -1
+    for row in rows:
+        np.add(blocks[:, row], blocks[:, row + step], out=blocks[:, row])
+
+    return blocks
+
+
+def _block_window_sums(own, previous):
+    """
+    Sum the trailing window of each row of blocks as long as the window.
+
+    A row's window is the rows of its block up to it, summed from `own`, and
+    the rows after it in the block before, summed from `previous`, so it only
+    adds the values in it. The first `window - 1` rows sum the rows so far.
+    Both are overwritten.
+    """
+    sums = _cumulative_block_sums(own)
+    suffix_sums = _cumulative_block_sums(previous, reverse=True)
+    sums[1:, :-1] += suffix_sums[:-1, 1:]
+
+    return sums.reshape((-1,) + sums.shape[2:])
+
+
+def _block_centers(blocks, is_valid):
+    """
+    Average the values of each block.
+
+    A block without values takes the average of the last block with values,
+    or 0 if there's none.
+    """
+    counts = is_valid.sum(axis=1)
+    has_values = counts > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centers = np.where(has_values, blocks.sum(axis=1) / counts, 0)
+
+    block_i = np.arange(len(blocks)).reshape((-1,) + (1,) * (centers.ndim - 1))
+    last_with_values = np.where(has_values, block_i, 0)
+    np.maximum.accumulate(last_with_values, axis=0, out=last_with_values)
+
+    return np.take_along_axis(centers, last_with_values, axis=0)
+
+
+# Sums of squared deviations within this many rounding errors of the sums of
+# squares they're taken from are treated as 0
+_ROUNDING_ERRORS = 64
+
+
+def _variance(counts, sums, squares, ddof, out):
+    """
+    Calculate the variance of each window into `out` from its centered sums.
+
+    Windows of equal values are exactly 0, not the rounding error left by
+    subtracting the squared mean.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Sum of squared deviations from the window mean
+        np.multiply(sums, sums, out=out)
+        np.divide(out, counts, out=out)
+        np.subtract(squares, out, out=out)
+        out *= out > _ROUNDING_ERRORS * np.finfo(np.float64).eps * squares
+        np.divide(out, counts - ddof, out=out)
+    out[counts <= ddof] = np.nan
+
+    return out
+
+
+class _WindowMoments:
+    """
+    Prefix sums of the count and, with `sums`, values in each column.
+    """
+
+    def __init__(self, values, sums=True):
+        values = np.asarray(values, dtype=np.float64)
+        self.is_valid = ~np.isnan(values)
+        self.has_nan = not self.is_valid.all()
+        self.values = np.where(self.is_valid, values, 0) if self.has_nan else values
+        self.shape = values.shape
+
+        self.count_prefix = _prefix_sums(self.is_valid)
+        if sums:
+            self.sum_prefix = _prefix_sums(self.values)
+
+    def counts(self, window):
+        return _window_sums(self.count_prefix, window, np.empty(self.shape))
+
+    def sums(self, window, out):
+        """
+        Sum the values of each window into `out`.
+        """
+        return _window_sums(self.sum_prefix, window, out)
+
+    def centered_sums(self, window):
+        """
+        Sum the centered values and their squares in each window from blocks.
+
+        The values are centered on the mean of their block, and the values a
+        window takes from the block before on the mean of the window's block,
+        so the sums of squares stay close to the squared deviations they're
+        used for wherever the prices have drifted to.
+
+        Returns
+        -------
+        centers : Ndarray
+            The value each date's window is centered on
+        sums : Ndarray
+            The sum of the centered values of each window
+        squares : Ndarray
+            The sum of the squares of the centered values of each window
+        """
+        n_dates = len(self.values)
+        block_size = max(min(window, n_dates), 1)
+        is_valid = _blocks(self.is_valid, block_size)
+        blocks = _blocks(self.values, block_size)
+
+        centers = _block_centers(blocks, is_valid)
+        next_centers = np.concatenate([centers[1:], centers[-1:]])
+        own = blocks - centers[:, np.newaxis]
+        previous = blocks - next_centers[:, np.newaxis]
+        if self.has_nan:
+            own *= is_valid
+            previous *= is_valid
+        squares = _block_window_sums(own**2, previous**2)[:n_dates]
+        sums = _block_window_sums(own, previous)[:n_dates]
+
+        return np.repeat(centers, block_size, axis=0)[:n_dates], sums, squares
+
+
+def rolling_sum(values, windows, min_periods=None, out=None):
+    """
+    Sum the trailing window of each date.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date and a column for each ticker
+    windows : int or list of int
+        The number of dates in each window
+    min_periods : int
+        The fewest values a window needs, defaults to the window length
+    out : Ndarray
+        The buffer to write the sums into, with the shape of the result
+
+    Returns
+    -------
+    sums : Ndarray
+        The sum for each date, with the shape of `values` for a single window,
+        or stacked along a first axis for a list of windows
+    """
+    windows, is_single = _as_windows(windows)
+    moments = _WindowMoments(values)
+    output = _output(out, moments.shape, len(windows), is_single)
+
+    for window, sums in zip(windows, _window_rows(output, is_single)):
+        moments.sums(window, sums)
+        _mask_short_windows(
+            sums, moments.counts(window), window if min_periods is None else min_periods
+        )
+
+    return output
+
+
+def rolling_mean(values, windows, min_periods=None, out=None):
+    """
+    Average the trailing window of each date.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date and a column for each ticker
+    windows : int or list of int
+        The number of dates in each window
+    min_periods : int
+        The fewest values a window needs, defaults to the window length
+    out : Ndarray
+        The buffer to write the means into, with the shape of the result
+
+    Returns
+    -------
+    means : Ndarray
+        The mean for each date, see `rolling_sum` for the shape
+    """
+    windows, is_single = _as_windows(windows)
+    moments = _WindowMoments(values)
+    output = _output(out, moments.shape, len(windows), is_single)
+
+    for window, means in zip(windows, _window_rows(output, is_single)):
+        counts = moments.counts(window)
+        moments.sums(window, means)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            np.divide(means, counts, out=means)
+        _mask_short_windows(
+            means, counts, window if min_periods is None else min_periods
+        )
+
+    return output
+
+
+def rolling_var(values, windows, ddof=1, min_periods=None, out=None):
+    """
+    Calculate the variance of the trailing window of each date.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date and a column for each ticker
+    windows : int or list of int
+        The number of dates in each window
+    ddof : int
+        The delta degrees of freedom, 1 like `Rolling.var`
+    min_periods : int
+        The fewest values a window needs, defaults to the window length
+    out : Ndarray
+        The buffer to write the variances into, with the shape of the result
+
+    Returns
+    -------
+    variances : Ndarray
+        The variance for each date, see `rolling_sum` for the shape
+    """
+    windows, is_single = _as_windows(windows)
+    moments = _WindowMoments(values, sums=False)
+    output = _output(out, moments.shape, len(windows), is_single)
+
+    for window, variances in zip(windows, _window_rows(output, is_single)):
+        counts = moments.counts(window)
+        _, sums, squares = moments.centered_sums(window)
+        _variance(counts, sums, squares, ddof, variances)
+        _mask_short_windows(
+            variances, counts, window if min_periods is None else min_periods
+        )
+
+    return output
+
+
+def rolling_zscore(values, windows, ddof=1, min_periods=None, out=None):
+    """
+    Standardize each value by the mean and standard deviation of its window.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date and a column for each ticker
+    windows : int or list of int
+        The number of dates in each window, which includes the date itself
+    ddof : int
+        The delta degrees of freedom of the standard deviation
+    min_periods : int
+        The fewest values a window needs, defaults to the window length
+    out : Ndarray
+        The buffer to write the z-scores into, with the shape of the result
+
+    Returns
+    -------
+    zscores : Ndarray
+        (value - mean) / std for each date, NaN where the window's values are
+        all equal, see `rolling_sum` for the shape
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows, is_single = _as_windows(windows)
+    moments = _WindowMoments(values, sums=False)
+    output = _output(out, moments.shape, len(windows), is_single)
+
+    for window, zscores in zip(windows, _window_rows(output, is_single)):
+        counts = moments.counts(window)
+        centers, sums, squares = moments.centered_sums(window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Both centered on the window's block mean
+            deviations = values - centers - sums / counts
+            _variance(counts, sums, squares, ddof, zscores)
+            # A window of equal values has no z-score, 0 / 0 like pandas
+            zscores[zscores == 0] = np.nan
+            np.sqrt(zscores, out=zscores)
+            np.divide(deviations, zscores, out=zscores)
+        _mask_short_windows(
+            zscores, counts, window if min_periods is None else min_periods
+        )
+
+    return output
+
+
+def _rolling_extremum(values, windows, ufunc, out):
+    values = np.asarray(values, dtype=np.float64)
+    windows, is_single = _as_windows(windows)
+    output = _output(out, values.shape, len(windows), is_single)
+
+    for window, extremum in zip(windows, _window_rows(output, is_single)):
+        extremum[...] = extremes.rolling_extremum(values, window, ufunc)
+
+    return output
+
+
+def rolling_max(values, windows, out=None):
+    """
+    Get the maximum of the trailing window of each date.
+
+    See `extremes.rolling_extremum`, a window holding a NaN is NaN.
+    """
+    return _rolling_extremum(values, windows, np.maximum, out)
+
+
+def rolling_min(values, windows, out=None):
+    """
+    Get the minimum of the trailing window of each date.
+
+    See `extremes.rolling_extremum`, a window holding a NaN is NaN.
+    """
+    return _rolling_extremum(values, windows, np.minimum, out)
+
+
+def ewma(values, alphas, out=None):
+    """
+    Calculate the exponentially weighted moving average of each date.
+
+    Every smoothing factor is computed in one pass of `decayed_sums`, each
+    with its own copy of the columns.
+
+    Parameters
+    ----------
+    values : Ndarray
+        Values with a row for each date and a column for each ticker
+    alphas : float or list of float
+        The smoothing factor of each average, between 0 and 1 exclusive
+    out : Ndarray
+        The buffer to write the averages into, with the shape of the result
+
+    Returns
+    -------
+    averages : Ndarray
+        The average up to each date, like `ewm(alpha=alpha).mean()`, see
+        `rolling_sum` for the shape
+    """
+    values = np.asarray(values, dtype=np.float64)
+    is_single = np.ndim(alphas) == 0
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+    output = _output(out, values.shape, len(alphas), is_single)
+
+    # A copy of the columns for each alpha, side by side
+    columns = values.reshape(len(values), -1)
+    n_columns = columns.shape[1]
+    is_valid = np.tile(~np.isnan(columns), len(alphas))
+    decays = np.repeat(1 - alphas, n_columns)
+
+    weighted_sums = volatility.decayed_sums(
+        np.where(is_valid, np.tile(columns, len(alphas)), 0), decays
+    )
+    weights = volatility.decayed_sums(is_valid, decays)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = weighted_sums / weights
+
+    averages = averages.reshape(len(values), len(alphas), n_columns).swapaxes(0, 1)
+    output[...] = averages.reshape(output.shape)
+
+    return output
@@ -0,0 +1,205 @@
+"""
+Signal matrices stored as int8.
+
+Signals are -1, 0 or 1, or small share counts, so int8 holds them in an
+eighth of the memory of int64. Multiplying an int8 matrix with float returns
+casts the signals a buffer at a time inside the ufunc, so the whole signal
+matrix is never upcast to a float copy.
+"""
+import numpy as np
+import pandas as pd
+
+
+SIGNAL_DTYPE = np.int8
+
+
+def aligned_values(*frames):
+    """
+    Get the values of frames with the same dates and tickers.
+
+    The signal functions work on the values position by position, so frames
+    whose index or columns differ, even only in order, would give wrong
+    numbers instead of being aligned like pandas does.
+
+    Parameters
+    ----------
+    frames : DataFrames
+        Frames with the same index and columns
+
+    Returns
+    -------
+    values : list of Ndarrays
+        The values of each frame
+    """
+    for frame in frames[1:]:
+        assert frame.index.equals(frames[0].index), "Indexes don't match"
+        assert frame.columns.equals(frames[0].columns), "Columns don't match"
+
+    return [frame.values for frame in frames]
+
+
+def long_short(is_long, is_short):
+    """
+    Combine long and short masks into signals.
+
+    Parameters
+    ----------
+    is_long : Ndarray
+        1 or True where to go long
+    is_short : Ndarray
+        1 or True where to go short
+
+    Returns
+    -------
+    long_short : Ndarray of int8
+        1 for long, -1 for short and 0 for neither or both
+    """
+    return np.asarray(is_long, dtype=SIGNAL_DTYPE) - np.asarray(
+        is_short, dtype=SIGNAL_DTYPE
+    )
+
+
+def signal_returns(signal, returns, dtype=np.float64, out=None):
+    """
+    Multiply signals with returns without upcasting the signals.
+
+    Parameters
+    ----------
+    signal : Ndarray
+        The int8 or bool signals
+    returns : Ndarray
+        The returns with the same shape as `signal`
+    dtype : dtype
+        The dtype of the signal returns
+    out : Ndarray
+        Preallocated array to write the signal returns to
+
+    Returns
+    -------
+    signal_returns : Ndarray
+        The signal times the return, NaN where the return is NaN
+    """
+    return np.multiply(signal, returns, out=out, dtype=dtype)
+
+
+def long_short_returns(
+    is_long, is_short, returns, n_stocks, dtype=np.float64, out=None
+):
+    """
+    Calculate the returns of equal investments in the long and short stocks.
+
+    Parameters
+    ----------
+    is_long : Ndarray
+        1 or True for the long stocks
+    is_short : Ndarray
+        1 or True for the short stocks
+    returns : Ndarray
+        The returns with the same shape as the masks
+    n_stocks : int
+        The number of stocks on each side
+    dtype : dtype
+        The dtype of the returns
+    out : Ndarray
+        Preallocated array to write the returns to
+
+    Returns
+    -------
+    portfolio_returns : Ndarray
+        The long minus the short returns, divided by `n_stocks`
+    """
+    portfolio_returns = signal_returns(
+        long_short(is_long, is_short), returns, dtype, out
+    )
+    portfolio_returns /= n_stocks
+
+    return portfolio_returns
+
+
+SIGNAL_RETURN_DTYPE = np.dtype(
+    [
+        ("lookahead", np.int16),
+        ("date", np.int32),
+        ("ticker", np.int32),
+        ("signal_return", np.float64),
+    ]
+)
+
+
+def nonzero_signal_returns(signal, signal_return):
+    """
+    Gather the signal returns of the long and short signals.
+
+    The positions of the signals come from `np.nonzero` on the int8 signals,
+    so no masked copy of the returns or index of every date and ticker is
+    built. Returns without a lookahead price, NaN, are left out like
+    `stack` does.
+
+    Parameters
+    ----------
+    signal : Ndarray
+        The long, short, and do nothing signals for each date and ticker, or
+        each lookahead, date and ticker
+    signal_return : Ndarray
+        Signal returns with the same shape as `signal`
+
+    Returns
+    -------
+    signal_returns : 1 dimensional structured Ndarray
+        The lookahead, date and ticker positions and the return of each
+        signal, ordered by lookahead, date and ticker
+    """
+    signal = np.asarray(signal)
+    signal_return = np.asarray(signal_return)
+    assert signal.shape == signal_return.shape
+    if signal.ndim == 2:
+        signal = signal[np.newaxis]
+        signal_return = signal_return[np.newaxis]
+
+    positions = np.nonzero(signal)
+    returns = signal_return[positions]
+    has_return = ~np.isnan(returns)
+
+    signal_returns = np.empty(np.count_nonzero(has_return), SIGNAL_RETURN_DTYPE)
+    for field, values in zip(SIGNAL_RETURN_DTYPE.names, positions + (returns,)):
+        signal_returns[field] = values[has_return]
+
+    return signal_returns
+
+
+def signal_return_frames(signal, signal_return, tickers):
+    """
+    Get the ticker and signal return of each long and short signal.
+
+    Parameters
+    ----------
+    signal : Ndarray
+        The long, short, and do nothing signals for each lookahead, date and
+        ticker
+    signal_return : Ndarray
+        Signal returns with the same shape as `signal`
+    tickers : Index
+        The ticker of each column
+
+    Returns
+    -------
+    long_short_signal_returns : list of DataFrames
+        For each lookahead, the "ticker" as a categorical of `tickers` and the
+        "signal_return" of each signal
+    """
+    signal_returns = nonzero_signal_returns(signal, signal_return)
+    bounds = np.searchsorted(
+        signal_returns["lookahead"], np.arange(np.shape(signal)[0] + 1)
+    )
+
+    return [
+        pd.DataFrame(
+            {
+                "ticker": pd.Categorical.from_codes(
+                    signal_returns["ticker"][start:end], tickers
+                ),
+                "signal_return": signal_returns["signal_return"][start:end],
+            }
+        )
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import breakout
+
+
+def _random_prices(n_dates=150, n_tickers=6, seed=0):
+    random_state = np.random.RandomState(seed)
+    dates = pd.bdate_range("2016-01-04", periods=n_dates)
+    close = 50 * np.exp(
+        np.cumsum(random_state.normal(0, 0.02, (n_dates, n_tickers)), axis=0)
+    )
+    high = close * (1 + random_state.uniform(0, 0.01, close.shape))
+    low = close * (1 - random_state.uniform(0, 0.01, close.shape))
+
+    return dates, close, high, low
+
+
+def _clear_signals(signals, window_size):
+    """
+    Keep a signal only when there's none in the `window_size` days before it.
+    """
+    clean_signals = [0] * window_size
+    for signal_i, signal in enumerate(signals):
+        has_past_signal = any(clean_signals[signal_i : signal_i + window_size])
+        clean_signals.append(int(signal and not has_past_signal))
+
+    return np.array(clean_signals[window_size:])
+
+
+def _batch_signals(close, high, low, lookback_days, lookahead_days):
+    """
+    Run the batch steps of the breakout strategy with pandas.
+    """
+    lookback_high = pd.DataFrame(high).shift(1).rolling(lookback_days).max().values
+    lookback_low = pd.DataFrame(low).shift(1).rolling(lookback_days).min().values
+    long_short = (close > lookback_high).astype(int) - (close < lookback_low)
+
+    filtered = np.zeros(long_short.shape, dtype=int)
+    for ticker_i, signals in enumerate(long_short.T):
+        filtered[:, ticker_i] = _clear_signals(
+            signals == 1, lookahead_days
+        ) - _clear_signals(signals == -1, lookahead_days)
+
+    return filtered
+
+
+class BreakoutSignalStateTest(unittest.TestCase):
+    def assert_matches_batch(self, state_updates, close, high, low, dates):
+        lookahead_days = [5, 10, 20]
+        signals, signal_returns, signal_dates = zip(*state_updates)
+        log_close = np.log(close)
+
+        for lookahead_i, days in enumerate(lookahead_days):
+            batch_signals = _batch_signals(close, high, low, 20, days)
+            np.testing.assert_array_equal(
+                np.array(signals)[:, lookahead_i], batch_signals
+            )
+
+            # The returns of each date's signals resolve `days` dates later
+            expected_returns = np.full(close.shape, np.nan)
+            expected_returns[days:] = batch_signals[:-days] * (
+                log_close[days:] - log_close[:-days]
+            )
+            np.testing.assert_allclose(
+                np.array(signal_returns)[:, lookahead_i], expected_returns, rtol=1e-12
+            )
+            np.testing.assert_array_equal(
+                np.array(signal_dates)[days:, lookahead_i], dates[:-days].values
+            )
+            self.assertTrue(np.isnat(np.array(signal_dates)[:days, lookahead_i]).all())
+
+    def test_updates_match_batch(self):
+        dates, close, high, low = _random_prices()
+        state = breakout.BreakoutSignalState(close.shape[1], 20, [5, 10, 20])
+
+        self.assert_matches_batch(
+            [state.update(*row) for row in zip(dates, close, high, low)],
+            close,
+            high,
+            low,
+            dates,
+        )
+
+    def test_resumes_from_saved_state(self):
+        dates, close, high, low = _random_prices(seed=1)
+        rows = list(zip(dates, close, high, low))
+        state = breakout.BreakoutSignalState(close.shape[1], 20, [5, 10, 20])
+
+        updates = [state.update(*row) for row in rows[:67]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "breakout.npz")
+            state.save(path)
+            state = breakout.BreakoutSignalState.load(path)
+        updates += [state.update(*row) for row in rows[67:]]
+
+        self.assert_matches_batch(updates, close, high, low, dates)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from quant_engine import covariance
+
+
+def _random_returns(n_dates=1000, n_tickers=20, seed=0):
+    """
+    Draw returns whose means and volatilities drift over the dates.
+    """
+    random_state = np.random.RandomState(seed)
+    drift = np.linspace(-0.01, 0.01, n_dates)[:, np.newaxis]
+    volatility = np.linspace(0.005, 0.03, n_dates)[:, np.newaxis]
+
+    return drift + volatility * random_state.normal(size=(n_dates, n_tickers))
+
+
+class CovarianceTest(unittest.TestCase):
+    def test_matches_numpy(self):
+        returns = _random_returns(n_dates=100)
+
+        np.testing.assert_allclose(
+            covariance.covariance(returns), np.cov(returns.T), rtol=1e-12
+        )
+
+
+class RollingCovarianceTest(unittest.TestCase):
+    def assert_matches_numpy(self, rolling, returns, end):
+        window = returns[end - rolling.window_size : end]
+        np.testing.assert_allclose(
+            rolling.covariance(end), np.cov(window.T), rtol=1e-9, atol=1e-15
+        )
+
+    def test_slides_match_numpy(self):
+        returns = _random_returns()
+        rolling = covariance.RollingCovariance(returns, 120)
+
+        # Every date, then steps of several dates
+        ends = list(range(120, 600)) + list(range(600, 1001, 7))
+        for end in ends:
+            with self.subTest(end=end):
+                self.assert_matches_numpy(rolling, returns, end)
+
+    def test_jumps_match_numpy(self):
+        returns = _random_returns(seed=1)
+        rolling = covariance.RollingCovariance(returns, 60)
+
+        # Backwards, in place, and further than a window
+        for end in [500, 450, 450, 451, 700, 759, 760, 60, 1000]:
+            with self.subTest(end=end):
+                self.assert_matches_numpy(rolling, returns, end)
+
+    def test_recomputes_exactly_to_bound_drift(self):
+        # Returns drifting far from the mean the sums are taken relative to,
+        # which leaves about 3e-12 of error without the exact computations
+        random_state = np.random.RandomState(2)
+        returns = np.linspace(0, 100, 1000)[:, np.newaxis] + 0.01 * (
+            random_state.normal(size=(1000, 20))
+        )
+        rolling = covariance.RollingCovariance(returns, 120, recompute_every=50)
+
+        with mock.patch.object(
+            rolling, "_recompute", wraps=rolling._recompute
+        ) as recompute:
+            for end in range(120, 1001):
+                expected = np.cov(returns[end - 120 : end].T)
+                np.testing.assert_allclose(
+                    rolling.covariance(end),
+                    expected,
+                    rtol=0,
+                    atol=1e-13 * np.abs(expected).max(),
+                )
+                self.assertLessEqual(rolling.updates, 50)
+
+        # The first window, then after every 50 updates
+        self.assertEqual(recompute.call_count, -(-(1001 - 120) // 51))
+
+
+if __name__ == "__main__":
+    unittest.main()
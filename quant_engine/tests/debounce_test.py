@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from quant_engine import debounce
+
+
+def _clear_signals(signals, window_size):
+    """
+    Clear the signals of one side like the original `clear_signals` loop.
+    """
+    # Start with buffer of window size
+    clean_signals = [0] * window_size
+
+    for signal_i, current_signal in enumerate(signals):
+        # Check if there was a signal in the past window_size of days
+        has_past_signal = bool(sum(clean_signals[signal_i : signal_i + window_size]))
+        # Use the current signal if there's no past signal, else 0/False
+        clean_signals.append(not has_past_signal and current_signal)
+
+    return np.array(clean_signals[window_size:]).astype(int)
+
+
+def _filter_signals(signal, window_size):
+    """
+    Clear the long and short signals of each ticker like `filter_signals` did.
+    """
+    return np.column_stack(
+        [
+            _clear_signals(ticker_signal > 0, window_size)
+            - _clear_signals(ticker_signal < 0, window_size)
+            for ticker_signal in signal.T
+        ]
+    )
+
+
+def _random_signal(n_dates=200, n_tickers=8, seed=0):
+    """
+    Draw long, short and do nothing signals, denser for the later tickers.
+    """
+    random_state = np.random.RandomState(seed)
+    densities = np.linspace(0.05, 0.9, n_tickers)
+    is_signal = random_state.uniform(size=(n_dates, n_tickers)) < densities
+
+    return is_signal * random_state.choice([-1, 1], (n_dates, n_tickers))
+
+
+class DebounceSignalsTest(unittest.TestCase):
+    def test_matches_clear_signals_loop(self):
+        signal = _random_signal()
+
+        for window_size in [0, 1, 2, 5, 10, 20, 250]:
+            with self.subTest(window_size=window_size):
+                filtered_signal = debounce.debounce_signals(signal, window_size)
+                self.assertEqual(filtered_signal.dtype, np.int8)
+                np.testing.assert_array_equal(
+                    filtered_signal, _filter_signals(signal, window_size)
+                )
+
+    def test_long_and_short_cool_down_separately(self):
+        signal = np.array([1, -1, 1, -1, 0, 0, 1, -1, 1])
+
+        np.testing.assert_array_equal(
+            debounce.debounce_signals(signal, 5), [1, -1, 0, 0, 0, 0, 1, -1, 0]
+        )
+        np.testing.assert_array_equal(
+            debounce.debounce_signals(signal, 5),
+            _filter_signals(signal[:, np.newaxis], 5)[:, 0],
+        )
+
+    def test_updates_match_batch(self):
+        signal = _random_signal(seed=1)
+        debouncer = debounce.SignalDebouncer(signal.shape[1], 10)
+
+        np.testing.assert_array_equal(
+            [debouncer.update(signal_row) for signal_row in signal],
+            debounce.debounce_signals(signal, 10),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import extremes
+
+
+def _random_prices(n_dates=100, n_tickers=7, seed=0):
+    random_state = np.random.RandomState(seed)
+    prices = 50 + np.cumsum(random_state.normal(0, 1, (n_dates, n_tickers)), axis=0)
+    prices[random_state.uniform(size=prices.shape) < 0.03] = np.nan
+
+    return prices
+
+
+# Window sizes that divide the dates into blocks evenly, unevenly, and not at all
+_WINDOW_SIZES = [1, 3, 20, 25, 99, 100, 101]
+
+
+class RollingExtremumTest(unittest.TestCase):
+    def test_matches_pandas_rolling(self):
+        prices = _random_prices()
+        rolling = pd.DataFrame(prices).rolling
+
+        for window_size in _WINDOW_SIZES:
+            with self.subTest(window_size=window_size):
+                np.testing.assert_array_equal(
+                    extremes.rolling_max(prices, window_size),
+                    rolling(window_size).max().values,
+                )
+                np.testing.assert_array_equal(
+                    extremes.rolling_min(prices, window_size),
+                    rolling(window_size).min().values,
+                )
+
+    def test_lookback_matches_pandas_shifted_rolling(self):
+        prices = _random_prices()
+        shifted_rolling = pd.DataFrame(prices).shift(1).rolling
+
+        for lookback_days in _WINDOW_SIZES[:-1]:
+            with self.subTest(lookback_days=lookback_days):
+                np.testing.assert_array_equal(
+                    extremes.lookback_max(prices, lookback_days),
+                    shifted_rolling(lookback_days).max().values,
+                )
+                np.testing.assert_array_equal(
+                    extremes.lookback_min(prices, lookback_days),
+                    shifted_rolling(lookback_days).min().values,
+                )
+
+    def test_stream_matches_batch(self):
+        prices = _random_prices()
+
+        for window_size in _WINDOW_SIZES:
+            for ufunc in [np.maximum, np.minimum]:
+                with self.subTest(window_size=window_size, ufunc=ufunc.__name__):
+                    stream = extremes.RollingExtremum(
+                        prices.shape[1], window_size, ufunc
+                    )
+                    np.testing.assert_array_equal(
+                        [stream.update(row) for row in prices],
+                        extremes.rolling_extremum(prices, window_size, ufunc),
+                    )
+
+    def test_lookback_high_low_stream_matches_batch(self):
+        highs = _random_prices(seed=1)
+        lows = highs - 1
+        lookback_high_low = extremes.LookbackHighLow(highs.shape[1], 20)
+
+        lookback_highs, lookback_lows = zip(
+            *[lookback_high_low.update(high, low) for high, low in zip(highs, lows)]
+        )
+        np.testing.assert_array_equal(lookback_highs, extremes.lookback_max(highs, 20))
+        np.testing.assert_array_equal(lookback_lows, extremes.lookback_min(lows, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
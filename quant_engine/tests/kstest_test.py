@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from quant_engine import kstest
+
+
+def _random_groups(seed=0):
+    """
+    Draw values of groups with different sizes and distributions, in a
+    shuffled order.
+    """
+    random_state = np.random.RandomState(seed)
+    sizes = {"AAA": 40, "BBB": 7, "CCC": 120, "DDD": 1}
+    groups = np.repeat(list(sizes), list(sizes.values()))
+    values = np.concatenate(
+        [
+            random_state.normal(0.1 * i, 1 + 0.2 * i, size)
+            for i, size in enumerate(sizes.values())
+        ]
+    )
+    order = random_state.permutation(len(values))
+
+    return groups[order], values[order]
+
+
+class GroupedNormalKstestTest(unittest.TestCase):
+    def test_matches_scipy_per_group(self):
+        groups, values = _random_groups()
+
+        for mode in ["approx", "exact"]:
+            with self.subTest(mode=mode):
+                ks_values, p_values = kstest.grouped_normal_kstest(
+                    groups, values, 0.1, 1.2, mode=mode
+                )
+
+                self.assertEqual(ks_values.index.tolist(), ["AAA", "BBB", "CCC", "DDD"])
+                for group in ks_values.index:
+                    ks_value, p_value = stats.kstest(
+                        values[groups == group], "norm", (0.1, 1.2), mode=mode
+                    )
+                    self.assertAlmostEqual(ks_values[group], ks_value, places=12)
+                    self.assertAlmostEqual(p_values[group], p_value, places=10)
+
+    def test_values_without_group_are_left_out(self):
+        groups, values = _random_groups()
+        groups = pd.Series(groups, dtype=object)
+        groups[:10] = np.nan
+
+        ks_values, p_values = kstest.grouped_normal_kstest(groups, values)
+        has_group = groups.notnull().values
+        expected_ks_values, expected_p_values = kstest.grouped_normal_kstest(
+            groups[has_group], values[has_group]
+        )
+
+        pd.testing.assert_series_equal(ks_values, expected_ks_values)
+        pd.testing.assert_series_equal(p_values, expected_p_values)
+
+
+if __name__ == "__main__":
+    unittest.main()
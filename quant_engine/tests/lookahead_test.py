@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import lookahead
+
+
+def _random_close(n_dates=50, n_tickers=6, seed=0):
+    """
+    Draw close prices for each date and ticker with a few missing values.
+    """
+    random_state = np.random.RandomState(seed)
+    close = 50 * np.exp(
+        np.cumsum(random_state.normal(0, 0.02, (n_dates, n_tickers)), axis=0)
+    )
+    close[random_state.uniform(size=close.shape) < 0.05] = np.nan
+
+    return pd.DataFrame(close, pd.bdate_range("2016-01-04", periods=n_dates))
+
+
+def _shifted_log_returns(close, days):
+    """
+    Calculate the lookahead log returns with `shift` like the project starters.
+    """
+    return np.log(close.shift(-days)) - np.log(close)
+
+
+class LookaheadLogReturnsTest(unittest.TestCase):
+    def test_matches_shift(self):
+        close = _random_close()
+        horizons = [1, 5, 10, 49, 50, 80]
+
+        lookahead_returns = lookahead.lookahead_log_returns(
+            np.log(close.values), horizons
+        )
+        self.assertEqual(lookahead_returns.shape, (len(horizons),) + close.shape)
+        for horizon_returns, days in zip(lookahead_returns, horizons):
+            with self.subTest(days=days):
+                expected = _shifted_log_returns(close, days).values
+                np.testing.assert_allclose(horizon_returns, expected, rtol=1e-12)
+
+                # The dates past the last date are all NaN
+                self.assertTrue(np.isnan(horizon_returns[len(close) - days :]).all())
+
+    def test_close_prices_and_out(self):
+        close = _random_close(seed=1)
+        horizons = [1, 3]
+        out = np.full((len(horizons),) + close.shape, 7, dtype=np.float32)
+
+        lookahead_returns = lookahead.lookahead_returns(close.values, horizons, out=out)
+        self.assertIs(lookahead_returns, out)
+        for horizon_returns, days in zip(out, horizons):
+            with self.subTest(days=days):
+                np.testing.assert_allclose(
+                    horizon_returns,
+                    _shifted_log_returns(close, days).values,
+                    rtol=1e-5,
+                    atol=1e-7,
+                )
+
+        with self.assertRaises(AssertionError):
+            lookahead.lookahead_returns(close.values, [1, 2, 3], out=out)
+
+    def test_dtype(self):
+        close = _random_close(seed=2)
+
+        lookahead_returns = lookahead.lookahead_returns(close, [2], np.float32)
+        self.assertEqual(lookahead_returns.dtype, np.float32)
+        np.testing.assert_allclose(
+            lookahead_returns[0],
+            _shifted_log_returns(close, 2).values,
+            rtol=1e-5,
+            atol=1e-7,
+        )
+
+    def test_horizons_must_be_positive(self):
+        with self.assertRaises(AssertionError):
+            lookahead.lookahead_returns(_random_close().values, [1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+import unittest
+from unittest import mock
+
+import cvxpy as cvx
+import numpy as np
+
+from quant_engine import optimizer, risk_model
+
+# cvxpy's default solver stops around 1e-4 from the weights on these problems
+_REFERENCE_SOLVER = "CLARABEL"
+
+
+def _random_problem(n_tickers=100, n_dates=250, n_factors=5, seed=0):
+    """
+    Build the covariance of daily returns with factor structure, and index
+    weights of very different sizes.
+    """
+    random_state = np.random.RandomState(seed)
+    factor_returns = random_state.normal(0, 0.01, (n_dates, n_factors))
+    betas = random_state.normal(1, 0.3, (n_tickers, n_factors))
+    returns = factor_returns.dot(betas.T) + random_state.normal(
+        0, 0.02, (n_dates, n_tickers)
+    )
+    index_weights = random_state.lognormal(0, 1, n_tickers)
+
+    return np.cov(returns.T), index_weights / index_weights.sum()
+
+
+def _reference_weights(covariance_returns, index_weights, scale, squared):
+    """
+    Solve the tracking problem with cvxpy to tight tolerances.
+    """
+    x = cvx.Variable(len(index_weights))
+    if squared:
+        distance_to_index = cvx.sum_squares(x - index_weights)
+    else:
+        distance_to_index = cvx.norm(x - index_weights, p=2)
+    objective = cvx.Minimize(
+        cvx.quad_form(x, cvx.psd_wrap(covariance_returns)) + scale * distance_to_index
+    )
+    problem = cvx.Problem(objective, [x >= 0, cvx.sum(x) == 1])
+    problem.solve(
+        solver=_REFERENCE_SOLVER,
+        tol_gap_abs=1e-14,
+        tol_gap_rel=1e-14,
+        tol_feas=1e-14,
+        max_iter=500,
+    )
+
+    return x.value
+
+
+@unittest.skipUnless(
+    _REFERENCE_SOLVER in cvx.installed_solvers(),
+    "needs {} for tight reference solves".format(_REFERENCE_SOLVER),
+)
+class TrackingWeightsTest(unittest.TestCase):
+    def assert_matches_reference(self, squared):
+        for n_tickers, n_dates, seed in [(50, 250, 0), (100, 250, 1), (200, 60, 2)]:
+            covariance_returns, index_weights = _random_problem(
+                n_tickers, n_dates, seed=seed
+            )
+            for scale in [1e-4, 1e-2, 2.0]:
+                with self.subTest(n_tickers=n_tickers, n_dates=n_dates, scale=scale):
+                    weights = optimizer.tracking_weights(
+                        covariance_returns, index_weights, scale, squared
+                    )
+                    np.testing.assert_allclose(
+                        weights,
+                        _reference_weights(
+                            covariance_returns, index_weights, scale, squared
+                        ),
+                        rtol=0,
+                        atol=1e-6,
+                    )
+
+    def test_matches_cvxpy(self):
+        self.assert_matches_reference(squared=False)
+
+    def test_squared_matches_cvxpy(self):
+        self.assert_matches_reference(squared=True)
+
+    def test_factor_risk_model_matches_dense_covariance(self):
+        random_state = np.random.RandomState(3)
+        factor_betas, _ = np.linalg.qr(random_state.normal(size=(80, 4)))
+        model = risk_model.FactorRiskModel(
+            factor_betas,
+            random_state.uniform(1e-4, 1e-3, 4),
+            random_state.uniform(1e-5, 1e-4, 80),
+        )
+        index_weights = random_state.uniform(0.5, 1.5, 80)
+        index_weights /= index_weights.sum()
+
+        for squared in [False, True]:
+            with self.subTest(squared=squared):
+                np.testing.assert_allclose(
+                    optimizer.tracking_weights(
+                        model, index_weights, 1e-3, squared=squared
+                    ),
+                    _reference_weights(
+                        model.covariance(), index_weights, 1e-3, squared
+                    ),
+                    rtol=0,
+                    atol=1e-6,
+                )
+
+    def test_falls_back_to_cvxpy(self):
+        covariance_returns, index_weights = _random_problem()
+
+        for squared in [False, True]:
+            with self.subTest(squared=squared):
+                # One gradient step doesn't converge, so cvxpy solves it
+                with mock.patch.object(
+                    optimizer,
+                    "_cvxpy_tracking_weights",
+                    wraps=optimizer._cvxpy_tracking_weights,
+                ) as cvxpy_tracking_weights:
+                    weights = optimizer.tracking_weights(
+                        covariance_returns, index_weights, 1e-2, squared, max_iter=1
+                    )
+                cvxpy_tracking_weights.assert_called_once()
+                np.testing.assert_allclose(
+                    weights,
+                    _reference_weights(
+                        covariance_returns, index_weights, 1e-2, squared
+                    ),
+                    rtol=0,
+                    atol=1e-3,
+                )
+
+
+class CovarianceFactorTest(unittest.TestCase):
+    def test_factors_semidefinite_covariance(self):
+        # Fewer dates than tickers
+        covariance_returns, _ = _random_problem(n_tickers=50, n_dates=30)
+        factor = optimizer.covariance_factor(covariance_returns)
+
+        np.testing.assert_allclose(
+            factor.T.dot(factor), covariance_returns, rtol=0, atol=1e-12
+        )
+
+
+@unittest.skipUnless(
+    _REFERENCE_SOLVER in cvx.installed_solvers(),
+    "needs {} for tight reference solves".format(_REFERENCE_SOLVER),
+)
+class IndexTrackingOptimizerTest(unittest.TestCase):
+    def test_rebalances_match_separate_solves(self):
+        tracking_optimizer = optimizer.IndexTrackingOptimizer(
+            60, solver=_REFERENCE_SOLVER
+        )
+
+        # The scale is kept until it's changed
+        for seed, scale, expected_scale in [
+            (0, None, 2.0),
+            (1, None, 2.0),
+            (2, 0.01, 0.01),
+            (3, None, 0.01),
+        ]:
+            with self.subTest(seed=seed):
+                covariance_returns, index_weights = _random_problem(60, seed=seed)
+                np.testing.assert_allclose(
+                    tracking_optimizer.solve(covariance_returns, index_weights, scale),
+                    _reference_weights(
+                        covariance_returns, index_weights, expected_scale, False
+                    ),
+                    rtol=0,
+                    atol=1e-6,
+                )
+
+        self.assertEqual(tracking_optimizer.timing_stats()["solves"], 4)
+
+
+class BatchTrackingWeightsTest(unittest.TestCase):
+    def assert_matches_separate_solves(self, covariance_returns, index_weights, scales):
+        for squared in [False, True]:
+            with self.subTest(squared=squared):
+                weights = optimizer.batch_tracking_weights(
+                    covariance_returns, index_weights, scales, squared
+                )
+                n_problems = len(weights)
+                for problem_index_weights, scale, problem_weights in zip(
+                    np.broadcast_to(index_weights, weights.shape),
+                    np.broadcast_to(scales, (n_problems,)),
+                    weights,
+                ):
+                    np.testing.assert_allclose(
+                        problem_weights,
+                        optimizer.tracking_weights(
+                            covariance_returns, problem_index_weights, scale, squared
+                        ),
+                        rtol=0,
+                        atol=1e-8,
+                    )
+
+    def test_scale_sweep(self):
+        covariance_returns, index_weights = _random_problem(60)
+
+        self.assert_matches_separate_solves(
+            covariance_returns, index_weights, [2.0, 1e-3, 0.1, 1e-2, 1e-4]
+        )
+
+    def test_index_weights_and_scales_in_any_order(self):
+        covariance_returns, _ = _random_problem(60)
+        random_state = np.random.RandomState(1)
+        index_weights = random_state.lognormal(0, 1, (3, 60))
+        index_weights /= index_weights.sum(axis=1, keepdims=True)
+        # Index weights repeated out of order, each with its own scale
+        index_weights = index_weights[[0, 1, 0, 2, 1, 0]]
+
+        self.assert_matches_separate_solves(
+            covariance_returns, index_weights, [0.1, 2.0, 1e-3, 1e-2, 1e-3, 2.0]
+        )
+        self.assert_matches_separate_solves(covariance_returns, index_weights, 1e-2)
+
+    def test_factor_risk_model(self):
+        random_state = np.random.RandomState(2)
+        factor_betas, _ = np.linalg.qr(random_state.normal(size=(80, 4)))
+        model = risk_model.FactorRiskModel(
+            factor_betas,
+            random_state.uniform(1e-4, 1e-3, 4),
+            random_state.uniform(1e-5, 1e-4, 80),
+        )
+        index_weights = random_state.uniform(0.5, 1.5, 80)
+
+        self.assert_matches_separate_solves(
+            model, index_weights / index_weights.sum(), [1e-3, 1e-2, 0.1]
+        )
+
+
+class ProjectedGradientTrackingOptimizerTest(unittest.TestCase):
+    def test_rebalances_match_separate_solves(self):
+        random_state = np.random.RandomState(4)
+        returns = random_state.normal(0, 0.01, (200, 3)).dot(
+            random_state.normal(1, 0.3, (3, 90))
+        ) + random_state.normal(0, 0.02, (200, 90))
+        index_weights = random_state.lognormal(0, 1, 90)
+        rolling = risk_model.RollingFactorModel(returns, 120, 3)
+        tracking_optimizer = optimizer.ProjectedGradientTrackingOptimizer(scale=1e-2)
+
+        for end in range(120, 201, 20):
+            with self.subTest(end=end):
+                model = rolling.covariance(end)
+                index_weights = index_weights * random_state.uniform(0.9, 1.1, 90)
+                index_weights /= index_weights.sum()
+                np.testing.assert_allclose(
+                    tracking_optimizer.solve(model, index_weights),
+                    optimizer.tracking_weights(model, index_weights, 1e-2),
+                    rtol=0,
+                    atol=1e-8,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
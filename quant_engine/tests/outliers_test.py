@@ -0,0 +1,143 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import outliers
+
+
+def _random_statistics(n_lookaheads=3, n_tickers=12, seed=0):
+    """
+    Draw KS statistics and p-values for each lookahead and ticker, NaN for the
+    tickers without signals.
+    """
+    random_state = np.random.RandomState(seed)
+    ks_values = random_state.uniform(0, 1, (n_lookaheads, n_tickers))
+    p_values = random_state.uniform(0, 0.1, (n_lookaheads, n_tickers))
+    ks_values[:, 0] = np.nan
+    p_values[:, 0] = np.nan
+    ks_values[1, 1] = np.nan
+    p_values[1, 1] = np.nan
+
+    return ks_values, p_values
+
+
+def _find_outliers(ks_values, p_values, ks_threshold, pvalue_threshold):
+    """
+    Find the outlying tickers of one lookahead like the original
+    `find_outliers`.
+    """
+    outliers = set()
+    for ticker, ks_value in ks_values.items():
+        if ks_value > ks_threshold and p_values[ticker] < pvalue_threshold:
+            outliers.add(ticker)
+
+    return outliers
+
+
+def _random_cube(shape=(3, 20, 12), seed=0):
+    """
+    Draw signal returns for each lookahead, date and ticker with missing
+    values.
+    """
+    random_state = np.random.RandomState(seed)
+    cube = random_state.normal(0, 0.05, shape)
+    cube[random_state.uniform(size=shape) < 0.1] = np.nan
+
+    return cube
+
+
+class OutlierMasksTest(unittest.TestCase):
+    def test_matches_find_outliers(self):
+        ks_values, p_values = _random_statistics()
+        tickers = pd.Index(["T{:02d}".format(i) for i in range(ks_values.shape[1])])
+
+        outlier_masks = outliers.outlier_masks(ks_values, p_values, 0.5, 0.05)
+        self.assertEqual(outlier_masks.shape, ks_values.shape)
+        self.assertEqual(outlier_masks.dtype, bool)
+        for lookahead, (ks_row, p_row) in enumerate(zip(ks_values, p_values)):
+            with self.subTest(lookahead=lookahead):
+                self.assertEqual(
+                    set(tickers[outlier_masks[lookahead]]),
+                    _find_outliers(
+                        pd.Series(ks_row, tickers),
+                        pd.Series(p_row, tickers),
+                        0.5,
+                        0.05,
+                    ),
+                )
+
+    def test_tickers_without_signals_are_kept(self):
+        ks_values, p_values = _random_statistics()
+
+        outlier_masks = outliers.outlier_masks(ks_values, p_values, -1, 1)
+        self.assertFalse(outlier_masks[:, 0].any())
+        self.assertFalse(outlier_masks[1, 1])
+        self.assertTrue(outlier_masks[[0, 2], 1].all())
+        self.assertTrue(outlier_masks[:, 2:].all())
+
+
+class DropTickersTest(unittest.TestCase):
+    def test_shared_mask(self):
+        cube = _random_cube()
+        ticker_mask = np.zeros(cube.shape[2], dtype=bool)
+        ticker_mask[[1, 4, 5]] = True
+
+        kept = outliers.drop_tickers(cube, ticker_mask)
+        for lookahead in range(len(cube)):
+            with self.subTest(lookahead=lookahead):
+                expected = pd.DataFrame(cube[lookahead])
+                expected[[1, 4, 5]] = np.nan
+                np.testing.assert_array_equal(kept[lookahead], expected.values)
+
+        # One matrix of dates and tickers
+        np.testing.assert_array_equal(
+            outliers.drop_tickers(cube[0], ticker_mask), kept[0]
+        )
+
+    def test_mask_per_lookahead(self):
+        cube = _random_cube(seed=1)
+        ks_values, p_values = _random_statistics(seed=1)
+        outlier_masks = outliers.outlier_masks(ks_values, p_values, 0.5)
+
+        kept = outliers.drop_tickers(cube, outlier_masks)
+        for lookahead, outlier_mask in enumerate(outlier_masks):
+            with self.subTest(lookahead=lookahead):
+                np.testing.assert_array_equal(
+                    kept[lookahead],
+                    outliers.drop_tickers(cube[lookahead], outlier_mask),
+                )
+                self.assertTrue(np.isnan(kept[lookahead][:, outlier_mask]).all())
+                np.testing.assert_array_equal(
+                    kept[lookahead][:, ~outlier_mask],
+                    cube[lookahead][:, ~outlier_mask],
+                )
+
+    def test_in_place_and_out(self):
+        cube = _random_cube(seed=2)
+        original = cube.copy()
+        ticker_mask = np.arange(cube.shape[2]) % 3 == 0
+        expected = outliers.drop_tickers(cube, ticker_mask)
+        np.testing.assert_array_equal(cube, original)
+
+        out = np.empty_like(cube)
+        self.assertIs(outliers.drop_tickers(cube, ticker_mask, out=out), out)
+        np.testing.assert_array_equal(out, expected)
+        np.testing.assert_array_equal(cube, original)
+
+        self.assertIs(outliers.drop_tickers(cube, ticker_mask, out=cube), cube)
+        np.testing.assert_array_equal(cube, expected)
+
+    def test_integer_values(self):
+        values = np.arange(12).reshape(3, 4)
+
+        kept = outliers.drop_tickers(values, [False, True, False, True])
+        self.assertEqual(kept.dtype, np.float64)
+        np.testing.assert_array_equal(
+            kept,
+            [[0, np.nan, 2, np.nan], [4, np.nan, 6, np.nan], [8, np.nan, 10, np.nan]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import panel
+
+
+def _random_prices(n_dates=50, n_tickers=4, seed=0):
+    random_state = np.random.RandomState(seed)
+    values = 50 * np.exp(
+        np.cumsum(random_state.normal(0, 0.02, (n_dates, n_tickers)), axis=0)
+    )
+
+    return pd.DataFrame(
+        values,
+        pd.bdate_range("2016-01-04", periods=n_dates),
+        ["T{}".format(i) for i in range(n_tickers)],
+    )
+
+
+class PricePanelTest(unittest.TestCase):
+    def assert_matches_pandas(self, price_panel, prices):
+        pd.testing.assert_frame_equal(price_panel.log_prices(), np.log(prices))
+        pd.testing.assert_frame_equal(
+            price_panel.simple_returns(), prices / prices.shift(1) - 1
+        )
+        pd.testing.assert_frame_equal(
+            price_panel.log_returns(5), np.log(prices) - np.log(prices.shift(5))
+        )
+        pd.testing.assert_frame_equal(
+            price_panel.shifted_returns(-2, log=False),
+            (prices / prices.shift(1) - 1).shift(-2),
+        )
+
+    def test_derived_matrices_are_computed_once(self):
+        prices = _random_prices()
+        price_panel = panel.PricePanel(prices)
+
+        with mock.patch.object(panel.np, "log", wraps=np.log) as log:
+            log_returns = price_panel.log_returns()
+            self.assertIs(price_panel.log_returns(), log_returns)
+            price_panel.log_returns(5)
+            price_panel.shifted_returns(-1)
+        log.assert_called_once()
+
+        self.assertIs(price_panel.simple_returns(2), price_panel.simple_returns(2))
+        self.assertIsNot(price_panel.log_returns(2), price_panel.log_returns(3))
+        self.assert_matches_pandas(price_panel, prices)
+        self.assertIs(panel.as_panel(price_panel), price_panel)
+
+    def test_new_prices_clear_the_cache(self):
+        prices = _random_prices()
+        price_panel = panel.PricePanel(prices)
+        price_panel.log_returns()
+        version = price_panel.version
+
+        # The same number of rows
+        new_prices = _random_prices(seed=1)
+        price_panel.prices = new_prices
+        self.assertGreater(price_panel.version, version)
+        self.assert_matches_pandas(price_panel, new_prices)
+
+        price_panel.append(prices)
+        self.assert_matches_pandas(price_panel, pd.concat([new_prices, prices]))
+
+    def test_invalidate_after_in_place_edits(self):
+        prices = _random_prices()
+        price_panel = panel.PricePanel(prices)
+        price_panel.log_returns()
+
+        prices.iloc[10:20] *= 2
+        price_panel.invalidate()
+        self.assert_matches_pandas(price_panel, prices)
+
+
+if __name__ == "__main__":
+    unittest.main()
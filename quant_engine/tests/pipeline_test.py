@@ -0,0 +1,135 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import pipeline
+
+
+def _random_pricing(n_dates=300, n_tickers=600, seed=0):
+    """
+    Build adjusted close prices and volumes with tickers that start trading
+    late, missing values and tied dollar volumes.
+    """
+    random_state = np.random.RandomState(seed)
+    dates = pd.bdate_range("2015-01-02", periods=n_dates)
+    tickers = ["T{:03d}".format(i) for i in range(n_tickers)]
+
+    close = np.exp(np.cumsum(random_state.normal(0, 0.02, (n_dates, n_tickers)), 0))
+    close *= random_state.uniform(5, 200, n_tickers)
+    volume = random_state.lognormal(12, 1, (n_dates, n_tickers))
+    for i in random_state.choice(n_tickers, 50, replace=False):
+        close[: random_state.randint(n_dates), i] = np.nan
+    close[random_state.uniform(size=close.shape) < 0.01] = np.nan
+    # The same dollar volumes, so the top tickers are decided by a tie
+    close[:, 11], volume[:, 11] = close[:, 10], volume[:, 10]
+
+    return {
+        "adj_close": pd.DataFrame(close, dates, tickers),
+        "adj_volume": pd.DataFrame(volume, dates, tickers),
+    }
+
+
+def _zipline_average_dollar_volume(pricing, window_length):
+    """
+    Average the dollar volumes like zipline's `AverageDollarVolume`, with
+    `nansum(close * volume) / window_length` over the dates before each date.
+    """
+    dollar_volume = pricing["adj_close"] * pricing["adj_volume"]
+
+    return dollar_volume.fillna(0).shift(1).rolling(window_length).sum() / window_length
+
+
+def _zipline_top(factor, n):
+    """
+    Get the values of the top `n` tickers of each date like zipline's `top`,
+    which ranks with `method="ordinal"`, so ties go to the first ticker.
+    """
+    is_top = factor.rank(axis=1, method="first", ascending=False) <= n
+
+    return factor.stack()[is_top.stack()]
+
+
+class PipelineEngineTest(unittest.TestCase):
+    def test_average_dollar_volume_top_matches_zipline(self):
+        pricing = _random_pricing()
+        engine = pipeline.PipelineEngine(pricing)
+        dates = pricing["adj_close"].index
+
+        average_dollar_volume = _zipline_average_dollar_volume(pricing, 120)
+        # The last date's top n ends between the tied tickers
+        tie_n = int(average_dollar_volume.iloc[-1].rank(ascending=False)["T010"])
+        self.assertIn("T010", _zipline_top(average_dollar_volume, tie_n)[dates[-1]])
+        self.assertNotIn("T011", _zipline_top(average_dollar_volume, tie_n)[dates[-1]])
+
+        for n in [500, tie_n]:
+            with self.subTest(n=n):
+                factor = pipeline.AverageDollarVolume(window_length=120)
+                screen = pipeline.Pipeline(
+                    {"average_dollar_volume": factor}, screen=factor.top(n)
+                )
+
+                # From before the first full window to the last date
+                output = engine.run_pipeline(screen, dates[100], dates[-1])
+                expected = _zipline_top(average_dollar_volume, n)
+                expected = expected[expected.index.get_level_values(0) >= dates[100]]
+
+                self.assertEqual(output.index.get_level_values(0).min(), dates[120])
+                self.assertEqual(output.groupby(level=0).size().unique().tolist(), [n])
+                np.testing.assert_array_equal(output.index, expected.index)
+                np.testing.assert_allclose(
+                    output["average_dollar_volume"], expected, rtol=1e-10
+                )
+
+    def test_shared_terms_are_computed_once(self):
+        close = pipeline.EquityPricing.close
+        mean_close = pipeline.SimpleMovingAverage(inputs=[close], window_length=15)
+        same_mean_close = pipeline.SimpleMovingAverage(inputs=[close], window_length=15)
+        screen = pipeline.Pipeline(
+            {"high": mean_close > 100, "low": same_mean_close < 10}
+        )
+
+        self.assertEqual(mean_close.key, same_mean_close.key)
+        self.assertEqual(
+            [type(term).__name__ for term in screen.terms()],
+            [
+                "DataColumn",
+                "SimpleMovingAverage",
+                "Constant",
+                "Comparison",
+                "Constant",
+                "Comparison",
+            ],
+        )
+
+
+class TermTest(unittest.TestCase):
+    def test_key_includes_parameters(self):
+        class Clipped(pipeline.Factor):
+            def __init__(self, factor, bound):
+                super().__init__([factor])
+                self.bound = bound
+
+            def compute(self, values):
+                return np.minimum(values, self.bound)
+
+        close = pipeline.EquityPricing.close
+        self.assertNotEqual(Clipped(close, 1).key, Clipped(close, 2).key)
+        self.assertEqual(Clipped(close, 1).key, Clipped(close, 1).key)
+        self.assertNotEqual(
+            pipeline.Returns(window_length=5).key,
+            pipeline.Returns(window_length=20).key,
+        )
+        self.assertNotEqual(
+            pipeline.AverageDollarVolume(120).top(500).key,
+            pipeline.AverageDollarVolume(120).top(100).key,
+        )
+        self.assertNotEqual((close + 1).key, (close - 1).key)
+
+    def test_term_is_abstract(self):
+        with self.assertRaises(TypeError):
+            pipeline.Factor()
+
+
+if __name__ == "__main__":
+    unittest.main()
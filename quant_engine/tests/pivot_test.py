@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import pivot
+
+
+def _long_format(is_complete, seed=0):
+    """
+    Build shuffled long-format data with a float and an int field.
+    """
+    random_state = np.random.RandomState(seed)
+    dates = pd.bdate_range("2016-01-04", periods=40)
+    tickers = ["T{:02d}".format(i) for i in range(12)]
+    df = pd.DataFrame(
+        {
+            "date": np.repeat(dates, len(tickers)),
+            "ticker": np.tile(tickers, len(dates)),
+        }
+    )
+    if not is_complete:
+        df = df[random_state.uniform(size=len(df)) > 0.1]
+    df = df.iloc[random_state.permutation(len(df))]
+    df["adj_close"] = random_state.uniform(10, 100, len(df))
+    df["adj_volume"] = random_state.randint(1000, 10000, len(df))
+
+    return df
+
+
+class PivotTest(unittest.TestCase):
+    def test_fields_match_pandas_pivot(self):
+        for is_complete in [True, False]:
+            df = _long_format(is_complete)
+            pivoted = pivot.pivot_fields(df, ["adj_close", "adj_volume"])
+
+            for field in ["adj_close", "adj_volume"]:
+                with self.subTest(is_complete=is_complete, field=field):
+                    pd.testing.assert_frame_equal(
+                        pivoted[field],
+                        df.pivot(index="date", columns="ticker", values=field),
+                    )
+
+    def test_panel_matches_pandas_pivot(self):
+        for is_complete in [True, False]:
+            with self.subTest(is_complete=is_complete):
+                df = _long_format(is_complete)
+                panel, rows, cols = pivot.pivot_panel(df, ["adj_close", "adj_volume"])
+
+                self.assertEqual(panel.dtype, np.float64)
+                for field, values in zip(["adj_close", "adj_volume"], panel):
+                    expected = df.pivot(index="date", columns="ticker", values=field)
+                    pd.testing.assert_index_equal(rows, expected.index)
+                    pd.testing.assert_index_equal(cols, expected.columns)
+                    np.testing.assert_array_equal(values, expected.values)
+
+    def test_duplicate_entries(self):
+        df = _long_format(is_complete=True)
+
+        with self.assertRaises(AssertionError):
+            pivot.pivot_fields(pd.concat([df, df.iloc[:1]]), ["adj_close"])
+
+    def test_nan_keys(self):
+        for key in ["date", "ticker"]:
+            with self.subTest(key=key):
+                df = _long_format(is_complete=False)
+                df.loc[df.index[5], key] = np.nan
+
+                with self.assertRaises(AssertionError):
+                    pivot.pivot_fields(df, ["adj_close"])
+                with self.assertRaises(AssertionError):
+                    pivot.pivot_panel(df, ["adj_close"])
+
+
+if __name__ == "__main__":
+    unittest.main()
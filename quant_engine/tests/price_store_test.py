@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import price_store
+
+
+def _long_format(seed=0):
+    """
+    Build shuffled long-format prices with a missing entry.
+    """
+    random_state = np.random.RandomState(seed)
+    dates = pd.bdate_range("2016-01-04", periods=30)
+    tickers = ["T{:02d}".format(i) for i in range(8)]
+    df = pd.DataFrame(
+        {
+            "date": np.repeat(dates, len(tickers)),
+            "ticker": np.tile(tickers, len(dates)),
+            "adj_close": random_state.uniform(10, 100, len(dates) * len(tickers)),
+            "adj_volume": random_state.randint(1000, 10000, len(dates) * len(tickers)),
+        }
+    ).iloc[1:]
+
+    return df.iloc[random_state.permutation(len(df))]
+
+
+def _pivot(df, field):
+    return df.pivot(index="date", columns="ticker", values=field).astype(np.float64)
+
+
+def _set_mtime(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+class PriceStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "eod.csv")
+        self.store_path = price_store.default_store_path(self.csv_path)
+        self.df = _long_format()
+        self.df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_matches_pandas_pivot(self):
+        price_store.ingest_csv(self.csv_path)
+        self.assertEqual(
+            price_store.stored_fields(self.store_path), ["adj_close", "adj_volume"]
+        )
+
+        for mmap in [True, False]:
+            loaded = price_store.load(self.store_path, mmap=mmap)
+            for field in ["adj_close", "adj_volume"]:
+                with self.subTest(mmap=mmap, field=field):
+                    pd.testing.assert_frame_equal(
+                        loaded[field], _pivot(self.df, field), check_freq=False
+                    )
+
+    def test_memory_mapped_frames_are_read_only(self):
+        price_store.ingest_csv(self.csv_path)
+
+        close = price_store.load(self.store_path, ["adj_close"])["adj_close"]
+        with self.assertRaises(ValueError):
+            close.values[0, 0] = 1.0
+
+        close = price_store.load(self.store_path, ["adj_close"], mmap=False)[
+            "adj_close"
+        ]
+        close.values[0, 0] = 1.0
+        self.assertEqual(close.iloc[0, 0], 1.0)
+
+    def test_is_stale(self):
+        fields = ["adj_close"]
+        self.assertTrue(price_store.is_stale(self.csv_path, self.store_path, fields))
+
+        price_store.ingest_csv(self.csv_path, fields=fields, dtype=np.float32)
+        dates_path = os.path.join(self.store_path, price_store.DATES_FILE)
+        _set_mtime(self.csv_path, os.path.getmtime(dates_path) - 10)
+        self.assertFalse(price_store.is_stale(self.csv_path, self.store_path, fields))
+        self.assertFalse(
+            price_store.is_stale(self.csv_path, self.store_path, fields, np.float32)
+        )
+
+        # A field or dtype that isn't in the store
+        self.assertTrue(
+            price_store.is_stale(self.csv_path, self.store_path, ["adj_volume"])
+        )
+        self.assertTrue(
+            price_store.is_stale(self.csv_path, self.store_path, fields, np.float64)
+        )
+
+        # The csv changed after the store was written
+        _set_mtime(self.csv_path, os.path.getmtime(dates_path) + 10)
+        self.assertTrue(price_store.is_stale(self.csv_path, self.store_path, fields))
+
+    def test_load_csv_ingests_stale_stores(self):
+        close = price_store.load_csv(self.csv_path, ["adj_close"], dtype=np.float32)[
+            "adj_close"
+        ]
+        self.assertEqual(close.dtypes.unique().tolist(), [np.float32])
+
+        # Only the dtype differs
+        close = price_store.load_csv(self.csv_path, ["adj_close"])["adj_close"]
+        pd.testing.assert_frame_equal(
+            close, _pivot(self.df, "adj_close"), check_freq=False
+        )
+
+        # A new field, keeping the fields already there
+        volume = price_store.load_csv(self.csv_path, ["adj_volume"])["adj_volume"]
+        self.assertEqual(
+            price_store.stored_fields(self.store_path), ["adj_close", "adj_volume"]
+        )
+        pd.testing.assert_frame_equal(
+            volume, _pivot(self.df, "adj_volume"), check_freq=False
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import ranking
+
+
+def _random_values(n_dates=200, n_tickers=30, seed=0):
+    """
+    Draw small integers, so most rows have ties, with some values missing.
+    """
+    random_state = np.random.RandomState(seed)
+    values = random_state.randint(0, 10, (n_dates, n_tickers)).astype(np.float64)
+    values[random_state.uniform(size=values.shape) < 0.2] = np.nan
+    # Rows with fewer valid values than are asked for
+    values[:5, 3:] = np.nan
+
+    return values
+
+
+def _pandas_top_n(values, top_n, keep):
+    method = {"all": "min", "first": "first"}[keep]
+    ranks = pd.DataFrame(values).rank(axis=1, method=method, ascending=False)
+
+    return (ranks <= top_n).values
+
+
+class TopNMaskTest(unittest.TestCase):
+    def test_matches_pandas_rank(self):
+        values = _random_values()
+
+        for keep in ["all", "first"]:
+            for top_n in [0, 1, 5, 29, 30, 40]:
+                with self.subTest(keep=keep, top_n=top_n):
+                    np.testing.assert_array_equal(
+                        ranking.top_n_mask(values, top_n, keep),
+                        _pandas_top_n(values, top_n, keep),
+                    )
+                    np.testing.assert_array_equal(
+                        ranking.bottom_n_mask(values, top_n, keep),
+                        _pandas_top_n(-values, top_n, keep),
+                    )
+
+    def test_rows(self):
+        values = _random_values()
+
+        for row in values[:10]:
+            np.testing.assert_array_equal(
+                ranking.top_n_mask(row, 3, "first"),
+                _pandas_top_n(row[np.newaxis], 3, "first")[0],
+            )
+
+    def test_frames_and_labels(self):
+        df = pd.DataFrame(
+            _random_values(n_dates=20, n_tickers=6), columns=list("ABCDEF")
+        )
+
+        top = ranking.top_n_frame(df, 2)
+        self.assertEqual(top.dtypes.unique().tolist(), [np.int8])
+        pd.testing.assert_index_equal(top.index, df.index)
+        pd.testing.assert_index_equal(top.columns, df.columns)
+        np.testing.assert_array_equal(top.values, _pandas_top_n(df.values, 2, "all"))
+
+        series = pd.Series([3.0, 1.0, 3.0, np.nan, 2.0], list("abcde"))
+        pd.testing.assert_index_equal(
+            ranking.top_n_labels(series, 2), pd.Index(["a", "c"])
+        )
+        pd.testing.assert_index_equal(
+            ranking.top_n_labels(series, 4), pd.Index(["a", "b", "c", "e"])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+
+from quant_engine import rebalance
+
+
+def _random_problem(n_dates=120, n_tickers=8, seed=0):
+    random_state = np.random.RandomState(seed)
+    returns = random_state.normal(0, 0.01, (n_dates, n_tickers))
+    index_weights = random_state.uniform(0.5, 1.5, (n_dates, n_tickers))
+    index_weights /= index_weights.sum(axis=1, keepdims=True)
+
+    return returns, index_weights
+
+
+class RebalanceWeightsTest(unittest.TestCase):
+    def test_parallel_matches_serial_in_order(self):
+        returns, index_weights = _random_problem()
+        serial = rebalance.rebalance_weights(returns, index_weights, 5, 30)
+
+        for n_workers, blocks_per_worker in [(2, 1), (2, 4), (3, 2)]:
+            parallel = rebalance.rebalance_weights(
+                returns,
+                index_weights,
+                5,
+                30,
+                n_workers=n_workers,
+                blocks_per_worker=blocks_per_worker,
+            )
+            self.assertEqual(len(parallel), len(serial))
+            for serial_weights, parallel_weights in zip(serial, parallel):
+                np.testing.assert_allclose(parallel_weights, serial_weights, atol=1e-8)
+
+        # The rebalances differ, so a reordering wouldn't match
+        self.assertGreater(np.abs(np.diff(serial, axis=0)).max(), 1e-4)
+
+    def test_parallel_matches_serial_with_factor_model(self):
+        returns, index_weights = _random_problem(n_tickers=20)
+        serial = rebalance.rebalance_weights(returns, index_weights, 5, 30, n_factors=3)
+        parallel = rebalance.rebalance_weights(
+            returns, index_weights, 5, 30, n_workers=2, n_factors=3
+        )
+
+        self.assertEqual(len(parallel), len(serial))
+        for serial_weights, parallel_weights in zip(serial, parallel):
+            np.testing.assert_allclose(parallel_weights, serial_weights, atol=1e-8)
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(), "fork isn't available"
+    )
+    def test_workers_are_forked(self):
+        self.assertEqual(rebalance._pool_context().get_start_method(), "fork")
+
+
+if __name__ == "__main__":
+    unittest.main()
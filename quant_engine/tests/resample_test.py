@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import resample
+
+
+def _random_prices(seed=0):
+    """
+    Draw prices on business days with missing values, a gap of a few months
+    and a ticker that starts trading late.
+    """
+    random_state = np.random.RandomState(seed)
+    dates = pd.bdate_range("2015-01-07", "2017-11-20")
+    dates = dates[(dates < "2016-03-10") | (dates > "2016-07-02")]
+    values = 50 * np.exp(
+        np.cumsum(random_state.normal(0, 0.02, (len(dates), 4)), axis=0)
+    )
+    values[random_state.uniform(size=values.shape) < 0.1] = np.nan
+    values[:60, 1] = np.nan
+
+    return pd.DataFrame(values, dates, list("ABCD"))
+
+
+_FREQS = ["W", "W-MON", "M", "BM", "Q", "Q-NOV", "A"]
+
+
+class PeriodBoundsTest(unittest.TestCase):
+    def test_matches_resample_groups(self):
+        dates = _random_prices().index
+
+        for freq in _FREQS:
+            with self.subTest(freq=freq):
+                labels, starts, ends = resample.period_bounds(dates, freq)
+                groups = pd.Series(np.arange(len(dates)), dates).resample(freq)
+
+                pd.testing.assert_index_equal(
+                    labels, groups.size().index, check_names=False
+                )
+                for label, start, end in zip(labels, starts, ends):
+                    rows = groups.indices.get(label, np.zeros(0, int))
+                    np.testing.assert_array_equal(np.arange(start, end), rows)
+
+    def test_unsupported_periods(self):
+        dates = _random_prices().index
+
+        for freq in ["MS", "QS", "AS", "BMS", "2M", "D"]:
+            with self.subTest(freq=freq):
+                with self.assertRaises(AssertionError):
+                    resample.period_bounds(dates, freq)
+
+    def test_no_dates(self):
+        labels, starts, ends = resample.period_bounds(pd.DatetimeIndex([]), "M")
+
+        self.assertEqual(len(labels), 0)
+        self.assertEqual(len(starts), 0)
+        self.assertEqual(len(ends), 0)
+
+
+class ResampleFramesTest(unittest.TestCase):
+    def test_matches_resampler(self):
+        prices = _random_prices()
+        hows = ["first", "last", "max", "min", "sum", "mean"]
+
+        for freq in _FREQS:
+            with self.subTest(freq=freq):
+                resampled_frames = resample.resample_frames(
+                    [prices] * len(hows), freq, hows
+                )
+                for how, resampled in zip(hows, resampled_frames):
+                    pd.testing.assert_frame_equal(
+                        resampled,
+                        getattr(prices.resample(freq), how)(),
+                        check_freq=False,
+                        rtol=1e-12,
+                    )
+
+    def test_first_and_last_rows(self):
+        prices = _random_prices()
+        _, starts, ends = resample.period_bounds(prices.index, "M")
+        has_rows = ends > starts
+
+        for how, rows in [("first_row", starts), ("last_row", ends - 1)]:
+            with self.subTest(how=how):
+                resampled = resample.resample_rows(prices.values, starts, ends, how)
+                np.testing.assert_array_equal(
+                    resampled[has_rows], prices.values[rows[has_rows]]
+                )
+                self.assertTrue(np.isnan(resampled[~has_rows]).all())
+
+    def test_series_and_integer_values(self):
+        dates = _random_prices().index
+        volume = pd.Series(np.arange(len(dates)), dates, name="volume")
+
+        # Integers stay integers unless a period without rows needs a NaN
+        for n_dates, dtype in [(200, np.int64), (None, np.float64)]:
+            with self.subTest(n_dates=n_dates):
+                resampled = resample.resample_frame(volume[:n_dates], "W", "last")
+                self.assertEqual(resampled.dtype, dtype)
+                pd.testing.assert_series_equal(
+                    resampled,
+                    volume[:n_dates].resample("W").last().astype(dtype),
+                    check_freq=False,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
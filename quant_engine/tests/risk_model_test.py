@@ -0,0 +1,119 @@
+import unittest
+
+import numpy as np
+
+from quant_engine import risk_model
+
+
+def _factor_returns(n_dates=300, n_tickers=120, n_factors=4, seed=0):
+    """
+    Draw returns driven by factors of different sizes plus noise.
+    """
+    random_state = np.random.RandomState(seed)
+    factor_returns = random_state.normal(0, 0.02, (n_dates, n_factors)) * np.arange(
+        n_factors, 0, -1
+    )
+    betas = random_state.normal(0, 1, (n_tickers, n_factors))
+
+    return factor_returns.dot(betas.T) + random_state.normal(
+        0, 0.01, (n_dates, n_tickers)
+    )
+
+
+def _projection(factor_betas):
+    return factor_betas.dot(factor_betas.T)
+
+
+class FitPcaRiskModelTest(unittest.TestCase):
+    def test_randomized_matches_exact_svd(self):
+        returns = _factor_returns()
+        exact = risk_model.fit_pca_risk_model(returns, 4, svd_solver="full")
+
+        for start in [None, exact.factor_betas]:
+            with self.subTest(start=start is not None):
+                randomized = risk_model.fit_pca_risk_model(
+                    returns, 4, start=start, random_state=0
+                )
+                # The components are only unique up to sign
+                np.testing.assert_allclose(
+                    _projection(randomized.factor_betas),
+                    _projection(exact.factor_betas),
+                    rtol=0,
+                    atol=1e-8,
+                )
+                np.testing.assert_allclose(
+                    randomized.factor_variances, exact.factor_variances, rtol=1e-8
+                )
+                np.testing.assert_allclose(
+                    randomized.idiosyncratic_variances,
+                    exact.idiosyncratic_variances,
+                    rtol=1e-6,
+                )
+
+    def test_every_factor_gives_sample_covariance(self):
+        returns = _factor_returns(n_dates=50, n_tickers=20)
+        model = risk_model.fit_pca_risk_model(returns, 20, ann_factor=252)
+
+        np.testing.assert_allclose(
+            model.covariance(), np.cov(returns.T) * 252, rtol=0, atol=1e-12
+        )
+        np.testing.assert_allclose(model.idiosyncratic_variances, 0, atol=1e-12)
+
+    def test_rolling_windows_match_separate_fits(self):
+        returns = _factor_returns()
+        rolling = risk_model.RollingFactorModel(returns, 120, 4)
+
+        for end in range(120, 301, 30):
+            with self.subTest(end=end):
+                model = rolling.covariance(end)
+                exact = risk_model.fit_pca_risk_model(
+                    returns[end - 120 : end], 4, svd_solver="full"
+                )
+                np.testing.assert_allclose(
+                    model.covariance(), exact.covariance(), rtol=0, atol=1e-8
+                )
+
+
+class FactorRiskModelTest(unittest.TestCase):
+    def setUp(self):
+        self.model = risk_model.fit_pca_risk_model(_factor_returns(), 4)
+        self.covariance = self.model.covariance()
+        self.x = np.random.RandomState(1).uniform(0, 1, self.covariance.shape[0])
+
+    def test_products_match_dense_covariance(self):
+        np.testing.assert_allclose(
+            self.model.dot(self.x), self.covariance.dot(self.x), rtol=1e-12
+        )
+        self.assertAlmostEqual(
+            self.model.portfolio_variance(self.x),
+            self.x.dot(self.covariance).dot(self.x),
+            places=14,
+        )
+
+    def test_max_eigenvalue_is_an_upper_bound(self):
+        max_eigenvalue = np.linalg.eigvalsh(self.covariance)[-1]
+
+        self.assertGreaterEqual(self.model.max_eigenvalue(), max_eigenvalue)
+        self.assertLessEqual(
+            self.model.max_eigenvalue(),
+            max_eigenvalue + self.model.idiosyncratic_variances.max(),
+        )
+
+    def test_penalized_solve_matches_direct_solve(self):
+        support = np.random.RandomState(2).uniform(size=len(self.x)) < 0.7
+        right_hand_sides = np.column_stack([self.x[support], np.ones(support.sum())])
+
+        for penalty in [1e-6, 1e-3, 1.0]:
+            with self.subTest(penalty=penalty):
+                penalized = self.covariance[
+                    np.ix_(support, support)
+                ] + penalty * np.eye(support.sum())
+                np.testing.assert_allclose(
+                    self.model.penalized_solve(support, penalty, right_hand_sides),
+                    np.linalg.solve(penalized, right_hand_sides),
+                    rtol=1e-8,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
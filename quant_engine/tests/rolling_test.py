@@ -0,0 +1,215 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from quant_engine import rolling
+
+
+def _random_values(n_dates=300, n_tickers=6, seed=0):
+    """
+    Draw prices with missing values, a late listing and a constant stretch.
+    """
+    random_state = np.random.RandomState(seed)
+    values = 50 * np.exp(
+        np.cumsum(random_state.normal(0, 0.02, (n_dates, n_tickers)), axis=0)
+    )
+    values[random_state.uniform(size=values.shape) < 0.05] = np.nan
+    values[:80, 1] = np.nan
+    values[100:140, 2] = values[100, 2]
+
+    return values
+
+
+_WINDOWS = [1, 5, 20, 60]
+
+
+def _window_variances(values, window, ddof=1):
+    """
+    Calculate the variance of each full window from its own values.
+    """
+    variances = np.full(values.shape, np.nan)
+    variances[window - 1 :] = np.var(
+        sliding_window_view(values, window, axis=0), axis=-1, ddof=ddof
+    )
+
+    return variances
+
+
+def _pandas_variances_in_chunks(values, window, chunk_size=250):
+    """
+    Calculate the rolling variances with pandas a short chunk of dates at a
+    time, as its running sums drift over a long history.
+    """
+    variances = np.empty(values.shape)
+    for start in range(0, len(values), chunk_size):
+        history_start = max(start - window + 1, 0)
+        chunk_variances = (
+            pd.DataFrame(values[history_start : start + chunk_size])
+            .rolling(window)
+            .var()
+            .values
+        )
+        variances[start : start + chunk_size] = chunk_variances[start - history_start :]
+
+    return variances
+
+
+def _window_zscores(values, window, ddof=1):
+    """
+    Standardize each value by the mean and standard deviation of its full
+    window, from the window's own values.
+    """
+    windows = sliding_window_view(values, window, axis=0)
+    zscores = np.full(values.shape, np.nan)
+    zscores[window - 1 :] = (values[window - 1 :] - windows.mean(axis=-1)) / np.std(
+        windows, axis=-1, ddof=ddof
+    )
+
+    return zscores
+
+
+class RollingMomentsTest(unittest.TestCase):
+    def test_matches_pandas(self):
+        values = _random_values()
+        df = pd.DataFrame(values)
+
+        for name, pandas_statistic in [
+            ("rolling_sum", "sum"),
+            ("rolling_mean", "mean"),
+            ("rolling_var", "var"),
+        ]:
+            for min_periods in [None, 1, 3]:
+                with self.subTest(statistic=name, min_periods=min_periods):
+                    statistics = getattr(rolling, name)(
+                        values, _WINDOWS, min_periods=min_periods
+                    )
+                    for window, statistic in zip(_WINDOWS, statistics):
+                        if min_periods is not None and min_periods > window:
+                            # pandas doesn't allow it, and every window is NaN
+                            self.assertTrue(np.isnan(statistic).all())
+                            continue
+                        windows = df.rolling(window, min_periods=min_periods)
+                        np.testing.assert_allclose(
+                            statistic,
+                            getattr(windows, pandas_statistic)().values,
+                            rtol=1e-8,
+                            atol=1e-10,
+                        )
+
+    def test_constant_windows_have_no_variance(self):
+        values = _random_values()
+
+        variances = rolling.rolling_var(values[:, 2], 20)
+        np.testing.assert_array_equal(variances[119:140], 0)
+        self.assertGreater(np.nanmin(variances[20:100]), 0)
+
+        zscores = rolling.rolling_zscore(values, 20)
+        self.assertTrue(np.isnan(zscores[119:140, 2]).all())
+        self.assertTrue(np.isfinite(zscores[140:, 2]).any())
+
+    def test_zscore_matches_pandas(self):
+        values = _random_values()
+        df = pd.DataFrame(values)
+
+        for window in _WINDOWS[1:]:
+            for ddof in [0, 1]:
+                with self.subTest(window=window, ddof=ddof):
+                    windows = df.rolling(window, min_periods=3)
+                    expected = (df - windows.mean()) / windows.std(ddof=ddof)
+                    # Constant windows are NaN, which pandas leaves as inf
+                    expected[windows.std(ddof=ddof) < 1e-8] = np.nan
+                    np.testing.assert_allclose(
+                        rolling.rolling_zscore(
+                            values, window, ddof=ddof, min_periods=3
+                        ),
+                        expected.values,
+                        rtol=1e-6,
+                        atol=1e-8,
+                    )
+
+    def assert_matches_windows(self, values, windows, pandas_rtol=1e-8):
+        for window, variances, zscores in zip(
+            windows,
+            rolling.rolling_var(values, windows),
+            rolling.rolling_zscore(values, windows),
+        ):
+            with self.subTest(window=window):
+                expected = _window_variances(values, window)
+                np.testing.assert_allclose(variances, expected, rtol=1e-10)
+                np.testing.assert_allclose(
+                    variances,
+                    _pandas_variances_in_chunks(values, window),
+                    rtol=pandas_rtol,
+                )
+                np.testing.assert_allclose(
+                    zscores, _window_zscores(values, window), rtol=1e-8, atol=1e-8
+                )
+
+    def test_long_history(self):
+        # Prices falling a thousand fold over 20 years
+        random_state = np.random.RandomState(1)
+        values = 1000 * np.exp(
+            np.cumsum(random_state.normal(-0.0014, 0.01, (5000, 4)), axis=0)
+        )
+
+        self.assert_matches_windows(values, [5, 20, 60, 252])
+
+    def test_quiet_after_volatile(self):
+        random_state = np.random.RandomState(2)
+        values = 100 + np.concatenate(
+            [
+                random_state.normal(0, 10, (2500, 4)),
+                random_state.normal(0, 1e-3, (2500, 4)),
+            ]
+        )
+
+        # pandas carries the volatile windows' rounding error into the quiet
+        # ones for a few chunks, up to about 5e-6
+        self.assert_matches_windows(values, [5, 20, 60, 252], pandas_rtol=1e-5)
+
+    def test_single_window_and_out(self):
+        values = _random_values()
+        out = np.empty((len(_WINDOWS),) + values.shape)
+
+        statistics = rolling.rolling_mean(values, _WINDOWS, out=out)
+        self.assertIs(statistics, out)
+        for window, means in zip(_WINDOWS, out):
+            np.testing.assert_array_equal(rolling.rolling_mean(values, window), means)
+
+        with self.assertRaises(AssertionError):
+            rolling.rolling_mean(values, _WINDOWS, out=np.empty(values.shape))
+
+
+class RollingExtremumTest(unittest.TestCase):
+    def test_matches_pandas(self):
+        values = _random_values()
+        df = pd.DataFrame(values)
+
+        for window, maxima, minima in zip(
+            _WINDOWS,
+            rolling.rolling_max(values, _WINDOWS),
+            rolling.rolling_min(values, _WINDOWS),
+        ):
+            with self.subTest(window=window):
+                np.testing.assert_array_equal(maxima, df.rolling(window).max().values)
+                np.testing.assert_array_equal(minima, df.rolling(window).min().values)
+
+
+class EwmaTest(unittest.TestCase):
+    def test_matches_pandas(self):
+        values = _random_values()
+        alphas = [0.03, 0.06, 0.5]
+
+        for alpha, averages in zip(alphas, rolling.ewma(values, alphas)):
+            with self.subTest(alpha=alpha):
+                np.testing.assert_allclose(
+                    averages,
+                    pd.DataFrame(values).ewm(alpha=alpha).mean().values,
+                    rtol=1e-10,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
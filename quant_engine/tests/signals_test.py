@@ -0,0 +1,219 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import kstest, signals
+
+
+def _random_masks(shape=(40, 8), seed=0):
+    """
+    Draw long and short masks that overlap on some dates and tickers, and
+    returns with missing values.
+    """
+    random_state = np.random.RandomState(seed)
+    is_long = random_state.uniform(size=shape) < 0.3
+    is_short = random_state.uniform(size=shape) < 0.3
+    returns = random_state.normal(0, 0.05, shape)
+    returns[random_state.uniform(size=shape) < 0.1] = np.nan
+
+    return is_long, is_short, returns
+
+
+class SignalsTest(unittest.TestCase):
+    def test_long_short(self):
+        is_long, is_short, _ = _random_masks()
+
+        for long_mask, short_mask in [
+            (is_long, is_short),
+            (is_long.astype(int), is_short.astype(int)),
+            (is_long.astype(np.int8), is_short),
+        ]:
+            long_short = signals.long_short(long_mask, short_mask)
+            self.assertEqual(long_short.dtype, np.int8)
+            np.testing.assert_array_equal(
+                long_short, is_long.astype(int) - is_short.astype(int)
+            )
+
+    def test_signal_returns_match_float_signals(self):
+        is_long, is_short, returns = _random_masks()
+        long_short = signals.long_short(is_long, is_short)
+
+        signal_returns = signals.signal_returns(long_short, returns)
+        self.assertEqual(signal_returns.dtype, np.float64)
+        np.testing.assert_array_equal(
+            signal_returns, long_short.astype(np.float64) * returns
+        )
+        np.testing.assert_array_equal(np.isnan(signal_returns), np.isnan(returns))
+
+        np.testing.assert_array_equal(
+            signals.signal_returns(is_long, returns), is_long * returns
+        )
+
+    def test_signal_returns_dtype_and_out(self):
+        is_long, is_short, returns = _random_masks(seed=1)
+        long_short = signals.long_short(is_long, is_short)
+        expected = long_short * returns
+
+        signal_returns = signals.signal_returns(long_short, returns, np.float32)
+        self.assertEqual(signal_returns.dtype, np.float32)
+        np.testing.assert_allclose(signal_returns, expected, rtol=1e-6)
+
+        out = np.empty(returns.shape)
+        self.assertIs(signals.signal_returns(long_short, returns, out=out), out)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_long_short_returns_match_pandas(self):
+        is_long, is_short, returns = _random_masks(seed=2)
+        df_long, df_short, lookahead_returns = [
+            pd.DataFrame(values.astype(float))
+            for values in [is_long, is_short, returns]
+        ]
+
+        portfolio_returns = signals.long_short_returns(is_long, is_short, returns, 3)
+        np.testing.assert_allclose(
+            portfolio_returns,
+            ((df_long - df_short) * lookahead_returns / 3).values,
+            rtol=1e-15,
+        )
+
+        out = np.empty(returns.shape, np.float32)
+        self.assertIs(
+            signals.long_short_returns(is_long, is_short, returns, 3, out=out), out
+        )
+        np.testing.assert_allclose(out, portfolio_returns, rtol=1e-6)
+
+
+def _stacked_signal_returns(signal, signal_return):
+    """
+    Get the ticker and signal return of each signal by masking and stacking
+    like the original project starter.
+    """
+    stacked = signal_return[signal != 0].stack()
+    stacked = stacked.reset_index().iloc[:, [1, 2]]
+    stacked.columns = ["ticker", "signal_return"]
+
+    return stacked
+
+
+class SignalReturnFramesTest(unittest.TestCase):
+    def setUp(self):
+        shape = (3, 60, 10)
+        self.tickers = pd.Index(["T{:02d}".format(i) for i in range(shape[2])])
+        self.dates = pd.bdate_range("2016-01-04", periods=shape[1])
+
+        is_long, is_short, returns = _random_masks(shape, seed=3)
+        self.signal = signals.long_short(is_long, is_short)
+        # A ticker without signals and one whose returns are all missing
+        self.signal[:, :, 3] = 0
+        returns[:, :, 7] = np.nan
+        # The last dates have no lookahead price
+        returns[1, -5:] = np.nan
+        returns[2, -10:] = np.nan
+        self.signal_return = signals.signal_returns(self.signal, returns)
+
+    def stacked_frames(self):
+        return [
+            _stacked_signal_returns(
+                pd.DataFrame(signal, self.dates, self.tickers),
+                pd.DataFrame(signal_return, self.dates, self.tickers),
+            )
+            for signal, signal_return in zip(self.signal, self.signal_return)
+        ]
+
+    def test_nonzero_signal_returns_match_mask_and_stack(self):
+        signal_returns = signals.nonzero_signal_returns(self.signal, self.signal_return)
+
+        for lookahead, stacked in enumerate(self.stacked_frames()):
+            with self.subTest(lookahead=lookahead):
+                rows = signal_returns[signal_returns["lookahead"] == lookahead]
+                np.testing.assert_array_equal(
+                    self.tickers[rows["ticker"]], stacked["ticker"].values
+                )
+                np.testing.assert_array_equal(
+                    rows["signal_return"], stacked["signal_return"].values
+                )
+
+                # Ordered by date then ticker
+                positions = rows["date"].astype(np.int64) * len(self.tickers)
+                positions += rows["ticker"]
+                self.assertTrue((np.diff(positions) > 0).all())
+
+    def test_dates_and_tickers_matrix(self):
+        signal_returns = signals.nonzero_signal_returns(
+            self.signal[0], self.signal_return[0]
+        )
+        stacked = self.stacked_frames()[0]
+
+        self.assertTrue((signal_returns["lookahead"] == 0).all())
+        np.testing.assert_array_equal(
+            self.tickers[signal_returns["ticker"]], stacked["ticker"].values
+        )
+        np.testing.assert_array_equal(
+            signal_returns["signal_return"], stacked["signal_return"].values
+        )
+
+    def test_frames_match_mask_and_stack(self):
+        frames = signals.signal_return_frames(
+            self.signal, self.signal_return, self.tickers
+        )
+
+        self.assertEqual(len(frames), len(self.signal))
+        for lookahead, (frame, stacked) in enumerate(
+            zip(frames, self.stacked_frames())
+        ):
+            with self.subTest(lookahead=lookahead):
+                self.assertEqual(frame["ticker"].dtype, "category")
+                pd.testing.assert_frame_equal(frame.astype({"ticker": object}), stacked)
+
+    def test_kstest_of_categorical_tickers(self):
+        frames = signals.signal_return_frames(
+            self.signal, self.signal_return, self.tickers
+        )
+
+        for lookahead, (frame, stacked) in enumerate(
+            zip(frames, self.stacked_frames())
+        ):
+            with self.subTest(lookahead=lookahead):
+                signal_returns = stacked["signal_return"]
+                args = signal_returns.mean(), signal_returns.std(ddof=0)
+                ks_values, p_values = kstest.grouped_normal_kstest(
+                    frame["ticker"], frame["signal_return"], *args
+                )
+                expected_ks_values, expected_p_values = kstest.grouped_normal_kstest(
+                    stacked["ticker"], signal_returns, *args
+                )
+
+                # No rows for the tickers without signals or returns
+                self.assertNotIn("T03", ks_values.index)
+                self.assertNotIn("T07", ks_values.index)
+                pd.testing.assert_series_equal(ks_values, expected_ks_values)
+                pd.testing.assert_series_equal(p_values, expected_p_values)
+
+
+class AlignedValuesTest(unittest.TestCase):
+    def test_aligned_frames(self):
+        is_long, _, returns = _random_masks()
+        df_long, lookahead_returns = pd.DataFrame(is_long), pd.DataFrame(returns)
+
+        long_values, return_values = signals.aligned_values(df_long, lookahead_returns)
+        np.testing.assert_array_equal(long_values, is_long)
+        np.testing.assert_array_equal(return_values, returns)
+
+    def test_misaligned_frames(self):
+        is_long, _, returns = _random_masks()
+        df_long, lookahead_returns = pd.DataFrame(is_long), pd.DataFrame(returns)
+
+        for misaligned in [
+            lookahead_returns.iloc[1:],
+            lookahead_returns.iloc[::-1],
+            lookahead_returns[lookahead_returns.columns[::-1]],
+            lookahead_returns.rename(columns=str),
+        ]:
+            with self.subTest(index=misaligned.index, columns=misaligned.columns):
+                with self.assertRaises(AssertionError):
+                    signals.aligned_values(df_long, misaligned)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import volatility
+
+
+def _random_prices(n_dates=1000, n_tickers=5, seed=0):
+    random_state = np.random.RandomState(seed)
+    prices = 50 * np.exp(
+        np.cumsum(random_state.normal(0, 0.02, (n_dates, n_tickers)), axis=0)
+    )
+    prices[random_state.uniform(size=prices.shape) < 0.02] = np.nan
+    # A ticker that starts trading late
+    prices[:100, 1] = np.nan
+
+    return prices
+
+
+def _pandas_ewma_volatility(prices, lambda_):
+    log_returns = np.log(pd.DataFrame(prices)).diff()
+
+    return np.sqrt((log_returns**2).ewm(alpha=1 - lambda_).mean()).values
+
+
+class DecayedSumsTest(unittest.TestCase):
+    def test_matches_loop(self):
+        random_state = np.random.RandomState(0)
+        values = random_state.normal(size=(1000, 3))
+        # A block of dates is about 430 dates for a decay of 0.5
+        decays = np.array([0.5, 0.94, 0.999])
+        initial = np.array([1.0, -2.0, 3.0])
+
+        expected = np.empty(values.shape)
+        sums = initial
+        for date_i, row in enumerate(values):
+            sums = row + decays * sums
+            expected[date_i] = sums
+
+        np.testing.assert_allclose(
+            volatility.decayed_sums(values, decays, initial), expected, rtol=1e-10
+        )
+
+
+class EwmaVolatilityTest(unittest.TestCase):
+    def test_matches_pandas_ewm(self):
+        prices = _random_prices()
+
+        for lambda_ in [0.5, 0.7, 0.94]:
+            with self.subTest(lambda_=lambda_):
+                np.testing.assert_allclose(
+                    volatility.ewma_volatility(prices, lambda_),
+                    _pandas_ewma_volatility(prices, lambda_),
+                    rtol=1e-10,
+                )
+
+    def test_lambda_of_each_ticker(self):
+        prices = _random_prices()
+        lambdas = np.array([0.5, 0.7, 0.94, 0.97, 0.99])
+
+        np.testing.assert_allclose(
+            volatility.ewma_volatility(prices, lambdas),
+            np.column_stack(
+                [
+                    _pandas_ewma_volatility(prices[:, [i]], lambda_)[:, 0]
+                    for i, lambda_ in enumerate(lambdas)
+                ]
+            ),
+            rtol=1e-10,
+        )
+
+    def test_updates_match_batch(self):
+        prices = _random_prices()
+        expected = volatility.ewma_volatility(prices, 0.94)
+
+        one_at_a_time = volatility.EwmaVolatility(0.94, prices.shape[1])
+        np.testing.assert_allclose(
+            [one_at_a_time.update(row) for row in prices], expected, rtol=1e-10
+        )
+
+        in_chunks = volatility.EwmaVolatility(0.94, prices.shape[1])
+        np.testing.assert_allclose(
+            np.concatenate(
+                [
+                    in_chunks.update_many(chunk)
+                    for chunk in np.array_split(prices, [1, 1, 250, 600])
+                ]
+            ),
+            expected,
+            rtol=1e-10,
+        )
+        np.testing.assert_allclose(in_chunks.volatility, expected[-1], rtol=1e-10)
+
+
+def _trailing_windows(rows, windows):
+    """
+    Get the rows of each window ending at the last row, all of them for None.
+    """
+    return {window: rows[-window:] if window else rows for window in windows}
+
+
+class RollingMomentsTest(unittest.TestCase):
+    windows = [None, 1, 5, 20, 60]
+
+    def assert_matches_numpy(self, moments, rows):
+        for window, window_rows in _trailing_windows(rows, self.windows).items():
+            with warnings.catch_warnings():
+                # Windows without values, or too few for ddof, are NaN
+                warnings.simplefilter("ignore", RuntimeWarning)
+                np.testing.assert_allclose(
+                    moments.mean(window),
+                    np.nanmean(window_rows, axis=0),
+                    rtol=1e-9,
+                    atol=1e-15,
+                )
+                for ddof in [0, 1]:
+                    np.testing.assert_allclose(
+                        moments.variance(window, ddof),
+                        np.nanvar(window_rows, axis=0, ddof=ddof),
+                        rtol=1e-7,
+                        atol=1e-15,
+                    )
+
+    def test_updates_match_numpy(self):
+        rows = np.diff(np.log(_random_prices(n_dates=200)), axis=0)
+        moments = volatility.RollingMoments(rows.shape[1], self.windows)
+
+        for n_rows, row in enumerate(rows, 1):
+            moments.update(row)
+            with self.subTest(n_rows=n_rows):
+                self.assert_matches_numpy(moments, rows[:n_rows])
+
+    def test_updates_in_chunks_match_numpy(self):
+        rows = np.diff(np.log(_random_prices(n_dates=300)), axis=0)
+        moments = volatility.RollingMoments(rows.shape[1], self.windows)
+
+        n_rows = 0
+        for chunk in np.array_split(rows, [3, 3, 50, 130, 131, 250]):
+            moments.update_many(chunk)
+            n_rows += len(chunk)
+            with self.subTest(n_rows=n_rows):
+                self.assert_matches_numpy(moments, rows[:n_rows])
+
+        # Back to one row at a time
+        moments.update(rows[0])
+        self.assert_matches_numpy(moments, np.concatenate([rows, rows[:1]]))
+
+
+class VolatilityRankingTest(unittest.TestCase):
+    def test_matches_numpy_std(self):
+        prices = _random_prices(n_dates=300, n_tickers=8)
+        log_returns = np.diff(np.log(prices), axis=0)
+        tickers = ["T{}".format(i) for i in range(8)]
+
+        from_prices = volatility.VolatilityRanking.from_prices(
+            pd.DataFrame(prices[:200], columns=tickers), [None, 20]
+        )
+        one_at_a_time = volatility.VolatilityRanking(tickers, [None, 20])
+        for row in prices[:200]:
+            one_at_a_time.update(row)
+
+        for volatility_ranking in [from_prices, one_at_a_time]:
+            volatility_ranking.update_many(prices[200:250])
+            for row in prices[250:]:
+                volatility_ranking.update(row)
+
+            for window, window_returns in _trailing_windows(
+                log_returns, [None, 20]
+            ).items():
+                expected = pd.Series(
+                    np.nanstd(window_returns, axis=0), tickers, name=window
+                )
+                pd.testing.assert_series_equal(
+                    volatility_ranking.volatility(window), expected, rtol=1e-8
+                )
+                pd.testing.assert_index_equal(
+                    volatility_ranking.most_volatile(3, window),
+                    pd.Index(expected.sort_values(ascending=False).index[:3]),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
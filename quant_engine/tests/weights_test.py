@@ -0,0 +1,177 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from quant_engine import weights
+
+
+def _random_frames(n_dates=60, n_tickers=10, seed=0, missing=0.0):
+    """
+    Draw close prices, volumes and dividends for each date and ticker.
+    """
+    random_state = np.random.RandomState(seed)
+    dates = pd.bdate_range("2016-01-04", periods=n_dates)
+    tickers = ["T{:02d}".format(i) for i in range(n_tickers)]
+    close, volume, dividends = [
+        pd.DataFrame(values, dates, tickers)
+        for values in [
+            random_state.uniform(10, 100, (n_dates, n_tickers)),
+            random_state.uniform(1e3, 1e5, (n_dates, n_tickers)),
+            random_state.uniform(size=(n_dates, n_tickers))
+            * (random_state.uniform(size=(n_dates, n_tickers)) < 0.1),
+        ]
+    ]
+    for frame in [close, volume, dividends]:
+        frame[random_state.uniform(size=frame.shape) < missing] = np.nan
+
+    return close, volume, dividends
+
+
+def _loop_dollar_volume_weights(close, volume):
+    """
+    Generate dollar volume weights a date at a time like the original
+    `generate_dollar_volume_weights`.
+    """
+    tickers_sum = []
+    for i in range(len(close)):
+        tickers_sum.append(sum(close.values[i] * volume.values[i]))
+
+    dollar_volume_weights = close * volume
+    for i in range(len(close)):
+        dollar_volume_weights.iloc[i] = dollar_volume_weights.iloc[i] / tickers_sum[i]
+
+    return dollar_volume_weights
+
+
+def _pandas_dividend_weights(dividends):
+    """
+    Generate dividend weights like the original `calculate_dividend_weights`.
+    """
+    return dividends.cumsum().div(dividends.cumsum().sum(axis=1), axis=0)
+
+
+class WeightsTest(unittest.TestCase):
+    def test_dollar_volume_matches_loop(self):
+        close, volume, _ = _random_frames()
+
+        pd.testing.assert_frame_equal(
+            weights.dollar_volume_weights(close, volume),
+            _loop_dollar_volume_weights(close, volume),
+            rtol=1e-12,
+        )
+        pd.testing.assert_frame_equal(
+            weights.market_cap_weights(close, volume),
+            _loop_dollar_volume_weights(close, volume),
+            rtol=1e-12,
+        )
+
+    def test_missing_values_are_left_out(self):
+        close, volume, _ = _random_frames(missing=0.1)
+        dollar_volume = close * volume
+
+        pd.testing.assert_frame_equal(
+            weights.dollar_volume_weights(close, volume),
+            dollar_volume.div(dollar_volume.sum(axis=1), axis=0),
+            rtol=1e-12,
+        )
+        pd.testing.assert_frame_equal(
+            weights.equal_weights(close),
+            close.notna().div(close.notna().sum(axis=1), axis=0).where(close.notna()),
+            rtol=1e-12,
+        )
+
+    def test_dividends_match_pandas(self):
+        for missing in [0.0, 0.1]:
+            with self.subTest(missing=missing):
+                _, _, dividends = _random_frames(missing=missing)
+                # No dividends paid yet in the first rows
+                dividends.iloc[:5] = 0
+
+                expected = _pandas_dividend_weights(dividends)
+                self.assertTrue(expected.iloc[:5].isna().all().all())
+                pd.testing.assert_frame_equal(
+                    weights.dividend_weights(dividends), expected, rtol=1e-12
+                )
+
+    def test_float32_weights(self):
+        close, volume, dividends = _random_frames()
+
+        for weight_frame, expected in [
+            (
+                weights.dollar_volume_weights(close, volume, np.float32),
+                _loop_dollar_volume_weights(close, volume),
+            ),
+            (
+                weights.dividend_weights(dividends.fillna(0), np.float32),
+                _pandas_dividend_weights(dividends.fillna(0)),
+            ),
+            (weights.equal_weights(close, np.float32), close * 0 + 0.1),
+        ]:
+            self.assertEqual(weight_frame.dtypes.unique().tolist(), [np.float32])
+            np.testing.assert_allclose(weight_frame.values, expected.values, rtol=1e-6)
+
+    def test_normalize_rows(self):
+        values = np.array([[1.0, 3.0, np.nan], [0.0, 0.0, 0.0], [np.nan, 2.0, 2.0]])
+
+        expected = np.array(
+            [[0.25, 0.75, np.nan], [np.nan, np.nan, np.nan], [np.nan, 0.5, 0.5]]
+        )
+        np.testing.assert_array_equal(weights.normalize_rows(values), expected)
+        self.assertIs(weights.normalize_rows(values, out=values), values)
+        np.testing.assert_array_equal(values, expected)
+
+
+class BlockDividendWeightsTest(unittest.TestCase):
+    def test_blocks_match_full_matrix(self):
+        _, _, dividends = _random_frames(n_dates=200, missing=0.05)
+        dividends.iloc[:5] = 0
+        full = _pandas_dividend_weights(dividends)
+
+        for block_size in [1, 7, 64, 199, 200, 1000]:
+            with self.subTest(block_size=block_size):
+                pd.testing.assert_frame_equal(
+                    weights.dividend_weights(dividends, block_size=block_size),
+                    full,
+                    rtol=1e-12,
+                )
+
+                starts = []
+                for start, block_weights in weights.iter_dividend_weights(
+                    dividends.values, block_size
+                ):
+                    starts.append(start)
+                    np.testing.assert_allclose(
+                        block_weights,
+                        full.values[start : start + block_size],
+                        rtol=1e-12,
+                    )
+                self.assertEqual(starts, list(range(0, 200, block_size)))
+
+    def test_memory_mapped_dividends_and_out(self):
+        _, _, dividends = _random_frames(n_dates=100)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dividends.npy")
+            np.save(path, dividends.values)
+            mapped = np.load(path, mmap_mode="r")
+
+            out = np.empty(dividends.shape, dtype=np.float32)
+            dividend_weights = weights.dividend_weights(
+                pd.DataFrame(mapped, dividends.index, dividends.columns, copy=False),
+                np.float32,
+                block_size=16,
+                out=out,
+            )
+            del mapped
+
+        self.assertTrue(np.shares_memory(dividend_weights.values, out))
+        np.testing.assert_allclose(
+            out, _pandas_dividend_weights(dividends).values, rtol=1e-6
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
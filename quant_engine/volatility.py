@@ -0,0 +1,534 @@
+"""
+Volatility of a universe of tickers, kept up to date one date at a time.
+
+The EWMA variance of each ticker is the decayed sum of its squared log
+returns over the decayed count of them, like `ewm(alpha=1 - lambda).mean()`.
+Both sums follow s_t = x_t + lambda * s_(t-1). For a block of dates that is
+lambda^t * cumsum(lambda^-t * x_t), so a whole block of dates is computed for
+every ticker with one cumulative sum, and only the last row is carried to the
+next block. The blocks are short enough that lambda^-t doesn't overflow.
+
+The variance over trailing windows of dates is kept as Welford running
+moments, the count, mean and sum of squared deviations M2 of each ticker. A
+new date adds its return to every window and removes the return leaving it,
+so the volatility of every ticker and window is known in O(tickers) without
+going back over the window. Moments of separate rows merge exactly (Chan et
+al.), so windows of several lengths ending at the same date are built in one
+pass over the longest of them, from the moments of the rows between their
+starts.
+"""
+import numpy as np
+import pandas as pd
+
+from quant_engine import ranking
+
+
+# The largest exponent lambda^-t may reach within a block
+_MAX_LOG_GROWTH = 300.0
+
+
+def decayed_sums(values, decays, initial=0.0):
+    """
+    Calculate s_t = values_t + decay * s_(t-1) down the rows.
+
+    Parameters
+    ----------
+    values : 2 dimensional Ndarray
+        Values with a row for each date and a column for each ticker, without
+        NaNs
+    decays : float or 1 dimensional Ndarray
+        The decay of all tickers or of each ticker, between 0 and 1 exclusive
+    initial : float or 1 dimensional Ndarray
+        The sums before the first date
+
+    Returns
+    -------
+    sums : 2 dimensional Ndarray
+        The decayed sum for each date and ticker
+    """
+    values = np.asarray(values, dtype=np.float64)
+    decays = np.broadcast_to(np.asarray(decays, dtype=np.float64), values.shape[1:])
+    assert np.all((decays > 0) & (decays < 1))
+
+    log_decays = np.log(decays)
+    block_size = max(int(_MAX_LOG_GROWTH / -log_decays.min(initial=-1.0)), 1)
+    block_size = min(block_size, max(len(values), 1))
+    # lambda^-k for the k-th date of a block, the same for every block
+    growth = np.exp(-np.arange(1, block_size + 1)[:, np.newaxis] * log_decays)
+
+    sums = np.empty_like(values)
+    carry = np.broadcast_to(np.asarray(initial, dtype=np.float64), values.shape[1:])
+    for start in range(0, len(values), block_size):
+        block = values[start : start + block_size]
+        block_growth = growth[: len(block)]
+        block_sums = sums[start : start + len(block)]
+
+        np.multiply(block, block_growth, out=block_sums)
+        np.cumsum(block_sums, axis=0, out=block_sums)
+        block_sums += carry
+        block_sums /= block_growth
+        carry = block_sums[-1]
+
+    return sums
+
+
+class EwmaVolatility:
+    """
+    EWMA volatility of every ticker, updated one date or many dates at a time.
+
+    The state is the last log price and the decayed sums of the squared log
+    returns and of their count for each ticker, so a new date takes
+    O(tickers). Missing returns, NaN, still decay the older ones, like
+    `ewm` with `ignore_na=False`.
+
+    Parameters
+    ----------
+    lambdas : float or 1 dimensional Ndarray
+        The 'lambda' of all tickers or of each ticker. Smaller values weight
+        older returns less relative to recent ones.
+    n_tickers : int
+        The number of tickers in each row of prices
+    """
+
+    def __init__(self, lambdas, n_tickers):
+        self.lambdas = np.broadcast_to(
+            np.asarray(lambdas, dtype=np.float64), (n_tickers,)
+        ).copy()
+        assert np.all((self.lambdas > 0) & (self.lambdas < 1))
+
+        self.last_log_prices = np.full(n_tickers, np.nan)
+        self.squared_return_sums = np.zeros(n_tickers)
+        self.return_counts = np.zeros(n_tickers)
+
+    @property
+    def volatility(self):
+        """
+        The current volatility of each ticker, NaN before its first return.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.squared_return_sums / self.return_counts)
+
+    def update(self, prices_today):
+        """
+        Add the prices of a new date.
+
+        Parameters
+        ----------
+        prices_today : 1 dimensional Ndarray
+            Price of each ticker
+
+        Returns
+        -------
+        volatility : 1 dimensional Ndarray
+            The volatility of each ticker including the new date
+        """
+        log_prices = np.log(np.asarray(prices_today, dtype=np.float64))
+        log_returns = log_prices - self.last_log_prices
+        has_return = ~np.isnan(log_returns)
+
+        self.squared_return_sums = self.lambdas * self.squared_return_sums + np.where(
+            has_return, log_returns**2, 0
+        )
+        self.return_counts = self.lambdas * self.return_counts + has_return
+        self.last_log_prices = log_prices
+
+        return self.volatility
+
+    def update_log_prices(self, log_prices):
+        """
+        Add the log prices of many new dates at once.
+
+        Parameters
+        ----------
+        log_prices : 2 dimensional Ndarray
+            Log price for each new date and ticker
+
+        Returns
+        -------
+        volatility : 2 dimensional Ndarray
+            The volatility for each new date and ticker
+        """
+        log_prices = np.asarray(log_prices, dtype=np.float64)
+        if not len(log_prices):
+            return np.empty(log_prices.shape)
+
+        log_returns = np.diff(log_prices, axis=0, prepend=[self.last_log_prices])
+        has_return = ~np.isnan(log_returns)
+
+        squared_return_sums = decayed_sums(
+            np.where(has_return, log_returns**2, 0),
+            self.lambdas,
+            self.squared_return_sums,
+        )
+        return_counts = decayed_sums(has_return, self.lambdas, self.return_counts)
+
+        self.squared_return_sums = squared_return_sums[-1].copy()
+        self.return_counts = return_counts[-1].copy()
+        self.last_log_prices = log_prices[-1].copy()
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(squared_return_sums / return_counts)
+
+    def update_many(self, prices):
+        """
+        Add the prices of many new dates at once.
+
+        Parameters
+        ----------
+        prices : 2 dimensional Ndarray
+            Price for each new date and ticker
+
+        Returns
+        -------
+        volatility : 2 dimensional Ndarray
+            The volatility for each new date and ticker
+        """
+        return self.update_log_prices(np.log(np.asarray(prices, dtype=np.float64)))
+
+
+def ewma_volatility(prices, lambdas):
+    """
+    Calculate the EWMA volatility of every date and ticker.
+
+    Parameters
+    ----------
+    prices : 2 dimensional Ndarray
+        Price for each date and ticker
+    lambdas : float or 1 dimensional Ndarray
+        The 'lambda' of all tickers or of each ticker
+
+    Returns
+    -------
+    volatility : 2 dimensional Ndarray
+        The volatility of the log returns up to each date for each ticker
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    return EwmaVolatility(lambdas, prices.shape[1]).update_many(prices)
+
+
+def _block_moments(values):
+    """
+    Get the count, mean and M2 of each column, skipping NaNs.
+    """
+    is_valid = ~np.isnan(values)
+    counts = is_valid.sum(axis=0).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, np.nansum(values, axis=0) / counts, 0.0)
+    m2s = np.nansum((values - means) ** 2, axis=0)
+
+    return counts, means, m2s
+
+
+def _merge_moments(moments_a, moments_b):
+    """
+    Get the moments of the rows of both `moments_a` and `moments_b`.
+    """
+    count_a, mean_a, m2_a = moments_a
+    count_b, mean_b, m2_b = moments_b
+    counts = count_a + count_b
+    delta = mean_b - mean_a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share_b = np.where(counts > 0, count_b / counts, 0.0)
+
+    return (
+        counts,
+        mean_a + delta * share_b,
+        m2_a + m2_b + delta**2 * count_a * share_b,
+    )
+
+
+class RollingMoments:
+    """
+    Welford running mean and variance of each ticker over trailing windows.
+
+    The last rows of the longest window are kept to remove them again when
+    they leave a window. The windows are recomputed exactly from these rows
+    whenever the longest window has been filled again, so rounding errors of
+    the removals don't build up.
+
+    Parameters
+    ----------
+    n_tickers : int
+        The number of values in each row
+    windows : list of int or None
+        The number of rows in each window, None for all the rows so far
+    """
+
+    def __init__(self, n_tickers, windows=(None,)):
+        assert all(window is None or window > 0 for window in windows)
+
+        self.windows = list(windows)
+        self.history_size = max(
+            [window for window in windows if window is not None], default=0
+        )
+        self.history = np.full((self.history_size, n_tickers), np.nan)
+        self.n_rows = 0
+
+        self.counts = np.zeros((len(self.windows), n_tickers))
+        self.means = np.zeros((len(self.windows), n_tickers))
+        self.m2s = np.zeros((len(self.windows), n_tickers))
+
+    def _window_index(self, window):
+        assert window in self.windows, "Window {} isn't tracked".format(window)
+        return self.windows.index(window)
+
+    def _recent_rows(self):
+        """
+        Get the kept rows from the oldest to the newest.
+        """
+        n_kept = min(self.n_rows, self.history_size)
+        positions = np.arange(self.n_rows - n_kept, self.n_rows) % max(
+            self.history_size, 1
+        )
+
+        return self.history[positions]
+
+    def _recompute_windows(self):
+        """
+        Compute the moments of every trailing window from the kept rows.
+
+        The windows are visited from the shortest to the longest, each
+        merging the moments of the rows between its start and the start of
+        the previous one, so every row is read once.
+        """
+        rows = self._recent_rows()
+        moments = _block_moments(rows[len(rows) :])
+        covered = 0
+        for window_i in np.argsort([window or 0 for window in self.windows]):
+            window = self.windows[window_i]
+            if window is None:
+                continue
+            window = min(window, len(rows))
+            moments = _merge_moments(
+                moments, _block_moments(rows[len(rows) - window : len(rows) - covered])
+            )
+            covered = window
+            self.counts[window_i], self.means[window_i], self.m2s[window_i] = moments
+
+    def update(self, row):
+        """
+        Add the values of a new date, in O(tickers) for each window.
+
+        Parameters
+        ----------
+        row : 1 dimensional Ndarray
+            The value of each ticker, NaN for a missing value
+        """
+        row = np.asarray(row, dtype=np.float64)
+        has_value = ~np.isnan(row)
+
+        # Add the new value to every window
+        counts = self.counts + has_value
+        delta = np.where(has_value, row, 0) - self.means
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(has_value, self.means + delta / counts, self.means)
+        self.m2s += np.where(has_value, delta * (row - means), 0)
+        self.counts, self.means = counts, means
+
+        # Remove the value leaving each full window
+        for window_i, window in enumerate(self.windows):
+            if window is None or self.n_rows < window:
+                continue
+            old_row = self.history[(self.n_rows - window) % self.history_size]
+            has_old = ~np.isnan(old_row)
+            counts = self.counts[window_i] - has_old
+            delta = np.where(has_old, old_row, 0) - self.means[window_i]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(
+                    has_old & (counts > 0),
+                    self.means[window_i] - delta / counts,
+                    np.where(counts > 0, self.means[window_i], 0),
+                )
+            m2s = self.m2s[window_i] - np.where(has_old, delta * (old_row - means), 0)
+            self.counts[window_i], self.means[window_i] = counts, means
+            self.m2s[window_i] = np.where(counts > 0, np.maximum(m2s, 0), 0)
+
+        if self.history_size:
+            self.history[self.n_rows % self.history_size] = row
+        self.n_rows += 1
+
+        if self.history_size and self.n_rows % self.history_size == 0:
+            self._recompute_windows()
+
+    def update_many(self, rows):
+        """
+        Add the values of many new dates at once.
+
+        Parameters
+        ----------
+        rows : 2 dimensional Ndarray
+            The value of each new date and ticker
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        if not len(rows):
+            return
+
+        for window_i, window in enumerate(self.windows):
+            if window is None:
+                (
+                    self.counts[window_i],
+                    self.means[window_i],
+                    self.m2s[window_i],
+                ) = _merge_moments(
+                    (self.counts[window_i], self.means[window_i], self.m2s[window_i]),
+                    _block_moments(rows),
+                )
+
+        if self.history_size:
+            new_rows = rows[-self.history_size :]
+            n_rows = self.n_rows + len(rows)
+            positions = np.arange(n_rows - len(new_rows), n_rows) % self.history_size
+            self.history[positions] = new_rows
+        self.n_rows += len(rows)
+        self._recompute_windows()
+
+    def mean(self, window=None):
+        """
+        Get the mean of each ticker over a window, NaN without values.
+        """
+        window_i = self._window_index(window)
+        return np.where(self.counts[window_i] > 0, self.means[window_i], np.nan)
+
+    def variance(self, window=None, ddof=0):
+        """
+        Get the variance of each ticker over a window.
+
+        Parameters
+        ----------
+        window : int or None
+            One of the tracked windows
+        ddof : int
+            The delta degrees of freedom, 0 like `np.std`, 1 like `DataFrame.std`
+
+        Returns
+        -------
+        variance : 1 dimensional Ndarray
+            The variance of each ticker, NaN with `ddof` values or fewer
+        """
+        window_i = self._window_index(window)
+        counts = self.counts[window_i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > ddof, self.m2s[window_i] / (counts - ddof), np.nan)
+
+
+class VolatilityRanking:
+    """
+    Rank tickers by the volatility of their log returns over trailing windows.
+
+    Running moments of the log returns are kept for every window, so the
+    volatility of every ticker, and the most volatile tickers, are answered
+    in O(tickers) from the state, and a new date updates it in O(tickers)
+    for each window.
+
+    Parameters
+    ----------
+    tickers : Index
+        The ticker of each column of prices
+    windows : list of int or None
+        The number of log returns in each window, None for all of them
+    """
+
+    def __init__(self, tickers, windows=(None,)):
+        self.tickers = pd.Index(tickers)
+        self.moments = RollingMoments(len(self.tickers), windows)
+        self.last_log_prices = np.full(len(self.tickers), np.nan)
+
+    @classmethod
+    def from_prices(cls, prices, windows=(None,)):
+        """
+        Build the ranking of the dates of wide prices.
+
+        Parameters
+        ----------
+        prices : DataFrame
+            Price for each date and ticker, like a field of the price store
+        windows : list of int or None
+            The number of log returns in each window, None for all of them
+
+        Returns
+        -------
+        volatility_ranking : VolatilityRanking
+            The ranking up to the last date of `prices`
+        """
+        volatility_ranking = cls(prices.columns, windows)
+        volatility_ranking.update_many(prices.values)
+
+        return volatility_ranking
+
+    def update(self, prices_today):
+        """
+        Add the prices of a new date.
+
+        Parameters
+        ----------
+        prices_today : 1 dimensional Ndarray
+            Price of each ticker
+        """
+        log_prices = np.log(np.asarray(prices_today, dtype=np.float64))
+        self.moments.update(log_prices - self.last_log_prices)
+        self.last_log_prices = log_prices
+
+    def update_many(self, prices):
+        """
+        Add the prices of many new dates at once.
+
+        Parameters
+        ----------
+        prices : 2 dimensional Ndarray
+            Price for each new date and ticker
+        """
+        log_prices = np.log(np.asarray(prices, dtype=np.float64))
+        if not len(log_prices):
+            return
+
+        log_returns = np.diff(log_prices, axis=0, prepend=[self.last_log_prices])
+        if self.moments.n_rows == 0:
+            # No return before the first date
+            log_returns = log_returns[1:]
+        self.moments.update_many(log_returns)
+        self.last_log_prices = log_prices[-1]
+
+    def volatility(self, window=None, ddof=0):
+        """
+        Get the volatility of each ticker.
+
+        Parameters
+        ----------
+        window : int or None
+            One of the tracked windows
+        ddof : int
+            The delta degrees of freedom, 0 like `np.std`
+
+        Returns
+        -------
+        volatility : Pandas Series
+            The standard deviation of the log returns of each ticker
+        """
+        return pd.Series(
+            np.sqrt(self.moments.variance(window, ddof)), self.tickers, name=window
+        )
+
+    def most_volatile(self, top_k, window=None, ddof=0):
+        """
+        Get the most volatile tickers.
+
+        Parameters
+        ----------
+        top_k : int
+            The number of tickers to get
+        window : int or None
+            One of the tracked windows
+        ddof : int
+            The delta degrees of freedom, 0 like `np.std`
+
+        Returns
+        -------
+        tickers : Index
+            The most volatile tickers, from the most volatile. Ties are
+            ordered by column, and tickers without a volatility are left out.
+        """
+        volatility = np.sqrt(self.moments.variance(window, ddof))
+        positions = np.flatnonzero(ranking.top_n_mask(volatility, top_k, "first"))
+        order = np.argsort(-volatility[positions], kind="stable")
+
+        return self.tickers[positions[order]]
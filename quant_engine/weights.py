@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+
+def normalize_rows(values, dtype=np.float64, out=None):
+    """
+    Divide each row by its sum so the row adds up to 1.
+
+    NaNs are left out of the sums and stay NaN. Rows that add up to 0 have no
+    weights and are all NaN.
+
+    Parameters
+    ----------
+    values : 2 dimensional Ndarray
+        Values for each date and ticker
+    dtype : dtype
+        The dtype of the weights, float32 halves their memory
+    out : 2 dimensional Ndarray
+        Preallocated array to write the weights to, can be `values` itself
+
+    Returns
+    -------
+    weights : 2 dimensional Ndarray
+        Weights for each date and ticker
+    """
+    if out is None:
+        weights = np.array(values, dtype=dtype)
+    else:
+        weights = out
+        weights[...] = values
+    row_sums = np.nansum(weights, axis=1, keepdims=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(weights, row_sums, out=weights)
+    weights[row_sums[:, 0] == 0] = np.nan
+
+    return weights
+
+
+def _weights_frame(weights, like):
+    return pd.DataFrame(weights, like.index, like.columns)
+
+
+def dollar_volume_weights(close, volume, dtype=np.float64):
+    """
+    Generate dollar volume weights.
+
+    Parameters
+    ----------
+    close : DataFrame
+        Close price for each ticker and date
+    volume : DataFrame
+        Volume for each ticker and date
+    dtype : dtype
+        The dtype of the weights
+
+    Returns
+    -------
+    dollar_volume_weights : DataFrame
+        The dollar volume weights for each ticker and date
+    """
+    assert close.index.equals(volume.index)
+    assert close.columns.equals(volume.columns)
+
+    return _weights_frame(
+        normalize_rows(np.multiply(close.values, volume.values, dtype=dtype), dtype),
+        close,
+    )
+
+
+def market_cap_weights(close, shares_outstanding, dtype=np.float64):
+    """
+    Generate market capitalization weights.
+
+    Parameters
+    ----------
+    close : DataFrame
+        Close price for each ticker and date
+    shares_outstanding : DataFrame
+        Shares outstanding for each ticker and date
+    dtype : dtype
+        The dtype of the weights
+
+    Returns
+    -------
+    market_cap_weights : DataFrame
+        The market capitalization weights for each ticker and date
+    """
+    return dollar_volume_weights(close, shares_outstanding, dtype)
+
+
+def iter_dividend_weights(dividends, block_size=256, dtype=np.float64):
+    """
+    Generate dividend weights one block of dates at a time.
+
+    Only the running total of the dividends is carried from one block to the
+    next, so the memory used is bounded by the block size whatever the length
+    of the history. `dividends` can be a memory mapped matrix.
+
+    Parameters
+    ----------
+    dividends : 2 dimensional Ndarray
+        Dividend for each date and ticker
+    block_size : int
+        The number of dates in each block
+    dtype : dtype
+        The dtype of the weights
+
+    Yields
+    ------
+    start : int
+        Position of the first date of the block
+    block_weights : 2 dimensional Ndarray
+        The dividend weights for each date of the block and ticker
+    """
+    assert block_size > 0
+
+    total_dividends = np.zeros(dividends.shape[1], dtype=dtype)
+    for start in range(0, len(dividends), block_size):
+        block = np.asarray(dividends[start : start + block_size])
+        cumulative_dividends = np.nancumsum(block, axis=0, dtype=dtype)
+        cumulative_dividends += total_dividends
+        total_dividends = cumulative_dividends[-1].copy()
+
+        # Like DataFrame.cumsum, missing dividends stay missing
+        cumulative_dividends[np.isnan(block)] = np.nan
+        yield start, normalize_rows(cumulative_dividends, out=cumulative_dividends)
+
+
+def dividend_weights(dividends, dtype=np.float64, block_size=256, out=None):
+    """
+    Generate weights from the dividends paid up to each date.
+
+    Parameters
+    ----------
+    dividends : DataFrame
+        Dividend for each ticker and date
+    dtype : dtype
+        The dtype of the weights
+    block_size : int
+        The number of dates to process at a time, see `iter_dividend_weights`
+    out : 2 dimensional Ndarray
+        Preallocated array to write the weights to
+
+    Returns
+    -------
+    dividend_weights : DataFrame
+        The dividend weights for each ticker and date
+    """
+    weights = np.empty(dividends.shape, dtype=dtype) if out is None else out
+    for start, block_weights in iter_dividend_weights(
+        dividends.values, block_size, dtype
+    ):
+        weights[start : start + len(block_weights)] = block_weights
+
+    return _weights_frame(weights, dividends)
+
+
+def equal_weights(prices, dtype=np.float64):
+    """
+    Generate equal weights for the tickers with a price on each date.
+
+    Parameters
+    ----------
+    prices : DataFrame
+        Price for each ticker and date
+    dtype : dtype
+        The dtype of the weights
+
+    Returns
+    -------
+    equal_weights : DataFrame
+        The equal weights for each ticker and date, NaN where there's no price
+    """
+    has_price = np.where(np.isnan(prices.values), np.nan, 1)
+
+    return _weights_frame(normalize_rows(has_price, dtype), prices)
@@ -30,6 +30,7 @@ import numpy as np
 import helper
 import project_helper
 import project_tests
+from quant_engine import panel, price_store, ranking, resample, signals
 
 
 # ## Market Data
@@ -39,11 +40,9 @@ import project_tests
 # In[3]:
 
 
-df = pd.read_csv(
-    "trading_with_momentum/eod-quotemedia.csv", parse_dates=["date"], index_col=False
-)
-
-close = df.reset_index().pivot(index="date", columns="ticker", values="adj_close")
+close = price_store.load_csv("trading_with_momentum/eod-quotemedia.csv", ["adj_close"])[
+    "adj_close"
+]
 
 print("Loaded Data")
 
@@ -95,14 +94,17 @@ def resample_prices(close_prices, freq="M"):
     """
     # TODO: Implement Function
 
-    bucket = close_prices.groupby(close_prices.index.to_period("M")).apply(
-        lambda x: x.index.max()
-    )
-    close_prices = close_prices.loc[bucket]
-    return close_prices.resample(freq).mean()
+    # The prices of the last date in each month
+    _, starts, ends = resample.period_bounds(close_prices.index, "M")
+    month_end_prices = close_prices.iloc[ends[ends > starts] - 1]
+
+    # Averaged over each period of freq, the month end prices themselves for "M"
+    return resample.resample_frame(month_end_prices, freq, "mean")
 
 
 project_tests.test_resample_prices(resample_prices)
+project_tests.test_resample_prices_quarterly(resample_prices)
+project_tests.test_resample_prices_weekly(resample_prices)
 
 
 # ### View Data
@@ -136,7 +138,7 @@ def compute_log_returns(prices):
 
     Parameters
     ----------
-    prices : DataFrame
+    prices : DataFrame or PricePanel
         Prices for each ticker and date
 
     Returns
@@ -146,7 +148,7 @@ def compute_log_returns(prices):
     """
     # TODO: Implement Function
 
-    return np.log(prices) - np.log(prices.shift(1))
+    return panel.as_panel(prices).log_returns()
 
 
 project_tests.test_compute_log_returns(compute_log_returns)
@@ -158,7 +160,8 @@ project_tests.test_compute_log_returns(compute_log_returns)
 # In[9]:
 
 
-monthly_close_returns = compute_log_returns(monthly_close)
+monthly_close_panel = panel.PricePanel(monthly_close)
+monthly_close_returns = compute_log_returns(monthly_close_panel)
 project_helper.plot_returns(
     monthly_close_returns.loc[:, apple_ticker],
     "Log Returns of {} Stock (Monthly)".format(apple_ticker),
@@ -234,8 +237,9 @@ project_tests.test_shift_returns(shift_returns)
 # In[11]:
 
 
-prev_returns = shift_returns(monthly_close_returns, 1)
-lookahead_returns = shift_returns(monthly_close_returns, -1)
+# Shifted from the log returns the panel kept for `compute_log_returns`
+prev_returns = monthly_close_panel.shifted_returns(1)
+lookahead_returns = monthly_close_panel.shifted_returns(-1)
 
 project_helper.plot_shifted_returns(
     prev_returns.loc[:, apple_ticker],
@@ -297,12 +301,7 @@ def get_top_n(prev_returns, top_n):
     """
     # TODO: Implement Function
 
-    previous_top = []
-    for date in prev_returns.iterrows():
-        date_values = date[1].sort_values()
-        previous_top.append(date_values[top_n - 1])
-
-    return (prev_returns >= previous_top).astype(np.int)
+    return ranking.top_n_frame(prev_returns, top_n)
 
 
 project_tests.test_get_top_n(get_top_n)
@@ -353,10 +352,10 @@ def portfolio_returns(df_long, df_short, lookahead_returns, n_stocks):
     """
     # TODO: Implement Function
 
-    long = lookahead_returns * df_long
-    short = lookahead_returns * df_short
-    position = (long - short) / n_stocks
-    return position
+    position = signals.long_short_returns(
+        *signals.aligned_values(df_long, df_short, lookahead_returns), n_stocks
+    )
+    return pd.DataFrame(position, lookahead_returns.index, lookahead_returns.columns)
 
 
 project_tests.test_portfolio_returns(portfolio_returns)
@@ -118,6 +118,97 @@ def test_resample_prices(fn):
     assert_output(fn, fn_inputs, fn_correct_outputs)
 
 
+@project_test
+def test_resample_prices_quarterly(fn):
+    tickers = generate_random_tickers(3)
+    dates = pd.DatetimeIndex(
+        [
+            "2008-08-19",
+            "2008-09-08",
+            "2008-09-28",
+            "2008-10-18",
+            "2008-11-07",
+            "2008-11-27",
+            "2009-01-15",
+        ]
+    )
+    resampled_dates = pd.DatetimeIndex(["2008-09-30", "2008-12-31", "2009-03-31"])
+
+    fn_inputs = {
+        "close_prices": pd.DataFrame(
+            [
+                [10.0, 20.0, 30.0],
+                [11.0, 21.0, 31.0],
+                [12.0, 22.0, 32.0],
+                [13.0, 23.0, 33.0],
+                [14.0, 24.0, 34.0],
+                [16.0, 26.0, 36.0],
+                [18.0, 28.0, 38.0],
+            ],
+            dates,
+            tickers,
+        ),
+        "freq": "Q",
+    }
+    fn_correct_outputs = OrderedDict(
+        [
+            (
+                "prices_resampled",
+                pd.DataFrame(
+                    [[11.0, 21.0, 31.0], [14.5, 24.5, 34.5], [18.0, 28.0, 38.0]],
+                    resampled_dates,
+                    tickers,
+                ),
+            )
+        ]
+    )
+
+    assert_output(fn, fn_inputs, fn_correct_outputs)
+
+
+@project_test
+def test_resample_prices_weekly(fn):
+    tickers = generate_random_tickers(3)
+    dates = pd.DatetimeIndex(["2008-09-25", "2008-09-30", "2008-10-02", "2008-10-31"])
+    resampled_dates = pd.DatetimeIndex(
+        ["2008-10-05", "2008-10-12", "2008-10-19", "2008-10-26", "2008-11-02"]
+    )
+
+    fn_inputs = {
+        "close_prices": pd.DataFrame(
+            [
+                [10.0, 20.0, 30.0],
+                [11.0, 21.0, 31.0],
+                [12.0, 22.0, 32.0],
+                [13.0, 23.0, 33.0],
+            ],
+            dates,
+            tickers,
+        ),
+        "freq": "W",
+    }
+    fn_correct_outputs = OrderedDict(
+        [
+            (
+                "prices_resampled",
+                pd.DataFrame(
+                    [
+                        [11.0, 21.0, 31.0],
+                        [np.nan, np.nan, np.nan],
+                        [np.nan, np.nan, np.nan],
+                        [np.nan, np.nan, np.nan],
+                        [13.0, 23.0, 33.0],
+                    ],
+                    resampled_dates,
+                    tickers,
+                ),
+            )
+        ]
+    )
+
+    assert_output(fn, fn_inputs, fn_correct_outputs)
+
+
 @project_test
 def test_compute_log_returns(fn):
     tickers = generate_random_tickers(5)
@@ -238,6 +329,7 @@ def test_get_top_n(fn):
                     ],
                     dates,
                     tickers,
+                    dtype=np.int8,
                 ),
             )
         ]